@@ -0,0 +1,8 @@
+import os
+
+# Keep stdout clean for tools that stream frames or data through it
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from geometry_game.pipeline import Pipeline, apply_file
+
+__all__ = ["Pipeline", "apply_file"]
@@ -1,4 +1,4 @@
-from geometry_game.main import main
+from geometry_game.main import run
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run()
@@ -0,0 +1,362 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+from contextlib import closing
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from functools import partial, reduce
+from importlib import metadata
+import numpy as np
+import pygame
+from geometry_game.geometry import (
+    TRANSFORM_TYPES,
+    Transformation,
+    TransformStack,
+    project_point,
+    project_points,
+    transform_vertices,
+)
+from geometry_game.constants import WIDTH, HEIGHT, CAMERA_DISTANCE, SCALE
+
+TRANSFORM_PARAMS = {
+    "scale": {"x": "1.5", "y": "0.5", "z": "2"},
+    "rotate_x": {"angle": "30"},
+    "rotate_y": {"angle": "30"},
+    "rotate_z": {"angle": "30"},
+    "translate": {"x": "0.5", "y": "-0.5", "z": "1"},
+    "shear": {"xy": "0.1", "xz": "0.2", "yx": "0", "yz": "0.3", "zx": "0", "zy": "0"},
+}
+
+PERCENTILES = (50, 90, 99)
+
+
+def random_stack(depth, seed=0):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(TRANSFORM_TYPES, size=depth)
+    return [Transformation(str(kind), TRANSFORM_PARAMS[kind]) for kind in types]
+
+
+def random_vertices(count, seed=0):
+    return np.random.default_rng(seed).uniform(-1, 1, size=(count, 3))
+
+
+def geometry_cases(quick):
+    for kind in TRANSFORM_TYPES:
+        transform = Transformation(kind, TRANSFORM_PARAMS[kind])
+        yield "Transformation.update_matrix", {"type": kind}, transform.update_matrix
+
+    depths = (1, 10) if quick else (1, 10, 100)
+    counts = (8, 10_000) if quick else (8, 10_000, 100_000)
+    for depth in depths:
+        stack = random_stack(depth)
+        for count in counts:
+            vertices = random_vertices(count)
+            yield (
+                "transform_vertices",
+                {"depth": depth, "vertices": count},
+                partial(transform_vertices, vertices, stack),
+            )
+
+    vertices = random_vertices(counts[-1])
+    out = np.empty_like(vertices)
+    for workers in (1,) if quick else sorted({1, os.cpu_count() or 1}):
+        yield (
+            "transform_vertices",
+            {"depth": depths[-1], "vertices": counts[-1], "workers": workers},
+            partial(
+                transform_vertices,
+                vertices,
+                random_stack(depths[-1]),
+                out,
+                workers=workers,
+            ),
+        )
+
+    from geometry_game.quaternion import RIGID_TYPES, compose
+
+    for depth in depths:
+        stack = [
+            Transformation(str(kind), TRANSFORM_PARAMS[kind])
+            for kind in np.random.default_rng(0).choice(RIGID_TYPES, size=depth)
+        ]
+        matrices = [transform.matrix for transform in stack]
+        yield "matrix chain", {"depth": depth}, partial(reduce, np.matmul, matrices)
+        yield "quaternion.compose", {"depth": depth}, partial(compose, stack)
+        # What the "dual" composite pays per scene update: the treap keeps the
+        # fused dual quaternion, only its normalization and matrix are left
+        fused = TransformStack(stack)
+        yield (
+            "TransformStack.rigid_composite",
+            {"depth": depth},
+            lambda fused=fused: fused.rigid_composite.to_matrix(),
+        )
+
+    from geometry_game.clipping import Frustum, ProjectionPipeline
+    from geometry_game.mesh import cube_mesh
+    from geometry_game.scene import grid_scene
+
+    rotation = Transformation("rotate_y", {"angle": "30"}).matrix
+    for grid in (4,) if quick else (4, 10):
+        scene, _, batch = grid_scene(cube_mesh(), grid, random_stack(10))
+        scene.update()
+        yield (
+            "MeshBatch.transform",
+            {"instances": len(batch)},
+            partial(batch.transform, rotation),
+        )
+        projection = ProjectionPipeline(
+            Frustum(pygame.Rect(0, 0, WIDTH, HEIGHT)), batch
+        )
+        yield (
+            "ProjectionPipeline",
+            {"instances": len(batch)},
+            lambda projection=projection: (
+                projection.transform(rotation),
+                projection.project(),
+            ),
+        )
+
+    point = random_vertices(1)[0]
+    yield "project_point", {}, lambda: project_point(point, CAMERA_DISTANCE)
+
+    for count in counts:
+        vertices = random_vertices(count)
+        yield (
+            "project_points",
+            {"vertices": count},
+            lambda vertices=vertices: project_points(
+                vertices, CAMERA_DISTANCE, SCALE, (WIDTH // 2, HEIGHT // 2)
+            ),
+        )
+
+
+def ui_cases(quick):
+    from geometry_game.ui import (
+        GlassButton,
+        InputBox,
+        PopupMenu,
+        PopupForm,
+        TransformListPopup,
+        draw_background,
+    )
+
+    screen = pygame.display.get_surface()
+    yield "draw_background", {}, lambda: draw_background(screen)
+
+    button = GlassButton(20, 20, 250, 50, "Applied Transformations")
+    yield "GlassButton.draw", {}, lambda: button.draw(screen)
+
+    input_box = InputBox(100, 100, 280, 35, text="45")
+    yield "InputBox.draw", {}, lambda: input_box.draw(screen)
+
+    menu = PopupMenu(20, 140, 200, ["Scale", "Rotate X", "Rotate Y", "Rotate Z"])
+    menu.show()
+    yield "PopupMenu.draw", {}, lambda: menu.draw(screen)
+
+    form = PopupForm(
+        "Translate Transformation",
+        [{"name": axis, "label": f"Translate {axis.upper()}:"} for axis in "xyz"],
+    )
+    form.show()
+    yield "PopupForm.draw", {}, lambda: form.draw(screen)
+
+    for depth in (10,) if quick else (10, 1000):
+        popup = TransformListPopup(random_stack(depth))
+        popup.show()
+        yield "TransformListPopup.draw", {"items": depth}, partial(popup.draw, screen)
+
+
+def frame_cases(quick):
+    from geometry_game.main import Game
+    from geometry_game.render import WIREFRAME_MODES
+
+    screen = pygame.display.get_surface()
+    # Hovering the buttons keeps the event and widget paths busy every frame
+    hover = [
+        pygame.event.Event(
+            pygame.MOUSEMOTION, pos=position, rel=(0, 0), buttons=(0, 0, 0)
+        )
+        for position in ((100, 40), (100, 100))
+    ]
+    for mode, solid, popup in (
+        (WIREFRAME_MODES[0], False, False),
+        (WIREFRAME_MODES[-1], False, False),
+        (WIREFRAME_MODES[0], True, False),
+        (WIREFRAME_MODES[0], False, True),
+    ):
+        game = Game(screen, lod=False)
+        for transform in random_stack(10):
+            game.transformations.append(transform)
+        game.stack_changed()
+        game.auto_rotate = True
+        game.wireframe.mode = mode
+        game.solid_mode = solid
+        if popup:
+            game.transform_list_popup.show()
+        game.profiler_overlay.toggle()
+        try:
+            yield (
+                "frame",
+                {"mesh": "cube", "mode": "solid" if solid else mode, "popup": popup},
+                lambda game=game: game.frame(hover),
+            )
+        finally:
+            game.close()
+
+    from geometry_game.headless import render_frames
+    from geometry_game.mesh import cube_mesh
+
+    for mode in WIREFRAME_MODES:
+        frames = render_frames(
+            cube_mesh(), random_stack(10), frames=sys.maxsize, wireframe_mode=mode
+        )
+        try:
+            yield "headless frame", {"mesh": "cube", "mode": mode}, frames.__next__
+        finally:
+            frames.close()
+
+    for workers in (1,) if quick else sorted({1, os.cpu_count() or 1}):
+        frames = render_frames(
+            cube_mesh(),
+            random_stack(10),
+            frames=sys.maxsize,
+            solid=True,
+            workers=workers,
+        )
+        try:
+            yield (
+                "headless frame",
+                {"mesh": "cube", "mode": "solid", "workers": workers},
+                frames.__next__,
+            )
+        finally:
+            # Shuts down the solid renderer's worker threads
+            frames.close()
+
+
+def measure(function, repeat, min_time):
+    """Time ``function`` and return per-call seconds for each sample"""
+    function()
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number)
+    return number, samples
+
+
+def summarize(samples):
+    values = np.array(samples)
+    summary = {
+        "min": float(values.min()),
+        "mean": float(values.mean()),
+        "max": float(values.max()),
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = float(np.percentile(values, percentile))
+    return summary
+
+
+def environment():
+    try:
+        version = metadata.version("geometry-game")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "package_version": version,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def run(groups, repeat=20, min_time=0.005, name_filter=None, quick=False, log=None):
+    results = []
+    for group in groups:
+        # Closed even if a case fails, so generators release what they hold
+        with closing(group(quick)) as cases:
+            for name, params, function in cases:
+                if name_filter and name_filter not in name:
+                    continue
+                number, samples = measure(function, repeat, min_time)
+                result = {
+                    "name": name,
+                    "params": params,
+                    "loops": number,
+                    "repeat": repeat,
+                    "seconds": summarize(samples),
+                }
+                results.append(result)
+                if log is not None:
+                    label = ", ".join(f"{key}={value}" for key, value in params.items())
+                    median = result["seconds"]["p50"] * 1e6
+                    print(f"{name}({label}): {median:.2f} us", file=log)
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m geometry_game.bench",
+        description="Run the geometry and rendering microbenchmarks",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="samples per benchmark")
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.005,
+        help="minimum seconds per sample, used to pick the loop count",
+    )
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="smaller parameter grid")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+
+    results = run(
+        (geometry_cases, ui_cases, frame_cases),
+        repeat=args.repeat,
+        min_time=args.min_time,
+        name_filter=args.filter,
+        quick=args.quick,
+        log=sys.stderr,
+    )
+    report = {"environment": environment(), "results": results}
+
+    pygame.quit()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
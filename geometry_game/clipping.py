@@ -0,0 +1,301 @@
+from collections import namedtuple
+import numpy as np
+from geometry_game.geometry import project_points
+from geometry_game.constants import CAMERA_DISTANCE, SCALE, NEAR_PLANE
+
+ClippedEdges = namedtuple("ClippedEdges", "vertex_mask edge_mask starts ends")
+ClippedEdges.__doc__ = """Result of clipping a wireframe against the view frustum
+
+``vertex_mask`` marks vertices inside the frustum and ``edge_mask`` the
+edges with both ends inside, which can be drawn straight from the projected
+points. ``starts`` and ``ends`` are the projected, already clipped segments of
+the edges that cross the frustum boundary.
+"""
+
+
+class Frustum:
+    """Near plane plus the four planes through the camera and the screen edges
+
+    The camera sits at ``z = -camera_distance`` looking down +z, matching
+    ``project_points``. Every plane is stored as ``(a, b, c, d)`` with
+    ``a*x + b*y + c*z + d >= 0`` on the inside, so distances are linear in
+    the vertex coordinates and edges can be clipped before the perspective
+    divide.
+    """
+
+    def __init__(
+        self,
+        rect,
+        camera_distance=CAMERA_DISTANCE,
+        scale=SCALE,
+        near=NEAR_PLANE,
+        margin=0,
+    ):
+        self.camera_distance = camera_distance
+        self.scale = scale
+        self.center = rect.center
+        self.rect = rect.inflate(margin * 2, margin * 2)
+
+        focal = camera_distance * scale
+        center_x, center_y = self.center
+        left = center_x - self.rect.left
+        right = self.rect.right - center_x
+        top = center_y - self.rect.top
+        bottom = self.rect.bottom - center_y
+        # depth = z + camera_distance, so c * depth expands to c * z + c * distance
+        self.planes = np.array(
+            [
+                [0, 0, 1, camera_distance - near],
+                [focal, 0, left, left * camera_distance],
+                [-focal, 0, right, right * camera_distance],
+                [0, focal, top, top * camera_distance],
+                [0, -focal, bottom, bottom * camera_distance],
+            ],
+            dtype=float,
+        )
+        self._normal_lengths = np.linalg.norm(self.planes[:, :3], axis=1)
+
+    def distances(self, vertices):
+        """Signed (N, 5) plane values, non-negative inside each plane"""
+        return np.matmul(vertices, self.planes[:, :3].T) + self.planes[:, 3]
+
+    def in_front(self, vertices):
+        """Mask of the vertices on the visible side of the near plane"""
+        return np.matmul(vertices, self.planes[0, :3]) + self.planes[0, 3] >= 0
+
+    def project(self, vertices):
+        return project_points(vertices, self.camera_distance, self.scale, self.center)
+
+    def clip_edges(self, vertices, edges, active=None):
+        """Clip (E, 2) edges of ``vertices`` and project the crossing segments
+
+        ``active`` optionally marks the vertices of objects that survived
+        culling; edges touching any other vertex are dropped up front.
+        """
+        distances = self.distances(vertices)
+        vertex_mask = (distances >= 0).all(axis=1)
+        if active is not None:
+            vertex_mask &= active
+
+        edge_mask = vertex_mask[edges].all(axis=1)
+        crossing = ~edge_mask
+        if active is not None:
+            crossing &= active[edges].all(axis=1)
+        crossing = edges[crossing]
+        start_distances = distances[crossing[:, 0]]
+        end_distances = distances[crossing[:, 1]]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = start_distances / (start_distances - end_distances)
+        # Entering and leaving parameters along each edge, Liang-Barsky style
+        enter = np.where(start_distances < 0, ratio, 0.0).max(axis=1, initial=0.0)
+        leave = np.where(end_distances < 0, ratio, 1.0).min(axis=1, initial=1.0)
+        outside = ((start_distances < 0) & (end_distances < 0)).any(axis=1)
+        visible = (enter <= leave) & ~outside
+
+        starts = vertices[crossing[visible, 0]]
+        delta = vertices[crossing[visible, 1]] - starts
+        return ClippedEdges(
+            vertex_mask,
+            edge_mask,
+            self.project(starts + delta * enter[visible, None]),
+            self.project(starts + delta * leave[visible, None]),
+        )
+
+
+class ProjectionPipeline:
+    """Cull, transform and project a MeshBatch into buffers reused every frame
+
+    The world matrices, vertices, depths, screen points and masks are
+    allocated once for the batch size and rewritten with ``out=`` and
+    in-place ufuncs, so a steady-state frame with every instance visible
+    allocates nothing beyond a few hundred bytes of array headers. Only
+    instances whose bounding sphere reaches into the frustum are transformed
+    and projected. When some are culled, their matrices are compacted, run
+    through one batched matmul and scattered back to their rows; that path
+    allocates the (visible,) index array from ``np.flatnonzero`` and the
+    index buffers of the fancy scatters, a few bytes per visible instance.
+    ``active`` marks the vertices of the visible instances; the rows of
+    culled instances hold stale values. The returned arrays are views of the
+    buffers and stay valid until the next call. ``cull`` can run on its own
+    first, e.g. to pick a level of detail before any vertex is transformed.
+    """
+
+    def __init__(self, frustum, batch):
+        self.frustum = frustum
+        self.batch = batch
+        self._instances = None
+        self._shape = None
+
+    def _allocate_instances(self, instances):
+        self._instances = instances
+        self._world = np.empty((instances, 4, 4))
+        self._affine = np.empty((instances, 3, 4))
+        self._linear = np.empty((instances, 3, 3))
+        self._squares = np.empty((instances, 3, 3))
+        self._sphere_center = np.ones(4)
+        self._centers = np.empty((instances, 3))
+        self._radii = np.empty(instances)
+        # One contiguous row of distances per plane
+        self._plane_distances = np.empty((len(self.frustum.planes), instances))
+        self._inside_planes = np.empty(self._plane_distances.shape, dtype=bool)
+        self._visible = np.empty(instances, dtype=bool)
+        self._visible_count = 0
+        self._indices = None
+        self._visible_affine = np.empty((instances, 3, 4))
+
+    def _allocate_vertices(self, instances, count):
+        self._shape = (instances, count)
+        # Homogeneous mesh vertices, so one matmul applies the translation too
+        self._homogeneous = np.ones((count, 4))
+        # Zeroed, since the rows of culled instances may never be written
+        self._vertices = np.zeros((instances, count, 3))
+        self._points = np.zeros((instances * count, 2))
+        self._active = np.empty((instances, count), dtype=bool)
+        self._front = np.empty(instances * count, dtype=bool)
+        self._depth = np.empty(instances * count)
+        self._behind = np.empty(instances * count, dtype=bool)
+        # Compacted rows of the visible instances, allocated on first culling
+        self._compact = None
+
+    def _compact_buffers(self):
+        if self._compact is None:
+            instances, count = self._shape
+            self._compact = np.empty((instances, count, 3))
+            self._compact_points = np.empty((instances * count, 2))
+            self._compact_front = np.empty(instances * count, dtype=bool)
+        return self._compact, self._compact_points, self._compact_front
+
+    def cull(self, post=None):
+        """World matrices and the (K,) mask of instances reaching into the frustum"""
+        if self._instances != len(self.batch):
+            self._allocate_instances(len(self.batch))
+        world = self._world
+        if post is None:
+            np.copyto(world, self.batch.matrices)
+        else:
+            np.matmul(self.batch.matrices, post, out=world)
+
+        # Bounding spheres; the Frobenius norm bounds the largest stretch
+        # of any linear part
+        center, radius = self.batch.bounding_sphere()
+        # Contiguous copies keep the ufuncs below from allocating buffers
+        affine = self._affine
+        np.copyto(affine, world[:, :3, :])
+        self._sphere_center[:3] = center
+        np.matmul(affine, self._sphere_center[:, None], out=self._centers[:, :, None])
+        np.copyto(self._linear, affine[:, :, :3])
+        np.multiply(self._linear, self._linear, out=self._squares)
+        np.sum(self._squares, axis=(1, 2), out=self._radii)
+        np.sqrt(self._radii, out=self._radii)
+        self._radii *= radius
+        planes = self.frustum.planes
+        distances = self._plane_distances
+        np.matmul(planes[:, :3], self._centers.T, out=distances)
+        # Row by row, broadcasting would allocate ufunc buffers
+        for row, offset, length in zip(
+            distances, planes[:, 3], self.frustum._normal_lengths
+        ):
+            row += offset
+            row /= length
+            row += self._radii
+        np.greater_equal(distances, 0, out=self._inside_planes)
+        np.all(self._inside_planes, axis=0, out=self._visible)
+        self._visible_count = int(np.count_nonzero(self._visible))
+        # Indices only when something was culled; a full frame needs none
+        if self._visible_count < self._instances:
+            self._indices = np.flatnonzero(self._visible)
+        else:
+            self._indices = None
+        return self._visible
+
+    def transform(self, post=None, culled=False):
+        """Flattened (K * N, 3) world vertices and the mask of visible instances
+
+        With ``culled`` set, reuse the world matrices of the preceding
+        ``cull`` instead of recomputing them from ``post``.
+        """
+        if not culled:
+            self.cull(post)
+        instances, count = self._instances, len(self.batch.mesh.vertices)
+        if self._shape != (instances, count):
+            self._allocate_vertices(instances, count)
+        np.copyto(self._active, self._visible[:, None])
+        # Copied every frame, the mesh may be edited in place
+        np.copyto(self._homogeneous[:, :3], self.batch.mesh.vertices)
+
+        indices = self._indices
+        if indices is None:
+            np.matmul(
+                self._homogeneous, self._affine.transpose(0, 2, 1), out=self._vertices
+            )
+        else:
+            visible = self._visible_count
+            affine = self._visible_affine[:visible]
+            # "clip" writes straight into ``out``; "raise" buffers a copy
+            np.take(self._affine, indices, axis=0, out=affine, mode="clip")
+            vertices = self._compact_buffers()[0][:visible]
+            np.matmul(self._homogeneous, affine.transpose(0, 2, 1), out=vertices)
+            self._vertices[indices] = vertices
+        return self._vertices.reshape(-1, 3), self._active.reshape(-1)
+
+    def screen_radius(self):
+        """Largest projected bounding radius of a visible instance, in pixels
+
+        Measured at the last ``cull``; None before the first one.
+        """
+        if self._instances is None:
+            return None
+        visible = self._visible
+        if not visible.any():
+            return 0.0
+        radii = self._radii[visible]
+        depth = self._centers[visible, 2] + self.frustum.camera_distance - radii
+        focal = self.frustum.camera_distance * self.frustum.scale
+        return float((radii * focal / np.maximum(depth, NEAR_PLANE)).max())
+
+    def project(self):
+        """Screen points of the last ``transform``, like ``Frustum.project``"""
+        frustum = self.frustum
+        instances, count = self._shape
+        indices = self._indices
+        visible = self._visible_count
+        rows = visible * count
+        if indices is None:
+            vertices, points, front = self._vertices, self._points, self._front
+        else:
+            vertices, points, front = self._compact_buffers()
+            points, front = points[:rows], front[:rows]
+        vertices = vertices[:visible].reshape(-1, 3)
+        depth = self._depth[:rows]
+        behind = self._behind[:rows]
+        # Near plane first, the same test as ``Frustum.in_front``
+        np.add(vertices[:, 2], frustum.planes[0, 3], out=depth)
+        np.greater_equal(depth, 0, out=front)
+        np.add(vertices[:, 2], frustum.camera_distance, out=depth)
+        np.less_equal(depth, 0, out=behind)
+        np.copyto(depth, 0.1, where=behind)
+        np.divide(frustum.camera_distance * frustum.scale, depth, out=depth)
+        for axis in (0, 1):
+            # Column by column, broadcasting would allocate ufunc buffers
+            column = points[:, axis]
+            np.multiply(vertices[:, axis], depth, out=column)
+            column += frustum.center[axis]
+
+        if indices is not None:
+            self._front[...] = False
+            self._front.reshape(instances, count)[indices] = front.reshape(-1, count)
+            self._points.reshape(instances, count, 2)[indices] = points.reshape(
+                -1, count, 2
+            )
+        return self._points
+
+    @property
+    def front(self):
+        """Active vertices on the visible side of the near plane, from ``project``"""
+        return self._front
+
+
+def clipped_points(points, clipped):
+    """Every projected point that ends up on screen, for bounding rects"""
+    return np.concatenate((points[clipped.vertex_mask], clipped.starts, clipped.ends))
@@ -15,9 +15,31 @@ TRANSFORM_COLORS = {
 BACKGROUND_GRADIENT = [(120, 40, 200), (50, 10, 120)]  # Warna gradien ungu
 RED = (255, 0, 0)
 
+TEXT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+TEXT_CACHE_GLYPH_ATLAS = False
+
+
+SIMULATION_STEP = 1 / 120  # Detik per langkah simulasi
+RENDER_FPS = 60  # 0 berarti tanpa batas
+IDLE_FPS = 10
+IDLE_DELAY = 1.0  # Detik tanpa input sebelum laju render diturunkan
+IDLE_TIMEOUT = 1.0  # Batas tidur saat adegan diam, 0 berarti tunggu input
+ROTATION_SPEED = 60  # Derajat per detik
+TRANSITION_TIME = 0.3  # Detik animasi saat tumpukan transformasi berubah
 
 CAMERA_DISTANCE = 5
 SCALE = 100
+NEAR_PLANE = 0.1  # Jarak minimum dari kamera sebelum garis dipotong
+
+WIREFRAME_MODE = "strips"  # "strips" atau "pixels"
+COMPOSITE_MODE = "matrix"  # "matrix" atau "dual" untuk tumpukan rotasi dan translasi
+SOLID_LIGHT = (0.4, 0.6, 1.0)  # Arah cahaya untuk mode solid
+SOLID_AMBIENT = 0.25
+RENDER_WORKERS = 1  # Jumlah thread untuk rasterisasi mode solid
+RENDER_TILE_SIZE = 128
+VERTEX_CHUNK = 1 << 16  # Verteks per potongan saat mentransformasi mesh besar
+LOD_PIXEL_ERROR = 2.0  # Ukuran sel penyederhanaan maksimum di layar, dalam piksel
+LOD_HYSTERESIS = 0.25  # Pita toleransi agar level detail tidak berkedip
 
 INITIAL_VERTICES = [
     [-1, -1, -1],
@@ -30,6 +52,21 @@ INITIAL_VERTICES = [
     [-1, 1, 1],
 ]
 
+FACES = [
+    (0, 2, 1),
+    (0, 3, 2),
+    (4, 5, 6),
+    (4, 6, 7),
+    (0, 1, 5),
+    (0, 5, 4),
+    (3, 6, 2),
+    (3, 7, 6),
+    (0, 4, 7),
+    (0, 7, 3),
+    (1, 2, 6),
+    (1, 6, 5),
+]
+
 EDGES = [
     (0, 1),
     (1, 2),
@@ -1,72 +1,175 @@
 import numpy as np
 from math import sin, cos, radians
-import uuid
-from geometry_game.constants import CAMERA_DISTANCE
+import itertools
+import random
+from concurrent.futures import ThreadPoolExecutor
+from geometry_game.constants import CAMERA_DISTANCE, VERTEX_CHUNK
+from geometry_game.quaternion import (
+    DualQuaternion,
+    dual_product,
+    normalized_dual,
+    rigid_dual,
+)
+
+TRANSFORM_TYPES = ("scale", "rotate_x", "rotate_y", "rotate_z", "translate", "shear")
+
+# Parameter names of each transformation type, in storage order
+PARAM_NAMES = {
+    "scale": ("x", "y", "z"),
+    "rotate_x": ("angle",),
+    "rotate_y": ("angle",),
+    "rotate_z": ("angle",),
+    "translate": ("x", "y", "z"),
+    "shear": ("xy", "xz", "yx", "yz", "zx", "zy"),
+}
+
+
+_IDENTITY = np.identity(4)
+_transform_ids = itertools.count(1)
+
+
+def _write_scale(matrix, params):
+    matrix[0, 0] = float(params.get("x", 1.0))
+    matrix[1, 1] = float(params.get("y", 1.0))
+    matrix[2, 2] = float(params.get("z", 1.0))
+
+
+def _write_rotate_x(matrix, params):
+    angle = radians(float(params.get("angle", 0.0)))
+    c, s = cos(angle), sin(angle)
+    matrix[1, 1] = c
+    matrix[1, 2] = -s
+    matrix[2, 1] = s
+    matrix[2, 2] = c
+
+
+def _write_rotate_y(matrix, params):
+    angle = radians(float(params.get("angle", 0.0)))
+    c, s = cos(angle), sin(angle)
+    matrix[0, 0] = c
+    matrix[0, 2] = s
+    matrix[2, 0] = -s
+    matrix[2, 2] = c
+
+
+def _write_rotate_z(matrix, params):
+    angle = radians(float(params.get("angle", 0.0)))
+    c, s = cos(angle), sin(angle)
+    matrix[0, 0] = c
+    matrix[0, 1] = -s
+    matrix[1, 0] = s
+    matrix[1, 1] = c
+
+
+def _write_translate(matrix, params):
+    matrix[0, 3] = float(params.get("x", 0.0))
+    matrix[1, 3] = float(params.get("y", 0.0))
+    matrix[2, 3] = float(params.get("z", 0.0))
+
+
+def _write_shear(matrix, params):
+    matrix[0, 1] = float(params.get("xy", 0.0))
+    matrix[0, 2] = float(params.get("xz", 0.0))
+    matrix[1, 0] = float(params.get("yx", 0.0))
+    matrix[1, 2] = float(params.get("yz", 0.0))
+    matrix[2, 0] = float(params.get("zx", 0.0))
+    matrix[2, 1] = float(params.get("zy", 0.0))
+
+
+MATRIX_WRITERS = {
+    "scale": _write_scale,
+    "rotate_x": _write_rotate_x,
+    "rotate_y": _write_rotate_y,
+    "rotate_z": _write_rotate_z,
+    "translate": _write_translate,
+    "shear": _write_shear,
+}
+
+# Matrix cells of each parameter in PARAM_NAMES order, and the (i, j)
+# plane each rotation turns, as written by MATRIX_WRITERS
+_PARAM_CELLS = {
+    "scale": ((0, 0), (1, 1), (2, 2)),
+    "translate": ((0, 3), (1, 3), (2, 3)),
+    "shear": ((0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)),
+}
+_ROTATION_PLANES = {"rotate_x": (1, 2), "rotate_y": (2, 0), "rotate_z": (0, 1)}
+
+
+def matrices_from_arrays(types, params):
+    """(N, 4, 4) matrices of a stack stored as arrays, without Transformations
+
+    ``types`` holds indices into TRANSFORM_TYPES and each row of ``params``
+    the parameters in PARAM_NAMES order, so every type is written in one
+    vectorized pass.
+    """
+    types = np.asarray(types)
+    matrices = np.zeros((len(types), 4, 4))
+    matrices[:, [0, 1, 2, 3], [0, 1, 2, 3]] = 1.0
+    for code, transform_type in enumerate(TRANSFORM_TYPES):
+        rows = np.flatnonzero(types == code)
+        if len(rows) == 0:
+            continue
+        if transform_type in _ROTATION_PLANES:
+            i, j = _ROTATION_PLANES[transform_type]
+            angles = np.radians(params[rows, 0])
+            c, s = np.cos(angles), np.sin(angles)
+            matrices[rows, i, i] = c
+            matrices[rows, i, j] = -s
+            matrices[rows, j, i] = s
+            matrices[rows, j, j] = c
+        else:
+            for column, (i, j) in enumerate(_PARAM_CELLS[transform_type]):
+                matrices[rows, i, j] = params[rows, column]
+    return matrices
 
 
 class Transformation:
-    def __init__(self, transform_type, params=None):
-        self.id = str(uuid.uuid4())[:8]
+    """A single transformation whose 4x4 matrix is built on first use
+
+    The matrix lives in a buffer allocated once per transformation;
+    ``set_params`` and ``set_angle`` rewrite it in place, so a transformation
+    that is updated every frame does not allocate. A ``matrix`` already
+    built from ``params``, e.g. restored from a saved session, is adopted
+    as is.
+    """
+
+    __slots__ = ("id", "type", "params", "_matrix", "_stale")
+
+    def __init__(self, transform_type, params=None, matrix=None):
+        self.id = next(_transform_ids)
         self.type = transform_type
         self.params = params or {}
-        self.matrix = np.identity(4)
-        self.update_matrix()
+        if matrix is None:
+            self._matrix = np.empty((4, 4))
+        else:
+            self._matrix = np.array(matrix, dtype=float)
+        self._stale = matrix is None
+
+    @property
+    def matrix(self):
+        if self._stale:
+            self.update_matrix()
+        return self._matrix
 
     def update_matrix(self):
-        if self.type == "scale":
-            sx = float(self.params.get("x", 1.0))
-            sy = float(self.params.get("y", 1.0))
-            sz = float(self.params.get("z", 1.0))
-            self.matrix = np.array(
-                [[sx, 0, 0, 0], [0, sy, 0, 0], [0, 0, sz, 0], [0, 0, 0, 1]]
-            )
-        elif self.type == "rotate_x":
-            angle = radians(float(self.params.get("angle", 0.0)))
-            self.matrix = np.array(
-                [
-                    [1, 0, 0, 0],
-                    [0, cos(angle), -sin(angle), 0],
-                    [0, sin(angle), cos(angle), 0],
-                    [0, 0, 0, 1],
-                ]
-            )
-        elif self.type == "rotate_y":
-            angle = radians(float(self.params.get("angle", 0.0)))
-            self.matrix = np.array(
-                [
-                    [cos(angle), 0, sin(angle), 0],
-                    [0, 1, 0, 0],
-                    [-sin(angle), 0, cos(angle), 0],
-                    [0, 0, 0, 1],
-                ]
-            )
-        elif self.type == "rotate_z":
-            angle = radians(float(self.params.get("angle", 0.0)))
-            self.matrix = np.array(
-                [
-                    [cos(angle), -sin(angle), 0, 0],
-                    [sin(angle), cos(angle), 0, 0],
-                    [0, 0, 1, 0],
-                    [0, 0, 0, 1],
-                ]
-            )
-        elif self.type == "translate":
-            tx = float(self.params.get("x", 0.0))
-            ty = float(self.params.get("y", 0.0))
-            tz = float(self.params.get("z", 0.0))
-            self.matrix = np.array(
-                [[1, 0, 0, tx], [0, 1, 0, ty], [0, 0, 1, tz], [0, 0, 0, 1]]
-            )
-        elif self.type == "shear":
-            xy = float(self.params.get("xy", 0.0))
-            xz = float(self.params.get("xz", 0.0))
-            yx = float(self.params.get("yx", 0.0))
-            yz = float(self.params.get("yz", 0.0))
-            zx = float(self.params.get("zx", 0.0))
-            zy = float(self.params.get("zy", 0.0))
-            self.matrix = np.array(
-                [[1, xy, xz, 0], [yx, 1, yz, 0], [zx, zy, 1, 0], [0, 0, 0, 1]]
-            )
+        matrix = self._matrix
+        np.copyto(matrix, _IDENTITY)
+        writer = MATRIX_WRITERS.get(self.type)
+        if writer is not None:
+            writer(matrix, self.params)
+        self._stale = False
+
+    def set_params(self, params):
+        self.params.update(params)
+        self.update_matrix()
+
+    def set_angle(self, angle):
+        """Update a rotation in place without touching the rest of the matrix"""
+        self.params["angle"] = angle
+        if self._stale:
+            self.update_matrix()
+        else:
+            MATRIX_WRITERS[self.type](self._matrix, self.params)
 
     def get_display_text(self):
         if self.type == "scale":
@@ -81,6 +184,288 @@ class Transformation:
         return self.type
 
 
+def parse_transform(spec):
+    """Build a Transformation from a spec like ``rotate_x:angle=30``"""
+    transform_type, _, arguments = spec.partition(":")
+    transform_type = transform_type.strip()
+    if transform_type not in TRANSFORM_TYPES:
+        raise ValueError(f"Unknown transformation type: {transform_type}")
+    params = {}
+    for argument in filter(None, arguments.split(",")):
+        name, separator, value = argument.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid transformation parameter: {argument}")
+        params[name.strip()] = value.strip()
+    return Transformation(transform_type, params)
+
+
+class _StackNode:
+    """Treap node with the matrix product of its subtree
+
+    ``rigid`` is the transform's own dual quaternion and ``dual`` the fused
+    one of the subtree, None as soon as the subtree scales or shears.
+    """
+
+    __slots__ = (
+        "transform",
+        "priority",
+        "size",
+        "product",
+        "rigid",
+        "dual",
+        "left",
+        "right",
+    )
+
+    def __init__(self, transform, priority):
+        self.transform = transform
+        self.priority = priority
+        self.size = 1
+        self.product = transform.matrix
+        self.rigid = self.dual = rigid_dual(transform)
+        self.left = None
+        self.right = None
+
+    def update(self):
+        product = self.transform.matrix
+        dual = self.rigid
+        size = 1
+        if self.left is not None:
+            product = self.left.product @ product
+            dual = _dual_product(self.left.dual, dual)
+            size += self.left.size
+        if self.right is not None:
+            product = product @ self.right.product
+            dual = _dual_product(dual, self.right.dual)
+            size += self.right.size
+        self.product = product
+        self.dual = dual
+        self.size = size
+
+
+def _dual_product(a, b):
+    if a is None or b is None:
+        return None
+    return dual_product(a, b)
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _split(node, count):
+    """Split a subtree into its first ``count`` transforms and the rest"""
+    if node is None:
+        return None, None
+    if _size(node.left) >= count:
+        left, node.left = _split(node.left, count)
+        node.update()
+        return left, node
+    node.right, right = _split(node.right, count - _size(node.left) - 1)
+    node.update()
+    return node, right
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+class TransformStack:
+    """Ordered transformations with a cached composite matrix
+
+    The stack is kept in an implicit treap whose nodes store the product of
+    their subtree, so appending, inserting, deleting or moving a transform
+    only recomputes O(log n) matrix products instead of the whole chain.
+
+    A ``deferred`` stack starts from a base sequence whose composite is
+    already known, e.g. a restored session. Its transformations are only
+    built when accessed, and the base only moves into the treap once an
+    edit reaches into it; appends and edits after it never touch it.
+    """
+
+    def __init__(self, transformations=()):
+        self._random = random.Random(0)
+        self._base = None
+        self._root = self._build(transformations)
+
+    @classmethod
+    def deferred(cls, base, composite, rigid_composite=None):
+        """Stack over ``base`` with a known ``composite`` matrix
+
+        ``base`` is any sequence of transformations and ``rigid_composite``
+        its fused DualQuaternion, None if it scales or shears.
+        """
+        stack = cls()
+        stack._base = base
+        stack._base_items = {}
+        stack._base_composite = composite
+        stack._base_dual = None
+        if rigid_composite is not None:
+            stack._base_dual = (
+                tuple(rigid_composite.real.tolist()),
+                tuple(rigid_composite.dual.tolist()),
+            )
+        return stack
+
+    def __len__(self):
+        return self._base_length() + _size(self._root)
+
+    def __iter__(self):
+        for index in range(self._base_length()):
+            # Built on the fly unless already accessed, so a full pass does
+            # not keep every base transformation alive
+            yield self._base_items.get(index) or self._base[index]
+        pending = []
+        node = self._root
+        while pending or node is not None:
+            while node is not None:
+                pending.append(node)
+                node = node.left
+            node = pending.pop()
+            yield node.transform
+            node = node.right
+
+    def __getitem__(self, index):
+        index = self._normalize(index)
+        base_length = self._base_length()
+        if index < base_length:
+            if index not in self._base_items:
+                self._base_items[index] = self._base[index]
+            return self._base_items[index]
+        return self._node_at(index - base_length).transform
+
+    @property
+    def composite(self):
+        """Product of every matrix in the stack, in application order"""
+        if self._base is not None:
+            if self._root is None:
+                return self._base_composite
+            return self._base_composite @ self._root.product
+        if self._root is None:
+            return np.identity(4)
+        return self._root.product
+
+    @property
+    def rigid_composite(self):
+        """Fused DualQuaternion of the stack, None if anything scales or shears"""
+        if self._base is None:
+            if self._root is None:
+                return DualQuaternion.identity()
+            dual = self._root.dual
+        elif self._root is None:
+            dual = self._base_dual
+        else:
+            dual = _dual_product(self._base_dual, self._root.dual)
+        if dual is None:
+            return None
+        return DualQuaternion(*normalized_dual(dual))
+
+    def append(self, transform):
+        self._root = _merge(self._root, self._new_node(transform))
+
+    def insert(self, index, transform):
+        index = max(0, min(len(self), index if index >= 0 else len(self) + index))
+        index = self._treap_index(index, index < self._base_length())
+        left, right = _split(self._root, index)
+        self._root = _merge(_merge(left, self._new_node(transform)), right)
+
+    def pop(self, index=-1):
+        index = self._normalize(index)
+        index = self._treap_index(index, index < self._base_length())
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        return node.transform
+
+    def move(self, source, destination):
+        """Move the transform at ``source`` so it ends up at ``destination``"""
+        self.insert(destination, self.pop(source))
+
+    def refresh(self, index):
+        """Recompute cached products after the transform at ``index`` changed"""
+        index = self._normalize(index)
+        index = self._treap_index(index, index < self._base_length())
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        node.rigid = rigid_dual(node.transform)
+        node.update()
+        self._root = _merge(_merge(left, node), right)
+
+    def clear(self):
+        self._base = None
+        self._root = None
+
+    def _base_length(self):
+        return 0 if self._base is None else len(self._base)
+
+    def _treap_index(self, index, into_base):
+        """Position of ``index`` in the treap, moving the base in if it is hit"""
+        if self._base is None:
+            return index
+        if into_base:
+            items = (self[position] for position in range(len(self._base)))
+            self._root = _merge(self._build(items), self._root)
+            self._base = None
+            return index
+        return index - len(self._base)
+
+    def _new_node(self, transform):
+        return _StackNode(transform, self._random.random())
+
+    def _build(self, transformations):
+        """Treap of ``transformations`` in O(n), the shape n appends would give"""
+        spine = []
+        for transform in transformations:
+            node = self._new_node(transform)
+            while spine and spine[-1].priority <= node.priority:
+                node.left = spine.pop()
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+        if not spine:
+            return None
+
+        order = []
+        pending = [spine[0]]
+        while pending:
+            node = pending.pop()
+            order.append(node)
+            pending.extend(child for child in (node.left, node.right) if child)
+        for node in reversed(order):
+            node.update()
+        return spine[0]
+
+    def _normalize(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("transformation index out of range")
+        return index
+
+    def _node_at(self, index):
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index -= left_size + 1
+                node = node.right
+
+
 def project_point(point, camera_distance=CAMERA_DISTANCE):
     """Convert 3D point to 2D with perspective projection"""
     z = point[2] + camera_distance
@@ -91,15 +476,58 @@ def project_point(point, camera_distance=CAMERA_DISTANCE):
     return (x, y)
 
 
-def transform_vertices(vertices, transformations):
+def project_points(vertices, camera_distance=CAMERA_DISTANCE, scale=1.0, center=(0, 0)):
+    """Project an (N, 3) array of points to (N, 2) screen coordinates"""
+    vertices = np.asarray(vertices, dtype=float)
+    z = vertices[:, 2] + camera_distance
+    z = np.where(z <= 0, 0.1, z)
+    factor = (camera_distance * scale) / z
+
+    projected = vertices[:, :2] * factor[:, None]
+    projected += center
+    return projected
+
+
+def transform_vertices(
+    vertices, transformations, out=None, chunk_size=VERTEX_CHUNK, workers=1
+):
     """Apply all transformations to vertices"""
-    homogeneous_vertices = np.ones((vertices.shape[0], 4))
-    homogeneous_vertices[:, :3] = vertices
+    if isinstance(transformations, TransformStack):
+        matrix = transformations.composite
+    else:
+        matrix = np.identity(4)
+        for transform in transformations:
+            matrix = np.dot(matrix, transform.matrix)
+
+    return apply_matrix(vertices, matrix, out, chunk_size, workers)
+
+
+def apply_matrix(vertices, matrix, out=None, chunk_size=VERTEX_CHUNK, workers=1):
+    """Apply an affine 4x4 matrix to an (N, 3) array of vertices
 
-    combined_matrix = np.identity(4)
-    for transform in transformations:
-        combined_matrix = np.dot(combined_matrix, transform.matrix)
+    The 3x3 linear part and the translation are applied directly, without a
+    homogeneous copy, ``chunk_size`` rows at a time, so memory-mapped input
+    only ever needs chunk-sized temporaries. Results are written into
+    ``out`` when given, which may be a memmap too, and ``workers`` above 1
+    spreads the chunks over a thread pool.
+    """
+    if out is None:
+        out = np.empty((len(vertices), 3))
+    linear = np.ascontiguousarray(matrix[:3, :3].T)
+    translation = matrix[:3, 3]
 
-    transformed = np.dot(homogeneous_vertices, combined_matrix.T)
+    def transform_chunk(start):
+        stop = start + chunk_size
+        chunk = np.matmul(vertices[start:stop], linear)
+        chunk += translation
+        out[start:stop] = chunk
 
-    return transformed[:, :3]
+    starts = range(0, len(vertices), chunk_size)
+    if workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            # NumPy releases the GIL in matmul, so the chunks overlap
+            list(pool.map(transform_chunk, starts))
+    else:
+        for start in starts:
+            transform_chunk(start)
+    return out
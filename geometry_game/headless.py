@@ -0,0 +1,218 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import sys
+import pygame
+from geometry_game.ui import draw_background
+from geometry_game.geometry import Transformation
+from geometry_game.mesh import cube_mesh, load_mesh
+from geometry_game.pipeline import typed_transformation
+from geometry_game.render import SolidRenderer, WireframeRenderer, WIREFRAME_MODES
+from geometry_game.scene import grid_scene
+from geometry_game.timeline import Timeline
+from geometry_game.clipping import Frustum, ProjectionPipeline
+from geometry_game.constants import (
+    WIDTH,
+    HEIGHT,
+    WHITE,
+    ACCENT_PRIMARY,
+    WIREFRAME_MODE,
+    RENDER_WORKERS,
+    RENDER_FPS,
+    ROTATION_SPEED,
+)
+
+
+def render_frames(
+    mesh,
+    transformations=(),
+    frames=360,
+    size=(WIDTH, HEIGHT),
+    auto_rotate=True,
+    wireframe_mode=WIREFRAME_MODE,
+    grid=1,
+    solid=False,
+    workers=RENDER_WORKERS,
+    fps=RENDER_FPS,
+    timeline=None,
+):
+    """Render frames offscreen as fast as possible, yielding one Surface each
+
+    The same Surface is reused for every frame, so consumers have to encode
+    or copy it before asking for the next one. ``solid`` fills the mesh
+    faces through the z-buffer instead of drawing the wireframe, spread
+    over ``workers`` threads. Auto-rotation advances by time as if the
+    frames were played back at ``fps``. A ``timeline`` replaces
+    ``transformations``: its baked composite for each frame's time drives
+    the scene root.
+    """
+    if solid and mesh.faces is None:
+        raise ValueError("Solid rendering needs a mesh with faces")
+
+    if timeline is not None:
+        transformations = timeline.transformations
+    scene, scene_root, mesh_batch = grid_scene(mesh, grid, transformations)
+    scene.update()
+
+    surface = pygame.Surface(size)
+    wireframe = WireframeRenderer(
+        mesh_batch.instance_edges(),
+        wireframe_mode,
+        edge_color=ACCENT_PRIMARY,
+        vertex_color=WHITE,
+    )
+    solid_renderer = None
+    if solid:
+        solid_renderer = SolidRenderer(mesh_batch.instance_faces(), workers=workers)
+    frustum = Frustum(surface.get_rect(), margin=wireframe.vertex_radius)
+    projection = ProjectionPipeline(frustum, mesh_batch)
+
+    rotation = Transformation("rotate_y", {"angle": 0.0})
+
+    try:
+        for frame in range(frames):
+            if timeline is not None:
+                scene_root.local_matrix = timeline.matrix_at(frame / fps)
+                scene_root.invalidate()
+                scene.update()
+
+            object_matrix = None
+            if auto_rotate:
+                rotation.set_angle(frame * ROTATION_SPEED / fps % 360)
+                object_matrix = rotation.matrix
+
+            vertices, active = projection.transform(object_matrix)
+            projected_points = projection.project()
+            draw_background(surface)
+            if solid_renderer is not None:
+                solid_renderer.draw(surface, vertices, projected_points, active)
+            else:
+                clipped = frustum.clip_edges(
+                    vertices, mesh_batch.instance_edges(), active
+                )
+                wireframe.draw(surface, projected_points, clipped)
+            yield surface
+    finally:
+        if solid_renderer is not None:
+            solid_renderer.close()
+
+
+def export_png_sequence(frames, directory, pattern="frame_{:05d}.png"):
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for index, surface in enumerate(frames):
+        pygame.image.save(surface, os.path.join(directory, pattern.format(index)))
+        count += 1
+    return count
+
+
+def write_raw_rgb(frames, stream):
+    """Stream frames as packed rgb24, e.g. for ffmpeg -f rawvideo -pix_fmt rgb24"""
+    count = 0
+    for surface in frames:
+        stream.write(pygame.image.tobytes(surface, "RGB"))
+        count += 1
+    stream.flush()
+    return count
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m geometry_game.headless",
+        description="Render a mesh offscreen and export the frames",
+    )
+    parser.add_argument("--mesh", help="OBJ, PLY or STL file (default: cube)")
+    parser.add_argument(
+        "--frames",
+        type=int,
+        help="number of frames (default: 360, or one pass of the timeline)",
+    )
+    parser.add_argument("--width", type=int, default=WIDTH)
+    parser.add_argument("--height", type=int, default=HEIGHT)
+    parser.add_argument(
+        "--transform",
+        action="append",
+        default=[],
+        metavar="TYPE:NAME=VALUE,...",
+        help="append a transformation, e.g. scale:x=2,y=1,z=1",
+    )
+    parser.add_argument(
+        "--timeline",
+        metavar="FILE",
+        help="play a keyframe timeline saved as JSON instead of --transform",
+    )
+    parser.add_argument("--no-rotate", action="store_true")
+    parser.add_argument(
+        "--grid", type=int, default=1, metavar="N", help="N x N x N mesh instances"
+    )
+    parser.add_argument("--mode", choices=WIREFRAME_MODES, default=WIREFRAME_MODE)
+    parser.add_argument(
+        "--solid", action="store_true", help="flat-shaded faces instead of wireframe"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=RENDER_WORKERS,
+        help="threads rasterizing the solid mode tiles",
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=RENDER_FPS,
+        help="playback rate the auto-rotation is timed for",
+    )
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--out", help="directory for the PNG sequence")
+    output.add_argument(
+        "--raw", action="store_true", help="write raw rgb24 frames to stdout"
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.timeline and args.transform:
+        parser.error("--timeline and --transform cannot be combined")
+
+    try:
+        transformations = [typed_transformation(spec) for spec in args.transform]
+    except ValueError as error:
+        parser.error(str(error))
+
+    pygame.init()
+    mesh = load_mesh(args.mesh).normalized() if args.mesh else cube_mesh()
+    timeline = None
+    frame_count = 360
+    if args.timeline:
+        timeline = Timeline.load(args.timeline, fps=args.fps)
+        frame_count = timeline.frame_count
+    if args.frames is not None:
+        frame_count = args.frames
+
+    frames = render_frames(
+        mesh,
+        transformations,
+        frames=frame_count,
+        size=(args.width, args.height),
+        auto_rotate=not args.no_rotate,
+        wireframe_mode=args.mode,
+        grid=args.grid,
+        solid=args.solid,
+        workers=args.workers,
+        fps=args.fps,
+        timeline=timeline,
+    )
+    if args.raw:
+        count = write_raw_rgb(frames, sys.stdout.buffer)
+    else:
+        count = export_png_sequence(frames, args.out)
+
+    pygame.quit()
+    print(f"Rendered {count} frames", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
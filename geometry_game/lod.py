@@ -0,0 +1,173 @@
+import os
+import numpy as np
+from geometry_game.mesh import Mesh
+from geometry_game.constants import LOD_PIXEL_ERROR, LOD_HYSTERESIS
+
+LOD_CACHE_VERSION = 1
+
+
+def cluster_mesh(mesh, cells):
+    """Vertex-clustering simplification on a ``cells`` ** 3 grid
+
+    Vertices sharing a grid cell over the mesh bounding box merge into their
+    mean; edges and triangles that collapse are dropped and duplicates are
+    removed, keeping the winding of the first copy.
+    """
+    low, high = mesh.bounds()
+    size = float((high - low).max()) / cells
+    if len(mesh.vertices) == 0 or size == 0:
+        return mesh
+    coordinates = np.floor((mesh.vertices - low) / size).astype(np.int64)
+    np.clip(coordinates, 0, cells - 1, out=coordinates)
+    keys = (coordinates[:, 0] * cells + coordinates[:, 1]) * cells + coordinates[:, 2]
+    _, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    counts = np.bincount(inverse)
+    vertices = np.stack(
+        [np.bincount(inverse, mesh.vertices[:, axis]) for axis in range(3)], axis=1
+    )
+    vertices /= counts[:, None]
+
+    edges = inverse[mesh.edges]
+    edges = np.sort(edges[edges[:, 0] != edges[:, 1]], axis=1)
+    edges = np.unique(edges, axis=0) if len(edges) else edges.reshape(-1, 2)
+
+    faces = None
+    if mesh.faces is not None:
+        faces = inverse[mesh.faces]
+        faces = faces[
+            (faces[:, 0] != faces[:, 1])
+            & (faces[:, 1] != faces[:, 2])
+            & (faces[:, 2] != faces[:, 0])
+        ]
+        _, first = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+        faces = faces[np.sort(first)]
+    return Mesh(vertices, edges, faces, mesh.path)
+
+
+class LevelOfDetail:
+    """Precomputed simplifications of a mesh, picked by projected size
+
+    ``levels[0]`` is the mesh itself and every further level clusters it on
+    a coarser grid. ``errors`` holds each level's cell size relative to the
+    mesh's bounding radius, so ``error * screen_radius`` is roughly how far
+    the level strays from the mesh, in pixels. ``select`` keeps the coarsest
+    level under ``pixel_error`` and only switches once the error leaves a
+    ``hysteresis`` band around it, so levels do not flicker at a boundary.
+    """
+
+    def __init__(
+        self,
+        levels,
+        errors,
+        pixel_error=LOD_PIXEL_ERROR,
+        hysteresis=LOD_HYSTERESIS,
+    ):
+        self.levels = list(levels)
+        self.errors = np.asarray(errors, dtype=float)
+        self.pixel_error = pixel_error
+        self.hysteresis = hysteresis
+        self.level = 0
+        self._selected = False
+
+    def __len__(self):
+        return len(self.levels)
+
+    @property
+    def mesh(self):
+        return self.levels[self.level]
+
+    @classmethod
+    def build(cls, mesh, max_cells=256, reduction=0.5, **options):
+        """Cluster on grids from ``max_cells`` down to 2 cells per axis
+
+        A level is kept only when it has at most ``reduction`` times the
+        vertices of the previous one.
+        """
+        levels = [mesh]
+        errors = [0.0]
+        low, high = mesh.bounds()
+        extent = float((high - low).max())
+        radius = mesh.bounding_sphere()[1]
+        cells = max_cells
+        while cells >= 2 and radius > 0:
+            simplified = cluster_mesh(mesh, cells)
+            if len(simplified.vertices) <= reduction * len(levels[-1].vertices):
+                levels.append(simplified)
+                errors.append(extent / cells / radius)
+            cells //= 2
+        return cls(levels, errors, **options)
+
+    @classmethod
+    def for_mesh(cls, mesh, max_cells=256, reduction=0.5, **options):
+        """Levels cached next to ``mesh.path``, built and cached when missing"""
+        if mesh.path is None:
+            return cls.build(mesh, max_cells, reduction, **options)
+        cache_path = mesh.path + ".lod.npz"
+        stat = os.stat(mesh.path)
+        source = np.array([LOD_CACHE_VERSION, stat.st_size, stat.st_mtime_ns])
+        build_options = np.array([max_cells, reduction], dtype=float)
+        # Levels of a normalized copy differ from the raw file's
+        bounds = np.stack(mesh.bounds())
+        try:
+            with np.load(cache_path) as cache:
+                if (
+                    np.array_equal(cache["source"], source)
+                    and np.array_equal(cache["options"], build_options)
+                    and np.array_equal(cache["bounds"], bounds)
+                ):
+                    return cls._from_arrays(mesh, cache, **options)
+        except (OSError, KeyError, ValueError):
+            pass
+
+        lod = cls.build(mesh, max_cells, reduction, **options)
+        arrays = {
+            "source": source,
+            "options": build_options,
+            "bounds": bounds,
+            "errors": lod.errors,
+        }
+        for index, level in enumerate(lod.levels[1:], 1):
+            arrays[f"vertices_{index}"] = level.vertices
+            arrays[f"edges_{index}"] = level.edges
+            if level.faces is not None:
+                arrays[f"faces_{index}"] = level.faces
+        try:
+            np.savez(cache_path, **arrays)
+        except OSError:
+            # A read-only mesh directory just means no cache
+            pass
+        return lod
+
+    @classmethod
+    def _from_arrays(cls, mesh, cache, **options):
+        levels = [mesh]
+        for index in range(1, len(cache["errors"])):
+            faces = cache[f"faces_{index}"] if f"faces_{index}" in cache else None
+            levels.append(
+                Mesh(
+                    cache[f"vertices_{index}"],
+                    cache[f"edges_{index}"],
+                    faces,
+                    mesh.path,
+                )
+            )
+        return cls(levels, cache["errors"], **options)
+
+    def select(self, screen_radius):
+        """Level for a mesh ``screen_radius`` pixels across, None keeps the current one"""
+        if screen_radius is None or len(self.levels) == 1:
+            return self.level
+        errors = self.errors * screen_radius
+        if not self._selected:
+            # Nothing to flicker between yet
+            self._selected = True
+            self.level = int(np.searchsorted(errors, self.pixel_error, "right")) - 1
+        elif errors[self.level] > self.pixel_error * (1 + self.hysteresis):
+            self.level = int(np.searchsorted(errors, self.pixel_error, "right")) - 1
+        else:
+            relaxed = self.pixel_error * (1 - self.hysteresis)
+            coarsest = int(np.searchsorted(errors, relaxed, "right")) - 1
+            self.level = max(self.level, coarsest)
+        return self.level
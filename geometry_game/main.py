@@ -1,318 +1,725 @@
 import pygame
 import numpy as np
+import argparse
+import os
 import sys
 from geometry_game.ui import (
     GlassButton,
     main_font,
+    render_text,
     draw_background,
     PopupMenu,
     PopupForm,
     TransformListPopup,
 )
-from geometry_game.geometry import Transformation, project_point, transform_vertices
+from geometry_game.geometry import (
+    Transformation,
+)
 from geometry_game.constants import (
     WIDTH,
     HEIGHT,
     WHITE,
     ACCENT_PRIMARY,
     TEXT_COLOR,
-    CAMERA_DISTANCE,
-    SCALE,
-    INITIAL_VERTICES,
-    EDGES,
+    WIREFRAME_MODE,
+    COMPOSITE_MODE,
+    RENDER_WORKERS,
+    RENDER_FPS,
+    ROTATION_SPEED,
 )
+from geometry_game.mesh import cube_mesh, load_mesh
+from geometry_game.render import SolidRenderer, WireframeRenderer
+from geometry_game.scene import grid_scene
+from geometry_game.lod import LevelOfDetail
+from geometry_game.quaternion import StackTransition
+from geometry_game.clipping import Frustum, ProjectionPipeline, clipped_points
+from geometry_game.profiling import FrameLog, ProfilerOverlay, profiler
+from geometry_game.scheduler import Scheduler, interpolate
+from geometry_game.session import Session, SessionLog, restore_session, save_session
+
+
+class Game:
+    """The interactive scene, its widgets and one frame of the main loop
+
+    ``frame`` handles a batch of events, advances the simulation and draws
+    whatever changed, without waiting for the next frame; ``main`` paces
+    the calls, so the benchmarks can drive the same frame body.
+    """
+
+    def __init__(
+        self,
+        screen,
+        mesh_path=None,
+        profile_log=None,
+        grid=1,
+        workers=RENDER_WORKERS,
+        fps=RENDER_FPS,
+        session_path=None,
+        lod=True,
+        composite=COMPOSITE_MODE,
+    ):
+        self.screen = screen
+        self.session_path = session_path
+        self.session = Session()
+        self.autosave = None
+        if session_path:
+            self.session = restore_session(session_path) or self.session
+            self.autosave = SessionLog(session_path + ".log")
+            if mesh_path is None:
+                mesh_path = self.session.mesh_path
+        if mesh_path:
+            mesh_path = os.path.abspath(mesh_path)
+        self.mesh_path = mesh_path
+
+        mesh = load_mesh(mesh_path).normalized() if mesh_path else cube_mesh()
+
+        self.scheduler = Scheduler(fps=fps)
+        self.running = True
+
+        self.transformations = self.session.stack()
+        self.scene, self.scene_root, self.mesh_batch = grid_scene(
+            mesh, grid, self.transformations
+        )
+        # "dual" renders rigid stacks from the treap's fused dual quaternion
+        self.scene_root.fused = composite == "dual"
+        self.wireframe = WireframeRenderer(
+            self.mesh_batch.instance_edges(),
+            WIREFRAME_MODE,
+            edge_color=ACCENT_PRIMARY,
+            vertex_color=WHITE,
+        )
+        # Simplified levels take over when the mesh gets small on screen
+        self.level_of_detail = LevelOfDetail.for_mesh(mesh) if lod else None
+        self.detail_level = 0
+        self.wireframes = {0: self.wireframe}
+        self.solid = None
+        if mesh.faces is not None:
+            self.solid = SolidRenderer(
+                self.mesh_batch.instance_faces(),
+                camera_distance=self.session.camera_distance,
+                scale=self.session.scale,
+                workers=workers,
+            )
+        self.solid_mode = False
+        self.frustum = Frustum(
+            screen.get_rect(),
+            camera_distance=self.session.camera_distance,
+            scale=self.session.scale,
+            margin=self.wireframe.vertex_radius,
+        )
+        self.projection = ProjectionPipeline(self.frustum, self.mesh_batch)
 
+        self.view_transforms_button = GlassButton(
+            20, 20, 250, 50, "Applied Transformations"
+        )
+        self.add_transform_button = GlassButton(20, 80, 250, 50, "Add Transformation")
 
-def main():
-
-    pygame.init()
-
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("3D Matrix Transformation")
+        self.transform_menu = PopupMenu(
+            20,
+            140,
+            200,
+            ["Scale", "Rotate X", "Rotate Y", "Rotate Z", "Translate", "Shear"],
+        )
 
-    initial_vertices = np.array(INITIAL_VERTICES, dtype=float)
+        self.popup_forms = {
+            "Scale": PopupForm(
+                "Scale Transformation",
+                [
+                    {
+                        "name": "x",
+                        "label": "Scale X:",
+                        "placeholder": "1.0",
+                        "value": "1",
+                    },
+                    {
+                        "name": "y",
+                        "label": "Scale Y:",
+                        "placeholder": "1.0",
+                        "value": "1",
+                    },
+                    {
+                        "name": "z",
+                        "label": "Scale Z:",
+                        "placeholder": "1.0",
+                        "value": "1",
+                    },
+                ],
+            ),
+            "Rotate X": PopupForm(
+                "Rotate X Transformation",
+                [
+                    {
+                        "name": "angle",
+                        "label": "Angle (degrees):",
+                        "placeholder": "45.0",
+                        "value": "45",
+                    }
+                ],
+            ),
+            "Rotate Y": PopupForm(
+                "Rotate Y Transformation",
+                [
+                    {
+                        "name": "angle",
+                        "label": "Angle (degrees):",
+                        "placeholder": "45.0",
+                        "value": "45",
+                    }
+                ],
+            ),
+            "Rotate Z": PopupForm(
+                "Rotate Z Transformation",
+                [
+                    {
+                        "name": "angle",
+                        "label": "Angle (degrees):",
+                        "placeholder": "45.0",
+                        "value": "45",
+                    }
+                ],
+            ),
+            "Translate": PopupForm(
+                "Translate Transformation",
+                [
+                    {
+                        "name": "x",
+                        "label": "Translate X:",
+                        "placeholder": "0.5",
+                        "value": "0",
+                    },
+                    {
+                        "name": "y",
+                        "label": "Translate Y:",
+                        "placeholder": "0.5",
+                        "value": "0",
+                    },
+                    {
+                        "name": "z",
+                        "label": "Translate Z:",
+                        "placeholder": "0.5",
+                        "value": "0",
+                    },
+                ],
+            ),
+            "Shear": PopupForm(
+                "Shear Transformation",
+                [
+                    {
+                        "name": "xy",
+                        "label": "Shear XY:",
+                        "placeholder": "0.0",
+                        "value": "0",
+                    },
+                    {
+                        "name": "xz",
+                        "label": "Shear XZ:",
+                        "placeholder": "0.0",
+                        "value": "0",
+                    },
+                    {
+                        "name": "yx",
+                        "label": "Shear YX:",
+                        "placeholder": "0.0",
+                        "value": "0",
+                    },
+                    {
+                        "name": "yz",
+                        "label": "Shear YZ:",
+                        "placeholder": "0.0",
+                        "value": "0",
+                    },
+                    {
+                        "name": "zx",
+                        "label": "Shear ZX:",
+                        "placeholder": "0.0",
+                        "value": "0",
+                    },
+                    {
+                        "name": "zy",
+                        "label": "Shear ZY:",
+                        "placeholder": "0.0",
+                        "value": "0",
+                    },
+                ],
+            ),
+        }
+
+        self.current_popup_form = None
+        self.transform_list_popup = TransformListPopup(self.transformations)
+
+        self.profiler_overlay = ProfilerOverlay(profiler, WIDTH - 300, 20)
+        self.frame_log = None
+        if profile_log:
+            self.frame_log = FrameLog(profile_log)
+            self._unsubscribe_log = profiler.subscribe(self.frame_log)
+
+        self.widgets = [
+            self.view_transforms_button,
+            self.add_transform_button,
+            self.transform_menu,
+            self.transform_list_popup,
+            *self.popup_forms.values(),
+            self.profiler_overlay,
+        ]
+
+        self.help_text = render_text(
+            main_font, "Press SPACE to toggle auto-rotation", True, TEXT_COLOR
+        )
 
-    clock = pygame.time.Clock()
-    running = True
+        self.auto_rotate = self.session.auto_rotate
+        self.rotation_angle = self.session.rotation_angle
+        self.previous_angle = self.rotation_angle
+        self.auto_rotation = Transformation("rotate_y", {"angle": 0.0})
+        # Rigid stack edits ease in through dual-quaternion blending
+        self.transition = StackTransition()
+        self.transition.retarget(self.transformations, ease=False)
+
+        self.projected_points = np.empty((0, 2))
+        self.transformed_vertices = None
+        self.active = None
+        self.clipped = None
+        self.scene_rect = None
+        self.scene_changed = True
+        self.full_redraw = True
+
+    def frame(self, events):
+        """Run one frame over ``events`` and return whether the scene is static
+
+        A static frame neither animates nor draws anything, so the caller
+        may block until input arrives.
+        """
+        profiler.begin_frame()
+
+        with profiler.span("events"):
+            for event in events:
+                self.handle_event(event)
+
+        self.simulate()
+        dirty_rects = self.draw()
+
+        profiler.end_frame()
+        return not self.auto_rotate and not dirty_rects
+
+    def handle_event(self, event):
+        self.scheduler.poke()
+        if event.type == pygame.QUIT:
+            self.running = False
+
+        if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+            self.full_redraw = True
+
+        if self.add_transform_button.is_clicked(event):
+            self.transform_menu.show()
+
+        if self.view_transforms_button.is_clicked(event):
+            self.transform_list_popup.update_transformations(self.transformations)
+            self.transform_list_popup.show()
+
+        transform_option = self.transform_menu.handle_event(event)
+        if transform_option:
+            self.popup_forms[transform_option].reset_values()
+            self.popup_forms[transform_option].show()
+            self.current_popup_form = transform_option
+
+        if self.transform_list_popup.visible:
+            list_result = self.transform_list_popup.handle_event(event)
+            if list_result:
+                if list_result.get("action") == "delete":
+                    index = list_result.get("index")
+                    if 0 <= index < len(self.transformations):
+                        self.transformations.pop(index)
+                        if self.autosave is not None:
+                            self.autosave.pop(index)
+                        self.stack_changed()
+                elif list_result.get("action") == "close":
+                    pass
+        if self.current_popup_form:
+            form_result = self.popup_forms[self.current_popup_form].handle_event(event)
+            if form_result and form_result.get("action") == "apply":
+                self.apply_form(form_result.get("values", {}))
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+            self.auto_rotate = not self.auto_rotate
+            self.scene_changed = True
+            if self.autosave is not None:
+                self.autosave.rotation(self.auto_rotate, self.rotation_angle)
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+            self.wireframe.toggle_mode()
+            self.full_redraw = True
+
+        if (
+            event.type == pygame.KEYDOWN
+            and event.key == pygame.K_f
+            and self.solid is not None
+        ):
+            self.solid_mode = not self.solid_mode
+            self.scene_changed = True
+
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.profiler_overlay.toggle()
+
+    def apply_form(self, values):
+        """Append the transformation entered in the current popup form"""
+        current_popup_form = self.current_popup_form
+        if current_popup_form == "Scale":
+            new_transform = Transformation(
+                "scale",
+                {
+                    "x": values.get("x", "1"),
+                    "y": values.get("y", "1"),
+                    "z": values.get("z", "1"),
+                },
+            )
+            self.transformations.append(new_transform)
 
-    transformations = []
+        elif current_popup_form == "Rotate X":
+            new_transform = Transformation(
+                "rotate_x", {"angle": values.get("angle", "45")}
+            )
+            self.transformations.append(new_transform)
 
-    view_transforms_button = GlassButton(20, 20, 250, 50, "Applied Transformations")
-    add_transform_button = GlassButton(20, 80, 250, 50, "Add Transformation")
+        elif current_popup_form == "Rotate Y":
+            new_transform = Transformation(
+                "rotate_y", {"angle": values.get("angle", "45")}
+            )
+            self.transformations.append(new_transform)
 
-    transform_menu = PopupMenu(
-        20,
-        140,
-        200,
-        ["Scale", "Rotate X", "Rotate Y", "Rotate Z", "Translate", "Shear"],
-    )
+        elif current_popup_form == "Rotate Z":
+            new_transform = Transformation(
+                "rotate_z", {"angle": values.get("angle", "45")}
+            )
+            self.transformations.append(new_transform)
 
-    popup_forms = {
-        "Scale": PopupForm(
-            "Scale Transformation",
-            [
-                {"name": "x", "label": "Scale X:", "placeholder": "1.0", "value": "1"},
-                {"name": "y", "label": "Scale Y:", "placeholder": "1.0", "value": "1"},
-                {"name": "z", "label": "Scale Z:", "placeholder": "1.0", "value": "1"},
-            ],
-        ),
-        "Rotate X": PopupForm(
-            "Rotate X Transformation",
-            [
-                {
-                    "name": "angle",
-                    "label": "Angle (degrees):",
-                    "placeholder": "45.0",
-                    "value": "45",
-                }
-            ],
-        ),
-        "Rotate Y": PopupForm(
-            "Rotate Y Transformation",
-            [
-                {
-                    "name": "angle",
-                    "label": "Angle (degrees):",
-                    "placeholder": "45.0",
-                    "value": "45",
-                }
-            ],
-        ),
-        "Rotate Z": PopupForm(
-            "Rotate Z Transformation",
-            [
-                {
-                    "name": "angle",
-                    "label": "Angle (degrees):",
-                    "placeholder": "45.0",
-                    "value": "45",
-                }
-            ],
-        ),
-        "Translate": PopupForm(
-            "Translate Transformation",
-            [
-                {
-                    "name": "x",
-                    "label": "Translate X:",
-                    "placeholder": "0.5",
-                    "value": "0",
-                },
-                {
-                    "name": "y",
-                    "label": "Translate Y:",
-                    "placeholder": "0.5",
-                    "value": "0",
-                },
-                {
-                    "name": "z",
-                    "label": "Translate Z:",
-                    "placeholder": "0.5",
-                    "value": "0",
-                },
-            ],
-        ),
-        "Shear": PopupForm(
-            "Shear Transformation",
-            [
-                {
-                    "name": "xy",
-                    "label": "Shear XY:",
-                    "placeholder": "0.0",
-                    "value": "0",
-                },
+        elif current_popup_form == "Translate":
+            new_transform = Transformation(
+                "translate",
                 {
-                    "name": "xz",
-                    "label": "Shear XZ:",
-                    "placeholder": "0.0",
-                    "value": "0",
-                },
-                {
-                    "name": "yx",
-                    "label": "Shear YX:",
-                    "placeholder": "0.0",
-                    "value": "0",
-                },
-                {
-                    "name": "yz",
-                    "label": "Shear YZ:",
-                    "placeholder": "0.0",
-                    "value": "0",
-                },
-                {
-                    "name": "zx",
-                    "label": "Shear ZX:",
-                    "placeholder": "0.0",
-                    "value": "0",
+                    "x": values.get("x", "0"),
+                    "y": values.get("y", "0"),
+                    "z": values.get("z", "0"),
                 },
+            )
+            self.transformations.append(new_transform)
+
+        elif current_popup_form == "Shear":
+            new_transform = Transformation(
+                "shear",
                 {
-                    "name": "zy",
-                    "label": "Shear ZY:",
-                    "placeholder": "0.0",
-                    "value": "0",
+                    "xy": values.get("xy", "0"),
+                    "xz": values.get("xz", "0"),
+                    "yx": values.get("yx", "0"),
+                    "yz": values.get("yz", "0"),
+                    "zx": values.get("zx", "0"),
+                    "zy": values.get("zy", "0"),
                 },
-            ],
-        ),
-    }
-
-    current_popup_form = None
-    transform_list_popup = TransformListPopup(transformations)
-
-    auto_rotate = True
-    rotation_angle = 0
-
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-            if add_transform_button.is_clicked(event):
-                transform_menu.show()
-
-            if view_transforms_button.is_clicked(event):
-                transform_list_popup.update_transformations(transformations)
-                transform_list_popup.show()
-
-            transform_option = transform_menu.handle_event(event)
-            if transform_option:
-                popup_forms[transform_option].reset_values()
-                popup_forms[transform_option].show()
-                current_popup_form = transform_option
-
-            if transform_list_popup.visible:
-                list_result = transform_list_popup.handle_event(event)
-                if list_result:
-                    if list_result.get("action") == "delete":
-                        index = list_result.get("index")
-                        if 0 <= index < len(transformations):
-                            transformations.pop(index)
-                            transform_list_popup.update_transformations(transformations)
-                    elif list_result.get("action") == "close":
-                        pass
-
-            if current_popup_form:
-                form_result = popup_forms[current_popup_form].handle_event(event)
-                if form_result and form_result.get("action") == "apply":
-                    values = form_result.get("values", {})
-
-                    if current_popup_form == "Scale":
-                        new_transform = Transformation(
-                            "scale",
-                            {
-                                "x": values.get("x", "1"),
-                                "y": values.get("y", "1"),
-                                "z": values.get("z", "1"),
-                            },
-                        )
-                        transformations.append(new_transform)
-
-                    elif current_popup_form == "Rotate X":
-                        new_transform = Transformation(
-                            "rotate_x", {"angle": values.get("angle", "45")}
-                        )
-                        transformations.append(new_transform)
-
-                    elif current_popup_form == "Rotate Y":
-                        new_transform = Transformation(
-                            "rotate_y", {"angle": values.get("angle", "45")}
-                        )
-                        transformations.append(new_transform)
-
-                    elif current_popup_form == "Rotate Z":
-                        new_transform = Transformation(
-                            "rotate_z", {"angle": values.get("angle", "45")}
-                        )
-                        transformations.append(new_transform)
-
-                    elif current_popup_form == "Translate":
-                        new_transform = Transformation(
-                            "translate",
-                            {
-                                "x": values.get("x", "0"),
-                                "y": values.get("y", "0"),
-                                "z": values.get("z", "0"),
-                            },
-                        )
-                        transformations.append(new_transform)
-
-                    elif current_popup_form == "Shear":
-                        new_transform = Transformation(
-                            "shear",
-                            {
-                                "xy": values.get("xy", "0"),
-                                "xz": values.get("xz", "0"),
-                                "yx": values.get("yx", "0"),
-                                "yz": values.get("yz", "0"),
-                                "zx": values.get("zx", "0"),
-                                "zy": values.get("zy", "0"),
-                            },
-                        )
-                        transformations.append(new_transform)
-
-                    transform_list_popup.update_transformations(transformations)
-                    current_popup_form = None
-
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                auto_rotate = not auto_rotate
-
-        if auto_rotate:
-            rotation_angle += 1
-            if rotation_angle >= 360:
-                rotation_angle = 0
-
-        draw_background(screen)
-
-        view_transforms_button.draw(screen)
-        add_transform_button.draw(screen)
-
-        auto_rotation = Transformation("rotate_y", {"angle": str(rotation_angle)})
-        view_transformations = transformations.copy()
-        if auto_rotate:
-            view_transformations.append(auto_rotation)
-
-        transformed_vertices = transform_vertices(
-            initial_vertices, view_transformations
-        )
-
-        projected_points = []
-        for vertex in transformed_vertices:
-            point_2d = project_point(vertex, CAMERA_DISTANCE)
-            x = point_2d[0] * SCALE + WIDTH // 2
-            y = point_2d[1] * SCALE + HEIGHT // 2
-            projected_points.append((x, y))
-
-        for edge in EDGES:
-            pygame.draw.line(
-                screen,
-                ACCENT_PRIMARY,
-                projected_points[edge[0]],
-                projected_points[edge[1]],
-                2,
             )
+            self.transformations.append(new_transform)
+
+        if self.autosave is not None:
+            self.autosave.append(self.transformations[-1])
+        self.current_popup_form = None
+        self.stack_changed()
+
+    def stack_changed(self):
+        self.transform_list_popup.update_transformations(self.transformations)
+        self.transition.retarget(self.transformations)
+        self.scene_root.invalidate()
+        self.scene_changed = True
+
+    def simulate(self):
+        """Run the fixed simulation steps due since the previous frame"""
+        scheduler = self.scheduler
+        for _ in range(scheduler.advance()):
+            self.previous_angle = self.rotation_angle
+            if self.auto_rotate:
+                self.rotation_angle += ROTATION_SPEED * scheduler.step
+            self.transition.advance(scheduler.step)
+        if self.rotation_angle >= 360:
+            self.rotation_angle -= 360
+            self.previous_angle -= 360
+
+        if self.auto_rotate:
+            scheduler.poke()
+            self.scene_changed = True
+
+        scene_root = self.scene_root
+        if self.transition.active:
+            scene_root.local_matrix = self.transition.matrix()
+            scene_root.invalidate()
+            scheduler.poke()
+            self.scene_changed = True
+        elif scene_root.local_matrix is not None:
+            scene_root.local_matrix = None
+            scene_root.invalidate()
+            self.scene_changed = True
+
+    def update_scene(self):
+        """Transform and project the scene and return the screen rect it covers"""
+        projection = self.projection
+        mesh_batch = self.mesh_batch
+        with profiler.span("transform"):
+            self.scene.update()
+            object_matrix = None
+            if self.auto_rotate:
+                self.auto_rotation.set_angle(
+                    interpolate(
+                        self.previous_angle,
+                        self.rotation_angle,
+                        self.scheduler.alpha,
+                    )
+                )
+                object_matrix = self.auto_rotation.matrix
+
+            visible = projection.cull(object_matrix)
+            # Pick the level from this frame's projected size before any
+            # vertex is transformed, so a dense mesh is never drawn in full
+            if self.level_of_detail is not None and visible.any():
+                level = self.level_of_detail.select(projection.screen_radius())
+                if level != self.detail_level:
+                    self.set_detail_level(level)
+            self.transformed_vertices, self.active = projection.transform(culled=True)
+
+        with profiler.span("projection"):
+            self.projected_points = projection.project()
+            if self.solid_mode:
+                visible_points = self.projected_points[projection.front]
+            else:
+                self.clipped = self.frustum.clip_edges(
+                    self.transformed_vertices,
+                    mesh_batch.instance_edges(),
+                    self.active,
+                )
+                visible_points = clipped_points(self.projected_points, self.clipped)
+            return _points_rect(visible_points, self.screen.get_rect())
+
+    def set_detail_level(self, level):
+        self.detail_level = level
+        self.mesh_batch.set_mesh(self.level_of_detail.mesh)
+        if level not in self.wireframes:
+            self.wireframes[level] = WireframeRenderer(
+                self.mesh_batch.instance_edges(),
+                self.wireframe.mode,
+                edge_color=ACCENT_PRIMARY,
+                vertex_color=WHITE,
+            )
+        self.wireframes[level].mode = self.wireframe.mode
+        self.wireframe = self.wireframes[level]
+        if self.solid is not None:
+            self.solid.faces = self.mesh_batch.instance_faces()
+
+    def draw(self):
+        """Redraw and present what changed, returning the dirty rects"""
+        screen = self.screen
+        dirty_rects = []
+
+        if self.scene_changed:
+            new_scene_rect = self.update_scene()
+            if self.scene_rect is not None:
+                dirty_rects.append(new_scene_rect.union(self.scene_rect))
+            else:
+                dirty_rects.append(new_scene_rect)
+            self.scene_rect = new_scene_rect
+            self.scene_changed = False
+
+        for widget in self.widgets:
+            if widget.is_dirty():
+                dirty_rects.append(widget.dirty_rect())
+
+        if self.full_redraw:
+            dirty_rects = [screen.get_rect()]
+            self.full_redraw = False
+
+        if dirty_rects:
+            screen.set_clip(dirty_rects[0].unionall(dirty_rects[1:]))
+
+            with profiler.span("background"):
+                draw_background(screen)
+
+            with profiler.span("widgets"):
+                self.view_transforms_button.draw(screen)
+                self.add_transform_button.draw(screen)
+
+            with profiler.span("edges"):
+                if self.solid_mode:
+                    self.solid.draw(
+                        screen,
+                        self.transformed_vertices,
+                        self.projected_points,
+                        self.active,
+                    )
+                else:
+                    self.wireframe.draw(screen, self.projected_points, self.clipped)
+
+            with profiler.span("widgets"):
+                screen.blit(self.help_text, (WIDTH - 300, HEIGHT - 50))
+
+                self.transform_menu.draw(screen)
+                self.transform_list_popup.draw(screen)
+
+                for popup_form in self.popup_forms.values():
+                    popup_form.draw(screen)
+
+                if self.transform_list_popup and self.transform_list_popup.visible:
+                    self.transform_list_popup.draw(screen)
+
+                self.profiler_overlay.draw(screen)
+
+            screen.set_clip(None)
+            with profiler.span("present"):
+                pygame.display.update(dirty_rects)
+
+        return dirty_rects
+
+    def close(self):
+        """Save the session and release the logs and renderer threads"""
+        if self.autosave is not None:
+            save_session(
+                self.session_path,
+                Session.capture(
+                    self.transformations,
+                    mesh_path=self.mesh_path,
+                    rotation_angle=self.rotation_angle,
+                    auto_rotate=self.auto_rotate,
+                    camera_distance=self.session.camera_distance,
+                    scale=self.session.scale,
+                ),
+            )
+            self.autosave.close()
+            os.remove(self.autosave.path)
+        if self.frame_log is not None:
+            self._unsubscribe_log()
+            self.frame_log.close()
+        if self.solid is not None:
+            self.solid.close()
+
+
+def main(
+    mesh_path=None,
+    profile_log=None,
+    grid=1,
+    workers=RENDER_WORKERS,
+    fps=RENDER_FPS,
+    session_path=None,
+    lod=True,
+    composite=COMPOSITE_MODE,
+):
 
-        for point in projected_points:
-            pygame.draw.circle(screen, WHITE, (int(point[0]), int(point[1])), 5)
-
-        help_text = main_font.render(
-            "Press SPACE to toggle auto-rotation", True, TEXT_COLOR
-        )
-        screen.blit(help_text, (WIDTH - 300, HEIGHT - 50))
-
-        transform_menu.draw(screen)
-        transform_list_popup.draw(screen)
+    pygame.init()
 
-        if current_popup_form and popup_forms[current_popup_form].visible:
-            popup_forms[current_popup_form].draw(screen)
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("3D Matrix Transformation")
 
-        if transform_list_popup and transform_list_popup.visible:
-            transform_list_popup.draw(screen)
+    game = Game(
+        screen,
+        mesh_path,
+        profile_log=profile_log,
+        grid=grid,
+        workers=workers,
+        fps=fps,
+        session_path=session_path,
+        lod=lod,
+        composite=composite,
+    )
+    pending_events = []
+    while game.running:
+        static = game.frame(pending_events + pygame.event.get())
+        if game.running:
+            # Nothing animates and nothing was drawn: sleep until input arrives
+            pending_events = game.scheduler.wait(static)
 
-        pygame.display.flip()
-        clock.tick(60)
+    game.close()
 
     pygame.quit()
     sys.exit()
 
 
+def _points_rect(points, screen_rect, margin=8):
+    """Screen rect covering the wireframe drawn through the given points"""
+    if len(points) == 0:
+        return pygame.Rect(0, 0, 0, 0)
+    min_x, min_y = points.min(axis=0)
+    max_x, max_y = points.max(axis=0)
+    left = max(screen_rect.left, int(min_x) - margin)
+    top = max(screen_rect.top, int(min_y) - margin)
+    right = min(screen_rect.right, int(max_x) + margin + 1)
+    bottom = min(screen_rect.bottom, int(max_y) + margin + 1)
+    return pygame.Rect(left, top, max(0, right - left), max(0, bottom - top))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m geometry_game",
+        description="Apply 3D matrix transformations to a mesh interactively",
+        epilog="Run 'python -m geometry_game apply --help' for the scripted "
+        "pipeline.",
+    )
+    parser.add_argument("mesh", nargs="?", help="OBJ, PLY or STL file (default: cube)")
+    parser.add_argument(
+        "--profile-log",
+        metavar="PATH",
+        help="append per-frame timings to a rolling .csv or .jsonl log",
+    )
+    parser.add_argument(
+        "--grid",
+        type=int,
+        default=1,
+        metavar="N",
+        help="draw an N x N x N grid of instances of the mesh",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=RENDER_WORKERS,
+        help="threads rasterizing the solid mode tiles",
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=RENDER_FPS,
+        help="render rate cap while active, 0 for uncapped",
+    )
+    parser.add_argument(
+        "--session",
+        metavar="PATH",
+        help="restore the session from PATH and save it there on exit "
+        "(binary, or JSON for a .json path)",
+    )
+    parser.add_argument(
+        "--no-lod",
+        action="store_true",
+        help="always draw the full mesh instead of simplified levels of detail",
+    )
+    parser.add_argument(
+        "--composite",
+        choices=("matrix", "dual"),
+        default=COMPOSITE_MODE,
+        help="compose rotation and translation stacks as a matrix chain or "
+        "from the fused dual quaternion",
+    )
+    return parser
+
+
+def run(argv=None):
+    """Open the window, or run a subcommand such as ``apply`` without one"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["apply"]:
+        from geometry_game.pipeline import main as apply_main
+
+        return apply_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    main(
+        args.mesh,
+        profile_log=args.profile_log,
+        grid=args.grid,
+        workers=args.workers,
+        fps=args.fps,
+        session_path=args.session,
+        lod=not args.no_lod,
+        composite=args.composite,
+    )
+
+
 if __name__ == "__main__":
-    main()
+    run()
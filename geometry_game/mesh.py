@@ -0,0 +1,512 @@
+import os
+import numpy as np
+from geometry_game.constants import INITIAL_VERTICES, EDGES, FACES
+
+PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+STL_RECORD = np.dtype(
+    [
+        ("normal", "<f4", (3,)),
+        ("vertices", "<f4", (3, 3)),
+        ("attribute", "<u2"),
+    ]
+)
+
+# One float32 position as a single sortable record, compared by value
+_CORNER = np.dtype([("x", "f4"), ("y", "f4"), ("z", "f4")])
+
+
+class Mesh:
+    """Vertices, edges and triangles stored as contiguous NumPy arrays"""
+
+    def __init__(self, vertices, edges=None, faces=None, path=None):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self.faces = (
+            None
+            if faces is None
+            else np.ascontiguousarray(faces, dtype=np.int32).reshape(-1, 3)
+        )
+        if edges is None:
+            edges = (
+                edges_from_faces(self.faces)
+                if self.faces is not None
+                else np.empty((0, 2))
+            )
+        self.edges = np.ascontiguousarray(edges, dtype=np.int32).reshape(-1, 2)
+        self.path = path
+
+    def __repr__(self):
+        faces = 0 if self.faces is None else len(self.faces)
+        return f"Mesh({len(self.vertices)} vertices, {len(self.edges)} edges, {faces} faces)"
+
+    def bounds(self):
+        if len(self.vertices) == 0:
+            return np.zeros(3, dtype=np.float32), np.zeros(3, dtype=np.float32)
+        return self.vertices.min(axis=0), self.vertices.max(axis=0)
+
+    def bounding_sphere(self):
+        """Center of the bounding box and the radius reaching the farthest vertex"""
+        low, high = self.bounds()
+        center = (low.astype(float) + high) / 2
+        if len(self.vertices) == 0:
+            return center, 0.0
+        return center, float(np.sqrt(((self.vertices - center) ** 2).sum(axis=1).max()))
+
+    def normalized(self, radius=np.sqrt(3)):
+        """Copy of the mesh centered at the origin with a bounding radius of ``radius``"""
+        low, high = self.bounds()
+        center = (low + high) / 2
+        half_diagonal = np.linalg.norm(high - low) / 2
+        factor = radius / half_diagonal if half_diagonal > 0 else 1.0
+        vertices = (self.vertices - center) * np.float32(factor)
+        return Mesh(vertices, self.edges, self.faces, self.path)
+
+
+def cube_mesh():
+    return Mesh(INITIAL_VERTICES, edges=EDGES, faces=FACES)
+
+
+def edges_from_faces(faces):
+    """Unique undirected edges of a (F, K) polygon index array"""
+    faces = np.asarray(faces, dtype=np.int64)
+    if faces.size == 0:
+        return np.empty((0, 2), dtype=np.int32)
+    starts = faces.reshape(-1)
+    ends = np.roll(faces, -1, axis=1).reshape(-1)
+    low = np.minimum(starts, ends)
+    high = np.maximum(starts, ends)
+    count = int(faces.max()) + 1
+    keys = np.unique(low * count + high)
+    return np.stack((keys // count, keys % count), axis=1).astype(np.int32)
+
+
+def triangulate(faces):
+    """Fan-triangulate a (F, K) polygon index array into (F * (K - 2), 3)"""
+    faces = np.asarray(faces)
+    if faces.shape[1] == 3:
+        return faces
+    fans = [
+        np.stack((faces[:, 0], faces[:, i], faces[:, i + 1]), axis=1)
+        for i in range(1, faces.shape[1] - 1)
+    ]
+    return np.stack(fans, axis=1).reshape(-1, 3)
+
+
+def load_mesh(path):
+    """Load a Wavefront OBJ, ASCII/binary PLY or STL file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".obj":
+        return load_obj(path)
+    if extension == ".ply":
+        return load_ply(path)
+    if extension == ".stl":
+        return load_stl(path)
+    raise ValueError(f"Unsupported mesh format: {extension or path}")
+
+
+def save_mesh(path, mesh):
+    """Write a mesh as Wavefront OBJ, binary PLY or binary STL"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".obj":
+        return save_obj(path, mesh)
+    if extension == ".ply":
+        return save_ply(path, mesh)
+    if extension == ".stl":
+        return save_stl(path, mesh)
+    raise ValueError(f"Unsupported mesh format: {extension or path}")
+
+
+def save_obj(path, mesh, chunk_size=1 << 16):
+    """Write vertices, triangles and the edges no triangle covers as lines"""
+    records = [(mesh.edges, "l %d %d")]
+    if mesh.faces is not None:
+        records = [(mesh.faces, "f %d %d %d"), (_loose_edges(mesh), "l %d %d")]
+    with open(path, "w", encoding="utf-8") as obj_file:
+        for start in range(0, len(mesh.vertices), chunk_size):
+            chunk = mesh.vertices[start : start + chunk_size]
+            np.savetxt(obj_file, chunk, fmt="v %.9g %.9g %.9g")
+        for indices, row in records:
+            for start in range(0, len(indices), chunk_size):
+                chunk = indices[start : start + chunk_size] + 1
+                np.savetxt(obj_file, chunk, fmt=row)
+
+
+def _loose_edges(mesh):
+    """Edges of ``mesh`` that are not a side of any of its faces"""
+    edges = np.sort(np.asarray(mesh.edges, dtype=np.int64).reshape(-1, 2), axis=1)
+    count = max(len(mesh.vertices), 1)
+    keys = edges[:, 0] * count + edges[:, 1]
+    sides = edges_from_faces(mesh.faces).astype(np.int64)
+    return edges[~np.isin(keys, sides[:, 0] * count + sides[:, 1])]
+
+
+def save_ply(path, mesh):
+    """Binary little-endian PLY with float32 xyz and triangle faces"""
+    faces = mesh.faces if mesh.faces is not None else np.empty((0, 3))
+    header = [
+        "ply",
+        "format binary_little_endian 1.0",
+        f"element vertex {len(mesh.vertices)}",
+        "property float x",
+        "property float y",
+        "property float z",
+    ]
+    if mesh.faces is not None:
+        header += [
+            f"element face {len(faces)}",
+            "property list uchar int vertex_indices",
+        ]
+    header.append("end_header")
+
+    records = np.empty(len(faces), dtype=[("count", "u1"), ("indices", "<i4", (3,))])
+    records["count"] = 3
+    records["indices"] = faces
+    with open(path, "wb") as ply_file:
+        ply_file.write(("\n".join(header) + "\n").encode("ascii"))
+        mesh.vertices.astype("<f4", copy=False).tofile(ply_file)
+        if mesh.faces is not None:
+            records.tofile(ply_file)
+
+
+def save_stl(path, mesh):
+    if mesh.faces is None:
+        raise ValueError("STL needs a mesh with faces")
+    corners = mesh.vertices[mesh.faces]
+    records = np.zeros(len(corners), dtype=STL_RECORD)
+    records["vertices"] = corners
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    records["normal"] = np.divide(
+        normals, lengths, out=np.zeros_like(normals), where=lengths > 0
+    )
+    with open(path, "wb") as stl_file:
+        stl_file.write(b"geometry_game".ljust(80, b" "))
+        stl_file.write(np.uint32(len(records)).astype("<u4").tobytes())
+        records.tofile(stl_file)
+
+
+def _polygons_to_arrays(polygons, polylines=()):
+    """Group polygons by vertex count and return (edges, triangles)
+
+    ``polylines`` only contribute the segments between consecutive
+    vertices, never faces or a closing edge.
+    """
+    by_size = {}
+    for polygon in polygons:
+        by_size.setdefault(len(polygon), []).append(polygon)
+
+    edge_groups = [
+        np.array([line[:-1], line[1:]], dtype=np.int64).T
+        for line in polylines
+        if len(line) > 1
+    ]
+    triangle_groups = []
+    for size, group in by_size.items():
+        if size < 2:
+            continue
+        group = np.array(group, dtype=np.int64)
+        if size == 2:
+            edge_groups.append(group)
+        else:
+            edge_groups.append(edges_from_faces(group))
+            triangle_groups.append(triangulate(group))
+
+    edges = (
+        np.unique(np.sort(np.concatenate(edge_groups), axis=1), axis=0)
+        if edge_groups
+        else np.empty((0, 2))
+    )
+    faces = np.concatenate(triangle_groups) if triangle_groups else None
+    return edges, faces
+
+
+def load_obj(path):
+    vertices = []
+    polygons = []
+    polylines = []
+    with open(path, "r", encoding="utf-8", errors="replace") as obj_file:
+        for line in obj_file:
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == "v":
+                vertices.append([float(value) for value in parts[1:4]])
+            elif parts[0] in ("f", "l"):
+                count = len(vertices)
+                indices = []
+                for part in parts[1:]:
+                    index = int(part.split("/")[0])
+                    indices.append(index - 1 if index > 0 else count + index)
+                (polygons if parts[0] == "f" else polylines).append(indices)
+
+    edges, faces = _polygons_to_arrays(polygons, polylines)
+    vertices = np.array(vertices, dtype=np.float32).reshape(-1, 3)
+    return Mesh(vertices, edges, faces, path)
+
+
+def _read_ply_header(ply_file):
+    if ply_file.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+
+    ply_format = None
+    elements = []
+    while True:
+        line = ply_file.readline()
+        if not line:
+            raise ValueError("PLY header is missing end_header")
+        parts = line.decode("ascii", errors="replace").split()
+        if not parts or parts[0] in ("comment", "obj_info"):
+            continue
+        if parts[0] == "format":
+            ply_format = parts[1]
+        elif parts[0] == "element":
+            elements.append(
+                {"name": parts[1], "count": int(parts[2]), "properties": []}
+            )
+        elif parts[0] == "property":
+            if parts[1] == "list":
+                prop = (parts[4], PLY_TYPES[parts[2]], PLY_TYPES[parts[3]])
+            else:
+                prop = (parts[2], PLY_TYPES[parts[1]], None)
+            elements[-1]["properties"].append(prop)
+        elif parts[0] == "end_header":
+            return ply_format, elements, ply_file.tell()
+
+
+def load_ply(path):
+    with open(path, "rb") as ply_file:
+        ply_format, elements, offset = _read_ply_header(ply_file)
+
+    if ply_format == "ascii":
+        data = _read_ply_ascii(path, elements, offset)
+    elif ply_format in ("binary_little_endian", "binary_big_endian"):
+        byte_order = "<" if ply_format == "binary_little_endian" else ">"
+        data = _read_ply_binary(path, elements, offset, byte_order)
+    else:
+        raise ValueError(f"Unsupported PLY format: {ply_format}")
+
+    vertex_data = data.get("vertex")
+    if vertex_data is None:
+        raise ValueError("PLY file has no vertex element")
+    vertices = _xyz(vertex_data)
+
+    polygons = data.get("face")
+    if polygons is None:
+        return Mesh(vertices, path=path)
+    if isinstance(polygons, np.ndarray):
+        faces = triangulate(polygons) if polygons.shape[1] >= 3 else None
+        return Mesh(vertices, edges_from_faces(polygons), faces, path)
+    edges, faces = _polygons_to_arrays(polygons)
+    return Mesh(vertices, edges, faces, path)
+
+
+def _xyz(vertex_data):
+    names = vertex_data.dtype.names
+    if names[:3] == ("x", "y", "z") and vertex_data.dtype == np.dtype(
+        [("x", "=f4"), ("y", "=f4"), ("z", "=f4")]
+    ):
+        # Plain native float32 xyz records can be viewed without copying
+        return vertex_data.view(np.float32).reshape(-1, 3)
+    vertices = np.empty((len(vertex_data), 3), dtype=np.float32)
+    for column, name in enumerate(("x", "y", "z")):
+        vertices[:, column] = vertex_data[name]
+    return vertices
+
+
+def _read_ply_binary(path, elements, offset, byte_order):
+    data = {}
+    for element in elements:
+        properties = element["properties"]
+        count = element["count"]
+        list_properties = [prop for prop in properties if prop[2] is not None]
+
+        if not list_properties:
+            dtype = np.dtype(
+                [(name, byte_order + kind) for name, kind, _ in properties]
+            )
+            data[element["name"]] = np.memmap(
+                path, dtype=dtype, mode="r", offset=offset, shape=(count,)
+            )
+            offset += count * dtype.itemsize
+            continue
+
+        if len(properties) == 1 and count > 0:
+            name, count_type, index_type = properties[0]
+            count_dtype = np.dtype(byte_order + count_type)
+            first = np.memmap(
+                path, dtype=count_dtype, mode="r", offset=offset, shape=(1,)
+            )
+            size = int(first[0])
+            dtype = np.dtype(
+                [("count", count_dtype), ("indices", byte_order + index_type, (size,))]
+            )
+            if offset + count * dtype.itemsize <= os.path.getsize(path):
+                records = np.memmap(
+                    path, dtype=dtype, mode="r", offset=offset, shape=(count,)
+                )
+                if np.all(records["count"] == size):
+                    data[element["name"]] = records["indices"]
+                    offset += count * dtype.itemsize
+                    continue
+
+        data[element["name"]], offset = _read_ply_binary_rows(
+            path, element, offset, byte_order
+        )
+    return data
+
+
+def _read_ply_binary_rows(path, element, offset, byte_order):
+    """Slow path for elements whose list properties vary in length"""
+    with open(path, "rb") as ply_file:
+        ply_file.seek(offset)
+        raw = ply_file.read()
+
+    position = 0
+    rows = []
+    for _ in range(element["count"]):
+        row = None
+        for name, kind, index_kind in element["properties"]:
+            if index_kind is None:
+                position += np.dtype(kind).itemsize
+                continue
+            count_dtype = np.dtype(byte_order + kind)
+            size = int(np.frombuffer(raw, count_dtype, 1, position)[0])
+            position += count_dtype.itemsize
+            index_dtype = np.dtype(byte_order + index_kind)
+            values = np.frombuffer(raw, index_dtype, size, position)
+            position += size * index_dtype.itemsize
+            if row is None:
+                row = values.tolist()
+        rows.append(row or [])
+    return rows, offset + position
+
+
+def _read_ply_ascii(path, elements, offset):
+    with open(path, "rb") as ply_file:
+        ply_file.seek(offset)
+        lines = ply_file.read().decode("ascii", errors="replace").splitlines()
+
+    data = {}
+    line_index = 0
+    for element in elements:
+        rows = lines[line_index : line_index + element["count"]]
+        line_index += element["count"]
+        properties = element["properties"]
+
+        if all(prop[2] is None for prop in properties):
+            dtype = np.dtype([(name, kind) for name, kind, _ in properties])
+            values = np.array(
+                [row.split()[: len(properties)] for row in rows], dtype=np.float64
+            ).reshape(-1, len(properties))
+            table = np.empty(len(rows), dtype=dtype)
+            for column, (name, kind, _) in enumerate(properties):
+                table[name] = values[:, column]
+            data[element["name"]] = table
+            continue
+
+        polygons = []
+        for row in rows:
+            tokens = row.split()
+            position = 0
+            polygon = None
+            for name, kind, index_kind in properties:
+                if index_kind is None:
+                    position += 1
+                    continue
+                size = int(tokens[position])
+                values = [
+                    int(token) for token in tokens[position + 1 : position + 1 + size]
+                ]
+                position += 1 + size
+                if polygon is None:
+                    polygon = values
+            polygons.append(polygon or [])
+        data[element["name"]] = polygons
+    return data
+
+
+def load_stl(path):
+    size = os.path.getsize(path)
+    with open(path, "rb") as stl_file:
+        header = stl_file.read(84)
+
+    count = int(np.frombuffer(header, "<u4", 1, 80)[0]) if len(header) == 84 else -1
+    if count < 0 or 84 + count * STL_RECORD.itemsize != size:
+        if header.lstrip().startswith(b"solid"):
+            return _load_stl_ascii(path)
+        raise ValueError("Malformed binary STL file")
+
+    records = np.memmap(path, dtype=STL_RECORD, mode="r", offset=84, shape=(count,))
+    return _mesh_from_triangles(records["vertices"], path)
+
+
+def _load_stl_ascii(path):
+    corners = []
+    with open(path, "r", encoding="ascii", errors="replace") as stl_file:
+        for line in stl_file:
+            parts = line.split()
+            if parts and parts[0] == "vertex":
+                corners.append([float(value) for value in parts[1:4]])
+    return _mesh_from_triangles(
+        np.array(corners, dtype=np.float32).reshape(-1, 3, 3), path
+    )
+
+
+def _mesh_from_triangles(triangles, path, chunk_size=1 << 16):
+    """Weld the unshared corners of an STL triangle soup into indexed vertices
+
+    The (T, 3, 3) ``triangles`` may be a memmap. They are read
+    ``chunk_size`` at a time and only the distinct positions of each chunk
+    are kept, then those are welded in a single pass at the end, so apart
+    from the welded vertices and faces themselves only one chunk is ever
+    copied into memory. Vertices are numbered in the order they first
+    appear.
+    """
+    distinct_parts = []
+    first_parts = []
+    count = 0
+    faces = np.empty((len(triangles), 3), dtype=np.int64)
+    for start in range(0, len(triangles), chunk_size):
+        chunk = np.ascontiguousarray(
+            triangles[start : start + chunk_size], dtype=np.float32
+        )
+        distinct, first, inverse = np.unique(
+            chunk.reshape(-1, 3).view(_CORNER).reshape(-1),
+            return_index=True,
+            return_inverse=True,
+        )
+        distinct_parts.append(distinct)
+        first_parts.append(first + start * 3)
+        faces[start : start + len(chunk)] = (inverse + count).reshape(-1, 3)
+        count += len(distinct)
+
+    if not distinct_parts:
+        return Mesh(np.empty((0, 3), dtype=np.float32), faces=faces, path=path)
+
+    # A position shared by several chunks first appears in the earliest one
+    firsts = np.concatenate(first_parts)
+    welded, earliest, inverse = np.unique(
+        np.concatenate(distinct_parts), return_index=True, return_inverse=True
+    )
+    order = np.argsort(firsts[earliest], kind="stable")
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    vertices = welded[order].view(np.float32).reshape(-1, 3)
+    return Mesh(vertices, faces=ranks[inverse.reshape(-1)][faces], path=path)
@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from geometry_game.geometry import (
+    PARAM_NAMES,
+    Transformation,
+    TransformStack,
+    apply_matrix,
+    parse_transform,
+)
+from geometry_game.mesh import Mesh, load_mesh, save_mesh
+from geometry_game.constants import VERTEX_CHUNK
+
+
+def typed_transformation(operation):
+    """Transformation with float parameters from a spec, dict or Transformation
+
+    Specs look like ``rotate_x:angle=30`` and dicts like
+    ``{"type": "rotate_x", "params": {"angle": 30}}``. Unknown types,
+    unknown parameter names, non-numeric values and anything that is not a
+    spec or a dict raise ValueError.
+    """
+    if isinstance(operation, str):
+        operation = parse_transform(operation)
+    if isinstance(operation, Transformation):
+        transform_type, params = operation.type, operation.params
+    elif isinstance(operation, dict):
+        transform_type = operation.get("type")
+        params = operation.get("params", {})
+    else:
+        raise ValueError(f"Not a transformation: {operation!r}")
+    if not isinstance(params, dict):
+        raise ValueError(f"{transform_type} params must be an object: {params!r}")
+    if transform_type not in PARAM_NAMES:
+        raise ValueError(f"Unknown transformation type: {transform_type}")
+
+    names = PARAM_NAMES[transform_type]
+    typed = {}
+    for name, value in params.items():
+        if name not in names:
+            raise ValueError(f"{transform_type} has no parameter {name}")
+        try:
+            typed[name] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{transform_type}.{name} is not a number: {value!r}")
+    return Transformation(transform_type, typed)
+
+
+def load_operations(path):
+    """Transformations listed in a JSON file, as a list or under "operations" """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        data = data.get("operations", data.get("transformations", []))
+    if not isinstance(data, list):
+        raise ValueError(f"{path} does not list any transformations")
+    operations = []
+    for index, operation in enumerate(data):
+        try:
+            operations.append(typed_transformation(operation))
+        except ValueError as error:
+            raise ValueError(f"Operation {index}: {error}") from None
+    return operations
+
+
+class Pipeline:
+    """A transformation stack applied to vertex arrays without a display
+
+    The stack composes exactly like the interactive one, so a pipeline
+    gives the same result as building the stack in the window. Vertices
+    are transformed ``chunk_size`` rows at a time, on ``workers`` threads,
+    which bounds the temporaries for point clouds that are memory-mapped
+    from disk.
+    """
+
+    def __init__(self, operations=(), chunk_size=VERTEX_CHUNK, workers=1):
+        self.transformations = [typed_transformation(item) for item in operations]
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.matrix = TransformStack(self.transformations).composite.copy()
+
+    @classmethod
+    def load(cls, path, chunk_size=VERTEX_CHUNK, workers=1):
+        return cls(load_operations(path), chunk_size, workers)
+
+    def apply(self, vertices, out=None):
+        """Transformed copy of (N, 3) ``vertices``, written into ``out`` if given"""
+        if out is None:
+            out = np.empty(vertices.shape, dtype=_float_dtype(vertices))
+        return apply_matrix(vertices, self.matrix, out, self.chunk_size, self.workers)
+
+    def apply_mesh(self, mesh):
+        return Mesh(self.apply(mesh.vertices), mesh.edges, mesh.faces, mesh.path)
+
+
+def _float_dtype(vertices):
+    return vertices.dtype if vertices.dtype.kind == "f" else np.dtype(float)
+
+
+def _is_npy(path):
+    return os.path.splitext(path)[1].lower() == ".npy"
+
+
+def load_vertices(path):
+    """(N, 3) vertices of a .npy file, memory-mapped instead of read"""
+    vertices = np.load(path, mmap_mode="r")
+    if vertices.ndim != 2 or vertices.shape[1] != 3:
+        raise ValueError(f"{path} does not hold an (N, 3) vertex array")
+    return vertices
+
+
+def apply_file(mesh_path, operations, out_path, chunk_size=VERTEX_CHUNK, workers=1):
+    """Transform a mesh file into another, in any supported format pair
+
+    ``.npy`` point clouds are memory-mapped on both ends and streamed chunk
+    by chunk, so they can be larger than RAM. Returns the vertex count.
+    """
+    pipeline = Pipeline(operations, chunk_size, workers)
+    mesh = None
+    if _is_npy(mesh_path):
+        vertices = load_vertices(mesh_path)
+    else:
+        mesh = load_mesh(mesh_path)
+        vertices = mesh.vertices
+
+    if _is_npy(out_path):
+        out = np.lib.format.open_memmap(
+            out_path, mode="w+", dtype=_float_dtype(vertices), shape=vertices.shape
+        )
+        pipeline.apply(vertices, out)
+        out.flush()
+    else:
+        save_mesh(out_path, pipeline.apply_mesh(mesh or Mesh(vertices)))
+    return len(vertices)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m geometry_game apply",
+        description="Apply a transformation pipeline to a mesh file",
+    )
+    parser.add_argument(
+        "--mesh", required=True, help="OBJ, PLY, STL or .npy point cloud input"
+    )
+    parser.add_argument(
+        "--ops",
+        help="JSON list of transformations, e.g. "
+        '[{"type": "scale", "params": {"x": 2}}, "rotate_y:angle=30"]',
+    )
+    parser.add_argument(
+        "--transform",
+        action="append",
+        default=[],
+        metavar="TYPE:NAME=VALUE,...",
+        help="append a transformation after --ops, e.g. translate:x=1",
+    )
+    parser.add_argument(
+        "--out", required=True, help="OBJ, PLY, STL or .npy point cloud output"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=VERTEX_CHUNK,
+        help="vertices transformed per chunk",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="threads transforming the chunks"
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        operations = load_operations(args.ops) if args.ops else []
+        operations += [typed_transformation(spec) for spec in args.transform]
+        count = apply_file(
+            args.mesh, operations, args.out, args.chunk_size, args.workers
+        )
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    print(
+        f"Applied {len(operations)} transformations to {count} vertices",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+import pygame
+from geometry_game.ui import RetainedWidget, TextCache, main_font
+from geometry_game.constants import WHITE, ACCENT_PRIMARY, RED
+
+PHASES = (
+    "events",
+    "transform",
+    "projection",
+    "background",
+    "edges",
+    "widgets",
+    "present",
+)
+
+
+class FrameRecord:
+    __slots__ = ("frame", "timestamp", "interval", "work", "phases")
+
+    def __init__(self, frame, timestamp, interval, work, phases):
+        self.frame = frame
+        self.timestamp = timestamp
+        self.interval = interval
+        self.work = work
+        self.phases = phases
+
+    def as_dict(self):
+        return {
+            "frame": self.frame,
+            "timestamp": self.timestamp,
+            "interval": self.interval,
+            "work": self.work,
+            "phases": dict(self.phases),
+        }
+
+
+class FrameProfiler:
+    """Collects named timing spans per frame and hands records to subscribers
+
+    ``interval`` is the wall time since the previous frame started and
+    ``work`` the time between ``begin_frame`` and ``end_frame``, so the
+    frame limiter's sleep only shows up in the former.
+    """
+
+    def __init__(self, history=240):
+        self.records = deque(maxlen=history)
+        self.enabled = True
+        self._subscribers = []
+        self._frame = 0
+        self._frame_start = None
+        self._previous_start = None
+        self._phases = {}
+
+    def subscribe(self, callback):
+        """Call ``callback(record)`` after every frame; returns an unsubscribe function"""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._previous_start = self._frame_start
+        self._frame_start = now
+        self._phases = {}
+
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._phases[name] = self._phases.get(name, 0.0) + elapsed
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return None
+        now = time.perf_counter()
+        interval = (
+            self._frame_start - self._previous_start
+            if self._previous_start is not None
+            else now - self._frame_start
+        )
+        record = FrameRecord(
+            self._frame, time.time(), interval, now - self._frame_start, self._phases
+        )
+        self._frame += 1
+        self.records.append(record)
+        for callback in list(self._subscribers):
+            callback(record)
+        return record
+
+
+class FrameLog:
+    """Rolling CSV or JSONL log of frame records, picked by the file extension"""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self._file = None
+        self._writer = None
+        self._open()
+
+    def __call__(self, record):
+        if self._file.tell() >= self.max_bytes:
+            self._rollover()
+        if self.format == "csv":
+            self._writer.writerow(
+                [record.frame, record.timestamp, record.interval, record.work]
+                + [record.phases.get(phase, 0.0) for phase in PHASES]
+            )
+        else:
+            self._file.write(json.dumps(record.as_dict()) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        if self.format == "csv":
+            self._writer = csv.writer(self._file)
+            if self._file.tell() == 0:
+                self._writer.writerow(
+                    ["frame", "timestamp", "interval", "work", *PHASES]
+                )
+
+    def _rollover(self):
+        self.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+
+class ProfilerOverlay(RetainedWidget):
+    """Frame-time graph and per-phase breakdown drawn over the scene
+
+    The timings change every frame, so their text goes through a small
+    cache of the overlay's own instead of the shared ``render_text`` one,
+    where it would evict the labels of the other widgets.
+    """
+
+    def __init__(self, profiler, x, y, width=280, graph_height=60, budget=1 / 60):
+        super().__init__()
+        self.profiler = profiler
+        self.text_cache = TextCache(max_bytes=128 * 1024)
+        self.visible = False
+        self.budget = budget
+        self.graph_height = graph_height
+        self.line_height = 18
+        self.rect = pygame.Rect(
+            x, y, width, graph_height + 30 + (len(PHASES) + 1) * self.line_height
+        )
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def state_key(self):
+        if not self.visible:
+            return (False,)
+        last = self.profiler.records[-1].frame if self.profiler.records else None
+        return (True, last)
+
+    def bounds(self):
+        return self.rect
+
+    def draw(self, surface):
+        if not self.visible:
+            self._mark_drawn()
+            return
+
+        panel = self._cached(
+            "panel", lambda: self._panel(self.rect.width, self.rect.height)
+        )
+        surface.blit(panel, self.rect)
+
+        records = list(self.profiler.records)[-self.rect.width + 20 :]
+        graph = pygame.Rect(
+            self.rect.x + 10, self.rect.y + 10, self.rect.width - 20, self.graph_height
+        )
+        scale = graph.height / (self.budget * 2)
+        budget_y = graph.bottom - int(self.budget * scale)
+        pygame.draw.line(surface, RED, (graph.left, budget_y), (graph.right, budget_y))
+        for offset, record in enumerate(records):
+            height = min(graph.height, int(record.work * scale))
+            x = graph.left + offset
+            pygame.draw.line(
+                surface, ACCENT_PRIMARY, (x, graph.bottom), (x, graph.bottom - height)
+            )
+
+        recent = records[-60:]
+        lines = [self._summary(recent)]
+        for phase in PHASES:
+            average = _average(record.phases.get(phase, 0.0) for record in recent)
+            lines.append((phase, f"{average * 1000:.2f} ms"))
+
+        y = graph.bottom + 10
+        render = self.text_cache.render
+        for label, value in lines:
+            surface.blit(render(main_font, label, True, WHITE), (graph.left, y))
+            value_surf = render(main_font, value, True, WHITE)
+            surface.blit(value_surf, value_surf.get_rect(topright=(graph.right, y)))
+            y += self.line_height
+
+        self._mark_drawn()
+
+    @staticmethod
+    def _summary(records):
+        work = _average(record.work for record in records)
+        interval = _average(record.interval for record in records)
+        fps = 1 / interval if interval > 0 else 0.0
+        return f"{fps:.0f} fps", f"{work * 1000:.2f} ms"
+
+    @staticmethod
+    def _panel(width, height):
+        panel_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(
+            panel_surface, (20, 20, 40, 200), (0, 0, width, height), border_radius=8
+        )
+        return panel_surface
+
+
+def _average(values):
+    values = list(values)
+    return sum(values) / len(values) if values else 0.0
+
+
+profiler = FrameProfiler()
@@ -0,0 +1,350 @@
+from math import cos, radians, sin, sqrt
+import numpy as np
+from geometry_game.constants import TRANSITION_TIME
+
+RIGID_TYPES = ("rotate_x", "rotate_y", "rotate_z", "translate")
+
+# Chains up to this length compose faster in a plain loop over tuples than
+# in the vectorized pairwise reduction, whose NumPy calls cost more than the
+# products themselves
+LOOP_COMPOSE_LENGTH = 32
+
+ROTATION_AXES = {
+    "rotate_x": (1.0, 0.0, 0.0),
+    "rotate_y": (0.0, 1.0, 0.0),
+    "rotate_z": (0.0, 0.0, 1.0),
+}
+
+
+def _hamilton_table():
+    """(16, 4) table mapping the outer product of two quaternions to their product"""
+    # Products of the basis units 1, i, j, k as (sign, unit index)
+    units = [
+        [(1, 0), (1, 1), (1, 2), (1, 3)],
+        [(1, 1), (-1, 0), (1, 3), (-1, 2)],
+        [(1, 2), (-1, 3), (-1, 0), (1, 1)],
+        [(1, 3), (1, 2), (-1, 1), (-1, 0)],
+    ]
+    table = np.zeros((4, 4, 4))
+    for i, row in enumerate(units):
+        for j, (sign, unit) in enumerate(row):
+            table[i, j, unit] = sign
+    return table.reshape(16, 4)
+
+
+_HAMILTON = _hamilton_table()
+
+
+def quaternion_multiply(a, b):
+    """Hamilton product of (..., 4) quaternions stored as (w, x, y, z)"""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    outer = a[..., :, None] * b[..., None, :]
+    return np.matmul(outer.reshape(outer.shape[:-2] + (16,)), _HAMILTON)
+
+
+def quaternion_conjugate(q):
+    return np.asarray(q, dtype=float) * (1.0, -1.0, -1.0, -1.0)
+
+
+def axis_angle_quaternion(axis, degrees):
+    half = np.radians(degrees) / 2
+    axis = np.asarray(axis, dtype=float)
+    return np.concatenate(([np.cos(half)], np.sin(half) * axis / np.linalg.norm(axis)))
+
+
+def quaternion_matrix(q, out=None):
+    """3x3 rotation matrix of a unit quaternion"""
+    w, x, y, z = q
+    if out is None:
+        out = np.empty((3, 3))
+    out[0] = (1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y))
+    out[1] = (2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x))
+    out[2] = (2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y))
+    return out
+
+
+def slerp(a, b, t):
+    """Spherical interpolation between unit quaternions along the short arc"""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    dot = float(np.dot(a, b))
+    if dot < 0:
+        b = -b
+        dot = -dot
+    if dot > 0.9995:
+        # Nearly parallel: the normalized lerp is indistinguishable and stable
+        result = a + (b - a) * t
+        return result / np.linalg.norm(result)
+    theta = np.arccos(dot)
+    return (np.sin((1 - t) * theta) * a + np.sin(t * theta) * b) / np.sin(theta)
+
+
+class DualQuaternion:
+    """Rigid transform as a unit dual quaternion ``real + epsilon * dual``
+
+    Composition follows the matrix convention, ``(a @ b)`` applies ``b``
+    first, and costs two quaternion products instead of a 4x4 product.
+    Rotations never pick up scale or shear from rounding, since
+    ``normalized`` only has to rescale eight numbers back onto the unit
+    sphere and restore the real/dual orthogonality.
+    """
+
+    __slots__ = ("real", "dual")
+
+    def __init__(self, real, dual):
+        self.real = np.asarray(real, dtype=float)
+        self.dual = np.asarray(dual, dtype=float)
+
+    @classmethod
+    def identity(cls):
+        return cls((1.0, 0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 0.0))
+
+    @classmethod
+    def from_rotation_translation(cls, rotation, translation):
+        rotation = np.asarray(rotation, dtype=float)
+        translation = np.concatenate(([0.0], np.asarray(translation, dtype=float)))
+        return cls(rotation, 0.5 * quaternion_multiply(translation, rotation))
+
+    @classmethod
+    def from_transformation(cls, transform):
+        """Dual quaternion of a rotate_* or translate Transformation"""
+        params = transform.params
+        if transform.type in ROTATION_AXES:
+            rotation = axis_angle_quaternion(
+                ROTATION_AXES[transform.type], float(params.get("angle", 0.0))
+            )
+            return cls(rotation, np.zeros(4))
+        if transform.type == "translate":
+            translation = [float(params.get(axis, 0.0)) for axis in "xyz"]
+            return cls.from_rotation_translation((1.0, 0.0, 0.0, 0.0), translation)
+        raise ValueError(f"{transform.type} is not a rigid transformation")
+
+    def __matmul__(self, other):
+        return DualQuaternion(
+            quaternion_multiply(self.real, other.real),
+            quaternion_multiply(self.real, other.dual)
+            + quaternion_multiply(self.dual, other.real),
+        )
+
+    def __repr__(self):
+        return f"DualQuaternion({self.real.tolist()}, {self.dual.tolist()})"
+
+    @property
+    def rotation(self):
+        return self.real
+
+    @property
+    def translation(self):
+        return 2 * quaternion_multiply(self.dual, quaternion_conjugate(self.real))[1:]
+
+    def normalized(self):
+        norm = np.linalg.norm(self.real)
+        real = self.real / norm
+        dual = self.dual / norm
+        dual = dual - real * np.dot(real, dual)
+        return DualQuaternion(real, dual)
+
+    def interpolate(self, other, t):
+        """Blend towards ``other``: SLERP the rotation, lerp the translation"""
+        rotation = slerp(self.real, other.real, t)
+        translation = self.translation + (other.translation - self.translation) * t
+        return DualQuaternion.from_rotation_translation(rotation, translation)
+
+    def to_matrix(self, out=None):
+        if out is None:
+            out = np.identity(4)
+        # On Python floats, NumPy scalars would cost more than the products
+        real = self.real.tolist()
+        quaternion_matrix(real, out[:3, :3])
+        w, x, y, z = real
+        _, *translation = _tuple_multiply(self.dual.tolist(), (w, -x, -y, -z))
+        out[:3, 3] = [2 * value for value in translation]
+        return out
+
+
+def compose(transformations):
+    """Fused rigid composite of a sequence of rotate_* and translate transforms
+
+    Short chains are multiplied out one ``dual_product`` at a time. Longer
+    ones are reduced pairwise with vectorized quaternion products, so ``n``
+    transformations take ``log2(n)`` NumPy passes. Either way a single
+    renormalization runs at the end. Raises ValueError for scale or shear.
+    """
+    if len(transformations) > LOOP_COMPOSE_LENGTH:
+        return reduce_duals(*_rigid_arrays(transformations))
+    product = (1.0, 0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 0.0)
+    for transform in transformations:
+        pair = rigid_dual(transform)
+        if pair is None:
+            raise ValueError(f"{transform.type} is not a rigid transformation")
+        product = dual_product(product, pair)
+    return DualQuaternion(*normalized_dual(product))
+
+
+def reduce_duals(real, dual):
+    """Normalized product of (n, 4) real and dual parts, reduced pairwise"""
+    if len(real) == 0:
+        return DualQuaternion.identity()
+    while len(real) > 1:
+        if len(real) % 2:
+            real = np.concatenate((real, [(1.0, 0.0, 0.0, 0.0)]))
+            dual = np.concatenate((dual, np.zeros((1, 4))))
+        left_real, right_real = real[0::2], real[1::2]
+        left_dual, right_dual = dual[0::2], dual[1::2]
+        real = quaternion_multiply(left_real, right_real)
+        dual = quaternion_multiply(left_real, right_dual) + quaternion_multiply(
+            left_dual, right_real
+        )
+    return DualQuaternion(real[0], dual[0]).normalized()
+
+
+def _rigid_arrays(transformations):
+    """(n, 4) real and dual parts for a chain, built without per-item NumPy calls"""
+    axes = []
+    angles = []
+    translations = []
+    for transform in transformations:
+        params = transform.params
+        if transform.type in ROTATION_AXES:
+            axes.append(ROTATION_AXES[transform.type])
+            angles.append(float(params.get("angle", 0.0)))
+            translations.append((0.0, 0.0, 0.0))
+        elif transform.type == "translate":
+            axes.append((1.0, 0.0, 0.0))
+            angles.append(0.0)
+            translations.append([float(params.get(axis, 0.0)) for axis in "xyz"])
+        else:
+            raise ValueError(f"{transform.type} is not a rigid transformation")
+    return dual_arrays(axes, angles, translations)
+
+
+def dual_arrays(axes, angles, translations):
+    """(n, 4) real and dual parts of pure rotations and pure translations
+
+    Row i rotates by ``angles[i]`` degrees about ``axes[i]`` or translates
+    by ``translations[i]``; the other of the two must be zero.
+    """
+    half = np.radians(np.asarray(angles, dtype=float)) / 2
+    real = np.empty((len(half), 4))
+    real[:, 0] = np.cos(half)
+    real[:, 1:] = np.sin(half)[:, None] * np.asarray(axes, dtype=float).reshape(-1, 3)
+    # The dual part t * r / 2 of a pure element reduces to t / 2 with the
+    # rotation left at identity
+    dual = np.zeros((len(half), 4))
+    dual[:, 1:] = np.asarray(translations, dtype=float).reshape(-1, 3) / 2
+    return real, dual
+
+
+def is_rigid(transformations):
+    return all(transform.type in RIGID_TYPES for transform in transformations)
+
+
+def rigid_dual(transform):
+    """(real, dual) tuples of a rigid Transformation, None for scale or shear
+
+    Plain tuples keep the products in ``dual_product`` cheaper than NumPy
+    calls, for the treap of a TransformStack that updates them on every edit.
+    """
+    params = transform.params
+    if transform.type in ROTATION_AXES:
+        half = radians(float(params.get("angle", 0.0))) / 2
+        sine = sin(half)
+        x, y, z = ROTATION_AXES[transform.type]
+        return (cos(half), x * sine, y * sine, z * sine), (0.0, 0.0, 0.0, 0.0)
+    if transform.type == "translate":
+        translation = [float(params.get(axis, 0.0)) / 2 for axis in "xyz"]
+        return (1.0, 0.0, 0.0, 0.0), (0.0, *translation)
+    return None
+
+
+def normalized_dual(pair):
+    """``DualQuaternion.normalized`` for a ``rigid_dual`` pair of tuples"""
+    real, dual = pair
+    norm = sqrt(sum(value * value for value in real))
+    real = [value / norm for value in real]
+    dual = [value / norm for value in dual]
+    dot = sum(left * right for left, right in zip(real, dual))
+    return tuple(real), tuple(value - part * dot for value, part in zip(dual, real))
+
+
+def _tuple_multiply(a, b):
+    aw, ax, ay, az = a
+    bw, bx, by, bz = b
+    return (
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    )
+
+
+def dual_product(a, b):
+    """Product of two ``rigid_dual`` pairs, applying ``b`` first"""
+    real_a, dual_a = a
+    real_b, dual_b = b
+    first = _tuple_multiply(real_a, dual_b)
+    second = _tuple_multiply(dual_a, real_b)
+    return _tuple_multiply(real_a, real_b), tuple(
+        left + right for left, right in zip(first, second)
+    )
+
+
+class StackTransition:
+    """Eases between successive states of a rigid transformation stack
+
+    ``retarget`` is called whenever the stack changes. While both the old
+    and the new stack are rigid, ``matrix`` then blends between their fused
+    dual quaternions for ``duration`` seconds of ``advance``; otherwise the
+    change applies at once and the transition stays inactive. A
+    TransformStack keeps its fused composite up to date with every edit, so
+    retargeting to one does not walk the stack.
+    """
+
+    def __init__(self, duration=TRANSITION_TIME):
+        self.duration = duration
+        self._target = DualQuaternion.identity()
+        self._start = None
+        self._progress = 1.0
+        self._matrix = np.identity(4)
+
+    @property
+    def active(self):
+        return self._start is not None
+
+    def retarget(self, transformations, ease=True):
+        """Head for a new stack state, or jump straight to it without ``ease``"""
+        if hasattr(transformations, "rigid_composite"):
+            target = transformations.rigid_composite
+        elif is_rigid(transformations):
+            target = compose(transformations)
+        else:
+            target = None
+        if (
+            ease
+            and target is not None
+            and self._target is not None
+            and self.duration > 0
+        ):
+            self._start = self.current()
+            self._progress = 0.0
+        else:
+            self._start = None
+        self._target = target
+
+    def advance(self, elapsed):
+        if self._start is None:
+            return
+        self._progress += elapsed / self.duration
+        if self._progress >= 1.0:
+            self._start = None
+
+    def current(self):
+        if self._start is None:
+            return self._target
+        t = self._progress
+        return self._start.interpolate(self._target, t * t * (3 - 2 * t))
+
+    def matrix(self):
+        """The blended 4x4 matrix, written into a buffer reused every frame"""
+        return self.current().to_matrix(out=self._matrix)
@@ -0,0 +1,607 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+import numpy as np
+from geometry_game.geometry import project_points
+from geometry_game.constants import (
+    WHITE,
+    ACCENT_PRIMARY,
+    CAMERA_DISTANCE,
+    SCALE,
+    NEAR_PLANE,
+    SOLID_LIGHT,
+    SOLID_AMBIENT,
+    RENDER_WORKERS,
+    RENDER_TILE_SIZE,
+)
+
+WIREFRAME_MODES = ("strips", "pixels")
+
+
+def build_edge_strips(edges):
+    """Chain an (E, 2) edge array into polylines that cover every edge once"""
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    adjacency = {}
+    for edge_index, (start, end) in enumerate(edges.tolist()):
+        adjacency.setdefault(start, []).append((end, edge_index))
+        adjacency.setdefault(end, []).append((start, edge_index))
+
+    used = np.zeros(len(edges), dtype=bool)
+    # Starting from odd-degree vertices keeps the number of strips minimal
+    starts = sorted(adjacency, key=lambda vertex: len(adjacency[vertex]) % 2 == 0)
+
+    strips = []
+    for start in starts:
+        neighbours = adjacency[start]
+        while neighbours:
+            strip = [start]
+            vertex = start
+            while True:
+                candidates = adjacency[vertex]
+                while candidates and used[candidates[-1][1]]:
+                    candidates.pop()
+                if not candidates:
+                    break
+                vertex, edge_index = candidates.pop()
+                used[edge_index] = True
+                strip.append(vertex)
+            if len(strip) > 1:
+                strips.append(np.array(strip, dtype=np.int32))
+            while neighbours and used[neighbours[-1][1]]:
+                neighbours.pop()
+    return strips
+
+
+def clip_segments(starts, ends, rect):
+    """Liang-Barsky clip of (E, 2) segments against a pygame.Rect
+
+    Returns the clipped start and end points together with a mask of the
+    segments that are at least partially inside ``rect``.
+    """
+    delta = ends - starts
+    lower = np.zeros(len(starts))
+    upper = np.ones(len(starts))
+    visible = np.ones(len(starts), dtype=bool)
+
+    bounds = (
+        (-delta[:, 0], starts[:, 0] - rect.left),
+        (delta[:, 0], rect.right - 1 - starts[:, 0]),
+        (-delta[:, 1], starts[:, 1] - rect.top),
+        (delta[:, 1], rect.bottom - 1 - starts[:, 1]),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in bounds:
+            parallel = p == 0
+            visible &= ~(parallel & (q < 0))
+            ratio = q / p
+            entering = (p < 0) & ~parallel
+            leaving = (p > 0) & ~parallel
+            lower = np.where(entering, np.maximum(lower, ratio), lower)
+            upper = np.where(leaving, np.minimum(upper, ratio), upper)
+
+    visible &= lower <= upper
+    clipped_starts = starts + delta * lower[:, None]
+    clipped_ends = starts + delta * upper[:, None]
+    return clipped_starts[visible], clipped_ends[visible], visible
+
+
+def _marker_sprite(color, radius):
+    size = radius * 2 + 1
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    return sprite
+
+
+def _marker_offsets(radius):
+    """Pixel offsets pygame.draw.circle covers around a marker's center"""
+    dx, dy = np.nonzero(pygame.surfarray.array_alpha(_marker_sprite(WHITE, radius)))
+    return dx - radius, dy - radius
+
+
+class WireframeRenderer:
+    """Draws every edge and vertex marker of a mesh in bulk
+
+    ``strips`` batches the edges into polylines built once per mesh and
+    draws each with a single ``pygame.draw.lines`` call. ``pixels``
+    rasterizes all segments and markers with vectorized DDA straight into
+    the surface's pixel buffer.
+
+    Pass the ClippedEdges from the clipping stage to ``draw`` to skip
+    everything outside the view frustum; edges crossing its boundary are then
+    drawn from their clipped segments.
+    """
+
+    def __init__(
+        self,
+        edges,
+        mode="strips",
+        edge_color=(255, 255, 255),
+        vertex_color=(255, 255, 255),
+        line_width=2,
+        vertex_radius=5,
+    ):
+        if mode not in WIREFRAME_MODES:
+            raise ValueError(f"Unknown wireframe mode: {mode}")
+        self.edges = np.ascontiguousarray(edges, dtype=np.int32).reshape(-1, 2)
+        self.mode = mode
+        self.edge_color = edge_color
+        self.vertex_color = vertex_color
+        self.line_width = line_width
+        self.vertex_radius = vertex_radius
+        self._strips = None
+        self._strip_vertices = None
+        self._strip_starts = None
+        self._marker = None
+        self._marker_offsets = None
+
+    def toggle_mode(self):
+        index = WIREFRAME_MODES.index(self.mode)
+        self.mode = WIREFRAME_MODES[(index + 1) % len(WIREFRAME_MODES)]
+
+    def draw(self, surface, points, clipped=None):
+        if len(points) == 0:
+            return
+        if self.mode == "pixels":
+            self._draw_pixels(surface, points, clipped)
+        else:
+            self._draw_strips(surface, points, clipped)
+
+    def _draw_strips(self, surface, points, clipped):
+        if self._strips is None:
+            self._strips = build_edge_strips(self.edges)
+        if self._marker is None:
+            self._marker = _marker_sprite(self.vertex_color, self.vertex_radius)
+
+        vertex_mask = None
+        if clipped is not None and not clipped.vertex_mask.all():
+            vertex_mask = clipped.vertex_mask
+
+        strips = self._strips
+        if vertex_mask is not None:
+            strips = self._visible_strips(vertex_mask)
+        for strip in strips:
+            for run in _inside_runs(strip, vertex_mask):
+                pygame.draw.lines(
+                    surface,
+                    self.edge_color,
+                    False,
+                    points[run].tolist(),
+                    self.line_width,
+                )
+
+        if clipped is not None:
+            for start, end in zip(clipped.starts.tolist(), clipped.ends.tolist()):
+                pygame.draw.line(surface, self.edge_color, start, end, self.line_width)
+
+        if vertex_mask is not None:
+            points = points[vertex_mask]
+        corners = points.astype(np.int64) - self.vertex_radius
+        surface.blits(
+            [(self._marker, corner) for corner in corners.tolist()], doreturn=False
+        )
+
+    def _visible_strips(self, vertex_mask):
+        """Strips with at least one vertex inside the frustum, counted in bulk"""
+        if not self._strips:
+            return []
+        if self._strip_starts is None:
+            lengths = [len(strip) for strip in self._strips]
+            self._strip_vertices = np.concatenate(self._strips)
+            self._strip_starts = np.cumsum(lengths) - lengths
+        inside = np.logical_or.reduceat(
+            vertex_mask[self._strip_vertices], self._strip_starts
+        )
+        return [self._strips[index] for index in np.flatnonzero(inside).tolist()]
+
+    def _draw_pixels(self, surface, points, clipped):
+        clip = surface.get_clip()
+        starts = points[self.edges[:, 0]]
+        ends = points[self.edges[:, 1]]
+        if clipped is not None:
+            starts = np.concatenate((starts[clipped.edge_mask], clipped.starts))
+            ends = np.concatenate((ends[clipped.edge_mask], clipped.ends))
+            points = points[clipped.vertex_mask]
+        xs, ys = self._segment_pixels(starts, ends, clip)
+        marker_xs, marker_ys = self._marker_pixels(points, clip)
+
+        pixels = pygame.surfarray.pixels3d(surface)
+        try:
+            pixels[xs, ys] = self.edge_color[:3]
+            pixels[marker_xs, marker_ys] = self.vertex_color[:3]
+        finally:
+            del pixels
+
+    def _segment_pixels(self, starts, ends, clip):
+        starts, ends, _ = clip_segments(starts, ends, clip)
+        if len(starts) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # pygame truncates float endpoints before stepping, so do the same
+        starts = np.floor(starts)
+        ends = np.floor(ends)
+        delta = ends - starts
+        steps = np.abs(delta).max(axis=1).astype(np.int64) + 1
+        segment = np.repeat(np.arange(len(starts)), steps)
+        first = np.repeat(np.cumsum(steps) - steps, steps)
+        t = (np.arange(segment.size) - first) / np.maximum(steps - 1, 1)[segment]
+
+        xs = np.rint(starts[segment, 0] + delta[segment, 0] * t).astype(np.int64)
+        ys = np.rint(starts[segment, 1] + delta[segment, 1] * t).astype(np.int64)
+
+        if self.line_width > 1:
+            # Thicken along the minor axis, the way pygame widens thin lines
+            x_major = (np.abs(delta[:, 0]) >= np.abs(delta[:, 1]))[segment]
+            offsets = np.arange(1, self.line_width)
+            xs = np.concatenate([xs] + [xs + np.where(x_major, 0, o) for o in offsets])
+            ys = np.concatenate([ys] + [ys + np.where(x_major, o, 0) for o in offsets])
+
+        return _inside(xs, ys, clip)
+
+    def _marker_pixels(self, points, clip):
+        if self._marker_offsets is None:
+            self._marker_offsets = _marker_offsets(self.vertex_radius)
+        centers = points.astype(np.int64)
+        offset_x, offset_y = self._marker_offsets
+        xs = (centers[:, 0, None] + offset_x[None, :]).reshape(-1)
+        ys = (centers[:, 1, None] + offset_y[None, :]).reshape(-1)
+        return _inside(xs, ys, clip)
+
+
+class SolidRenderer:
+    """Flat-shaded triangles rasterized through a NumPy z-buffer
+
+    Back faces, degenerate triangles and triangles that cover no pixel
+    center of the clip rect are dropped in bulk first, and triangles
+    crossing the near plane are cut down to their visible part and
+    reprojected with ``scale`` around the surface center, as the frustum
+    projects the points. The remaining triangles are expanded to the pixel
+    spans their barycentric half-planes cut out of every scanline. One
+    ``np.maximum.at`` per batch resolves the depth of every pixel, and only
+    the nearest fragments are written into the surface's pixel buffer; on
+    equal depth the later triangle wins. ``max_fragments`` bounds the memory
+    spent per batch of triangles.
+
+    With ``workers`` above one the framebuffer is split into square tiles of
+    ``tile_size`` pixels, triangles are binned by bounding box and the tiles
+    are filled concurrently on a thread pool, where the NumPy kernels run
+    without the GIL. Tiles own disjoint pixels and every pixel sees the same
+    fragments in the same order, so the output is identical to one worker.
+    """
+
+    def __init__(
+        self,
+        faces,
+        color=ACCENT_PRIMARY,
+        light=SOLID_LIGHT,
+        ambient=SOLID_AMBIENT,
+        camera_distance=CAMERA_DISTANCE,
+        scale=SCALE,
+        near=NEAR_PLANE,
+        max_fragments=1 << 20,
+        workers=RENDER_WORKERS,
+        tile_size=RENDER_TILE_SIZE,
+    ):
+        self.faces = np.ascontiguousarray(faces, dtype=np.int32).reshape(-1, 3)
+        self.color = np.asarray(color[:3], dtype=float)
+        light = np.asarray(light, dtype=float)
+        self.light = light / np.linalg.norm(light)
+        self.ambient = ambient
+        self.camera_distance = camera_distance
+        self.scale = scale
+        self.near = near
+        self.max_fragments = max_fragments
+        self.workers = workers
+        self.tile_size = tile_size
+        self._zbuffer = None
+        self._pool = None
+
+    def close(self):
+        """Shut down the tile worker threads, if any were started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def draw(self, surface, vertices, points, active=None):
+        """Fill the faces of camera-space ``vertices`` projected to ``points``
+
+        ``active`` optionally masks the vertices of culled instances.
+        """
+        faces = self.faces
+        if active is not None:
+            faces = faces[active[faces[:, 0]]]
+        corners = vertices[faces]
+        depths = corners[:, :, 2] + self.camera_distance
+
+        normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        # Front faces point back towards the camera at (0, 0, -camera_distance)
+        view = corners[:, 0].copy()
+        view[:, 2] = depths[:, 0]
+        front = np.einsum("ij,ij->i", normals, view) < 0
+        # Column by column; NumPy reduces along a short last axis slowly
+        inside = depths >= self.near
+        all_inside = inside[:, 0] & inside[:, 1] & inside[:, 2]
+        any_inside = inside[:, 0] | inside[:, 1] | inside[:, 2]
+        keep = front & all_inside
+        triangles = points[faces[keep]]
+        depths_kept = depths[keep]
+        normals_kept = normals[keep]
+
+        crossing = front & any_inside & ~all_inside
+        if crossing.any():
+            clipped, source = clip_triangles_near(
+                corners[crossing], depths[crossing], self.near
+            )
+            clipped_points = project_points(
+                clipped.reshape(-1, 3),
+                self.camera_distance,
+                self.scale,
+                surface.get_rect().center,
+            )
+            triangles = np.concatenate((triangles, clipped_points.reshape(-1, 3, 2)))
+            depths_kept = np.concatenate(
+                (depths_kept, clipped[:, :, 2] + self.camera_distance)
+            )
+            normals_kept = np.concatenate((normals_kept, normals[crossing][source]))
+
+        # Pixel-center bounds; triangles between pixel centers, off the clip
+        # rect or without area never reach a fragment, so they go before
+        # any shading or setup
+        clip = surface.get_clip()
+        first, second, third = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+        low = np.ceil(np.minimum(np.minimum(first, second), third) - 0.5)
+        high = np.floor(np.maximum(np.maximum(first, second), third) - 0.5) + 1
+        squared = np.einsum("ij,ij->i", normals_kept, normals_kept)
+        covers = (
+            (squared > 0)
+            & (np.maximum(low[:, 0], clip.left) < np.minimum(high[:, 0], clip.right))
+            & (np.maximum(low[:, 1], clip.top) < np.minimum(high[:, 1], clip.bottom))
+        )
+        normals_kept = normals_kept[covers] / np.sqrt(squared[covers])[:, None]
+
+        diffuse = np.clip(-(normals_kept @ self.light), 0.0, 1.0)
+        intensity = self.ambient + (1 - self.ambient) * diffuse
+        colors = (intensity[:, None] * self.color).astype(np.uint8)
+        self._rasterize(
+            surface,
+            triangles[covers],
+            low[covers],
+            high[covers],
+            1 / depths_kept[covers],
+            colors,
+        )
+
+    def _rasterize(self, surface, triangles, low, high, inverse_depths, colors):
+        clip = surface.get_clip()
+        size = surface.get_size()
+        if self._zbuffer is None or self._zbuffer.shape != size:
+            self._zbuffer = np.zeros(size)
+        self._zbuffer.fill(0.0)
+
+        if surface.get_bytesize() == 4:
+            # One 32-bit store per fragment instead of three strided bytes
+            pixels = pygame.surfarray.pixels2d(surface)
+            colors = _pack_colors(surface, colors)
+        else:
+            pixels = pygame.surfarray.pixels3d(surface)
+
+        slope_x, slope_y, offset = _barycentric_planes(triangles)
+        # Inverse depth is affine in screen space, like the barycentrics
+        inverse_depths = np.ascontiguousarray(inverse_depths.T)
+        setup = _TriangleSetup(
+            low,
+            high,
+            slope_x,
+            slope_y,
+            offset,
+            (slope_x * inverse_depths).sum(axis=0),
+            (slope_y * inverse_depths).sum(axis=0),
+            (offset * inverse_depths).sum(axis=0),
+            colors,
+        )
+        drawable = np.flatnonzero(np.isfinite(offset).all(axis=0))
+
+        try:
+            if self.workers > 1:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.workers)
+                jobs = [
+                    self._pool.submit(self._fill, pixels, setup, rect, candidates)
+                    for rect, candidates in self._bin(setup, drawable, clip)
+                ]
+                for job in jobs:
+                    job.result()
+            else:
+                self._fill(pixels, setup, clip, drawable)
+        finally:
+            del pixels
+
+    def _bin(self, setup, candidates, clip):
+        """Tiles of ``clip`` paired with the triangles whose bounds touch them"""
+        tile = self.tile_size
+        columns = -(-clip.width // tile)
+        low = setup.low[candidates] - (clip.left, clip.top)
+        high = setup.high[candidates] - (clip.left, clip.top) - 1
+        first = np.clip(low // tile, 0, None).astype(np.int64)
+        last = np.minimum(high // tile, (columns - 1, -(-clip.height // tile) - 1))
+        last = last.astype(np.int64)
+        spans = np.maximum(last - first + 1, 0)
+        counts = spans[:, 0] * spans[:, 1]
+
+        owner, local = _expand(
+            np.arange(len(candidates)), np.zeros(len(candidates), np.int64), counts
+        )
+        tile_x = first[owner, 0] + local % spans[owner, 0]
+        tile_y = first[owner, 1] + local // spans[owner, 0]
+        keys = tile_y * columns + tile_x
+        # A stable sort keeps each tile's triangles in drawing order
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        triangles = candidates[owner[order]]
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        for key, members in zip(keys[np.r_[0, bounds]], np.split(triangles, bounds)):
+            if len(members) == 0:
+                continue
+            row, column = divmod(int(key), columns)
+            rect = pygame.Rect(
+                clip.left + column * tile, clip.top + row * tile, tile, tile
+            )
+            yield rect.clip(clip), members
+
+    def _fill(self, pixels, setup, rect, candidates):
+        """Rasterize the ``candidates`` triangles into the pixels of ``rect``"""
+        depths = self._zbuffer.reshape(-1)
+        column = self._zbuffer.shape[1]
+        x0 = np.clip(setup.low[candidates, 0], rect.left, rect.right).astype(np.int64)
+        x1 = np.clip(setup.high[candidates, 0], rect.left, rect.right).astype(np.int64)
+        y0 = np.clip(setup.low[candidates, 1], rect.top, rect.bottom).astype(np.int64)
+        y1 = np.clip(setup.high[candidates, 1], rect.top, rect.bottom).astype(np.int64)
+        heights = np.maximum(y1 - y0, 0)
+        areas = np.maximum(x1 - x0, 0) * heights
+        drawable = np.flatnonzero(areas > 0)
+
+        for batch in _fragment_batches(areas[drawable], self.max_fragments):
+            local = drawable[batch]
+            row_owner, ys = _expand(local, y0[local], heights[local])
+            triangle = candidates[row_owner]
+            center_y = ys + 0.5
+
+            # Each barycentric bounds the span from one side along the row
+            slopes = setup.slope_x[:, triangle]
+            intercepts = setup.slope_y[:, triangle] * center_y
+            intercepts += setup.offset[:, triangle]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                bound = -intercepts / slopes
+            left = np.where(slopes > 0, bound, -np.inf).max(axis=0)
+            right = np.where(slopes < 0, bound, np.inf).min(axis=0)
+            row_x0 = x0[row_owner]
+            row_x1 = x1[row_owner]
+            left = np.ceil(np.clip(left, row_x0 - 1, row_x1) - 0.5)
+            right = np.floor(np.clip(right, row_x0 - 1, row_x1) - 0.5)
+            left = np.maximum(left.astype(np.int64), row_x0)
+            right = np.minimum(right.astype(np.int64) + 1, row_x1)
+            spans = np.maximum(right - left, 0)
+            spans[((slopes == 0) & (intercepts < 0)).any(axis=0)] = 0
+
+            owner, xs = _expand(triangle, left, spans)
+            ys = np.repeat(ys, spans)
+            depth = (
+                setup.depth_x[owner] * (xs + 0.5)
+                + setup.depth_y[owner] * (ys + 0.5)
+                + setup.depth_offset[owner]
+            )
+
+            # One unbuffered maximum per pixel resolves the depth test; the
+            # fragments matching it are the nearest ones, and with repeated
+            # indices the last of them is kept
+            keys = xs * column + ys
+            np.maximum.at(depths, keys, depth)
+            nearest = depth == depths[keys]
+            pixels[xs[nearest], ys[nearest]] = setup.colors[owner[nearest]]
+
+
+_TriangleSetup = namedtuple(
+    "_TriangleSetup",
+    "low high slope_x slope_y offset depth_x depth_y depth_offset colors",
+)
+
+
+def clip_triangles_near(corners, depths, near):
+    """Cut (T, 3, 3) triangles crossing the near plane to its visible side
+
+    ``depths`` are the corners' distances from the camera. A triangle with
+    one corner in front of the plane becomes a smaller triangle and one with
+    two becomes a quad split in two, both wound like the original. Returns
+    the (K, 3, 3) corners and the index of the triangle each came from.
+    """
+    inside = depths >= near
+    single = inside.sum(axis=1) == 1
+    rows = np.arange(len(corners))
+    # Rotate the corner on its own side of the plane to the front
+    odd = np.where(single, inside.argmax(axis=1), (~inside).argmax(axis=1))
+    order = (odd[:, None] + np.arange(3)) % 3
+    corners = corners[rows[:, None], order]
+    depths = depths[rows[:, None], order]
+
+    cuts = []
+    for other in (1, 2):
+        t = (near - depths[:, 0]) / (depths[:, other] - depths[:, 0])
+        cuts.append(corners[:, 0] + (corners[:, other] - corners[:, 0]) * t[:, None])
+    first, second = cuts
+
+    double = ~single
+    triangles = np.concatenate(
+        (
+            np.stack((corners[single, 0], first[single], second[single]), axis=1),
+            np.stack((first[double], corners[double, 1], corners[double, 2]), axis=1),
+            np.stack((first[double], corners[double, 2], second[double]), axis=1),
+        )
+    )
+    return triangles, np.concatenate((rows[single], rows[double], rows[double]))
+
+
+def _pack_colors(surface, colors):
+    """(T, 3) RGB colors as the pixel values of the 32-bit ``surface``"""
+    shifts = np.array(surface.get_shifts()[:3], dtype=np.uint32)
+    losses = np.array(surface.get_losses()[:3], dtype=np.uint32)
+    packed = (colors.astype(np.uint32) >> losses) << shifts
+    opaque = np.uint32(surface.get_masks()[3])
+    return packed[:, 0] | packed[:, 1] | packed[:, 2] | opaque
+
+
+def _barycentric_planes(triangles):
+    """Per-triangle affine coefficients of the three barycentric coordinates
+
+    Returns (3, T) arrays so that the weight of corner ``k`` at screen
+    position (x, y) is ``slope_x[k] * x + slope_y[k] * y + offset[k]``; one
+    contiguous row per corner keeps the per-corner folds cheap. Degenerate
+    triangles come out non-finite.
+    """
+    xs = np.ascontiguousarray(triangles[:, :, 0].T)
+    ys = np.ascontiguousarray(triangles[:, :, 1].T)
+    starts_x, starts_y = xs[[1, 2, 0]], ys[[1, 2, 0]]
+    dx = xs[[2, 0, 1]] - starts_x
+    dy = ys[[2, 0, 1]] - starts_y
+    doubled_area = (xs[1] - xs[0]) * (ys[2] - ys[0]) - (ys[1] - ys[0]) * (xs[2] - xs[0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (
+            -dy / doubled_area,
+            dx / doubled_area,
+            (dy * starts_x - dx * starts_y) / doubled_area,
+        )
+
+
+def _expand(owners, starts, counts):
+    """Repeat every owner ``count`` times alongside start, start + 1, ..."""
+    repeated = np.repeat(owners, counts)
+    local = np.arange(repeated.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return repeated, np.repeat(starts, counts) + local
+
+
+def _fragment_batches(areas, limit):
+    """Split triangles into consecutive index ranges of about ``limit`` pixels"""
+    if len(areas) == 0:
+        return
+    ends = np.cumsum(areas)
+    start = 0
+    while start < len(areas):
+        offset = ends[start - 1] if start else 0
+        stop = int(np.searchsorted(ends, offset + limit, side="right"))
+        stop = max(stop, start + 1)
+        yield slice(start, stop)
+        start = stop
+
+
+def _inside_runs(strip, vertex_mask):
+    """Split a strip into the runs of consecutive vertices inside the frustum"""
+    if vertex_mask is None:
+        return (strip,)
+    inside = vertex_mask[strip]
+    breaks = np.flatnonzero(np.diff(inside.view(np.int8))) + 1
+    return [
+        run for run in np.split(strip, breaks) if len(run) > 1 and vertex_mask[run[0]]
+    ]
+
+
+def _inside(xs, ys, rect):
+    mask = (xs >= rect.left) & (xs < rect.right) & (ys >= rect.top) & (ys < rect.bottom)
+    return xs[mask], ys[mask]
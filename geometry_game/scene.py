@@ -0,0 +1,240 @@
+import itertools
+import numpy as np
+from geometry_game.geometry import Transformation, TransformStack
+
+
+class SceneNode:
+    """A node with its own local transformation stack and optional mesh
+
+    Edit ``transformations`` freely, then call ``invalidate`` so the scene
+    recomputes the world matrices of this node's subtree on the next update.
+    Setting ``local_matrix`` overrides the stack's composite, e.g. while an
+    animation blends between stack states. With ``fused`` set, a rigid stack
+    is converted from the dual quaternion its treap keeps fused instead of
+    taking the matrix chain; stacks that scale or shear still use the chain.
+    """
+
+    def __init__(self, mesh=None, transformations=(), name=None):
+        if not isinstance(transformations, TransformStack):
+            transformations = TransformStack(transformations)
+        self.mesh = mesh
+        self.transformations = transformations
+        self.name = name
+        self.local_matrix = None
+        self.fused = False
+        self._fused_matrix = np.identity(4)
+        self.parent = None
+        self.children = []
+        self.scene = None
+        self.world = np.identity(4)
+        self._batch = None
+        self._slot = None
+
+    def invalidate(self):
+        if self.scene is not None:
+            self.scene._dirty.add(self)
+
+    def composite(self):
+        """The local matrix of ``transformations``, see ``fused``"""
+        if self.fused:
+            dual = self.transformations.rigid_composite
+            if dual is not None:
+                return dual.to_matrix(out=self._fused_matrix)
+        return self.transformations.composite
+
+    def walk(self):
+        pending = [self]
+        while pending:
+            node = pending.pop()
+            yield node
+            pending.extend(reversed(node.children))
+
+
+class MeshBatch:
+    """All instances of one mesh, with their world matrices in one (K, 4, 4) array"""
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.nodes = []
+        self._matrices = np.empty((0, 4, 4))
+        self._edges = self._faces = None
+        self._sphere = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def set_mesh(self, mesh):
+        """Draw every instance with another mesh of the same object, e.g. a level of detail"""
+        self.mesh = mesh
+        self._edges = self._faces = None
+        self._sphere = None
+
+    @property
+    def matrices(self):
+        return self._matrices[: len(self.nodes)]
+
+    def add(self, node):
+        count = len(self.nodes)
+        if count == len(self._matrices):
+            grown = np.empty((max(4, count * 2), 4, 4))
+            grown[:count] = self._matrices[:count]
+            self._matrices = grown
+        self._matrices[count] = node.world
+        node._batch, node._slot = self, count
+        self.nodes.append(node)
+        self._edges = self._faces = None
+
+    def remove(self, node):
+        last = self.nodes.pop()
+        if last is not node:
+            self.nodes[node._slot] = last
+            self._matrices[node._slot] = self._matrices[last._slot]
+            last._slot = node._slot
+        node._batch = node._slot = None
+        self._edges = self._faces = None
+
+    def bounding_sphere(self):
+        """The mesh's bounding sphere in object space, computed once per mesh"""
+        if self._sphere is None:
+            self._sphere = self.mesh.bounding_sphere()
+        return self._sphere
+
+    def transform(self, post=None, mask=None):
+        """Vertices of every instance as a (K, N, 3) array, in one batched matmul
+
+        ``post`` is applied in each instance's object space before its world
+        matrix, the way the auto-rotation spins every object in place.
+        ``mask`` restricts the work to the selected instances.
+        """
+        matrices = self.matrices if mask is None else self.matrices[mask]
+        matrices = self._with_post(matrices, post)
+        linear = matrices[:, :3, :3].transpose(0, 2, 1)
+        transformed = np.matmul(self.mesh.vertices, linear)
+        transformed += matrices[:, None, :3, 3]
+        return transformed
+
+    @staticmethod
+    def _with_post(matrices, post):
+        return matrices if post is None else np.matmul(matrices, post)
+
+    def instance_edges(self):
+        """Edge indices into the flattened (K * N, 3) output of ``transform``"""
+        if self._edges is None:
+            self._edges = self._instance_indices(self.mesh.edges)
+        return self._edges
+
+    def instance_faces(self):
+        """Triangle indices into the flattened output of ``transform``"""
+        if self._faces is None:
+            faces = self.mesh.faces
+            if faces is None:
+                faces = np.empty((0, 3), dtype=np.int32)
+            self._faces = self._instance_indices(faces)
+        return self._faces
+
+    def _instance_indices(self, indices):
+        offsets = np.arange(len(self.nodes), dtype=np.int32) * len(self.mesh.vertices)
+        return (indices[None] + offsets[:, None, None]).reshape(-1, indices.shape[1])
+
+
+class Scene:
+    """Hierarchy of mesh instances with incrementally updated world matrices"""
+
+    def __init__(self):
+        self.root = SceneNode(name="root")
+        self.root.scene = self
+        self._batches = {}
+        self._dirty = {self.root}
+
+    def add(self, node, parent=None):
+        parent = parent or self.root
+        node.parent = parent
+        parent.children.append(node)
+        for child in node.walk():
+            child.scene = self
+            if child.mesh is not None:
+                self.batch(child.mesh).add(child)
+        node.invalidate()
+        return node
+
+    def remove(self, node):
+        node.parent.children.remove(node)
+        node.parent = None
+        for child in node.walk():
+            if child._batch is not None:
+                child._batch.remove(child)
+            child.scene = None
+            self._dirty.discard(child)
+
+    def batch(self, mesh):
+        key = id(mesh)
+        if key not in self._batches:
+            self._batches[key] = MeshBatch(mesh)
+        return self._batches[key]
+
+    def batches(self):
+        return [batch for batch in self._batches.values() if len(batch)]
+
+    def update(self):
+        """Recompute world matrices below every node invalidated since the last update"""
+        if not self._dirty:
+            return
+        dirty = self._dirty
+        self._dirty = set()
+        for node in dirty:
+            if not any(ancestor in dirty for ancestor in _ancestors(node)):
+                self._update_subtree(node)
+
+    def _update_subtree(self, node):
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            local = current.local_matrix
+            if local is None:
+                local = current.composite()
+            if current.parent is None:
+                current.world[...] = local
+            else:
+                np.matmul(current.parent.world, local, out=current.world)
+            if current._batch is not None:
+                current._batch._matrices[current._slot] = current.world
+            pending.extend(current.children)
+
+
+def _ancestors(node):
+    node = node.parent
+    while node is not None:
+        yield node
+        node = node.parent
+
+
+def grid_scene(mesh, count, transformations=()):
+    """Scene with ``count`` ** 3 instances of ``mesh`` filling the default cube
+
+    The root node carries ``transformations``, so editing that stack moves
+    the whole grid. Returns the scene, its root node and the mesh batch.
+    """
+    scene = Scene()
+    root = scene.root
+    if not isinstance(transformations, TransformStack):
+        transformations = TransformStack(transformations)
+    root.transformations = transformations
+
+    if count <= 1:
+        root.mesh = mesh
+        scene.batch(mesh).add(root)
+        return scene, root, scene.batch(mesh)
+
+    size = 1 / count
+    for i, j, k in itertools.product(range(count), repeat=3):
+        offset = [(2 * index + 1) * size - 1 for index in (i, j, k)]
+        local = [
+            Transformation(
+                "translate", {"x": offset[0], "y": offset[1], "z": offset[2]}
+            ),
+            Transformation(
+                "scale", {"x": size * 0.8, "y": size * 0.8, "z": size * 0.8}
+            ),
+        ]
+        scene.add(SceneNode(mesh, local), root)
+    return scene, root, scene.batch(mesh)
@@ -0,0 +1,103 @@
+import time
+import pygame
+from geometry_game.constants import (
+    SIMULATION_STEP,
+    RENDER_FPS,
+    IDLE_FPS,
+    IDLE_DELAY,
+    IDLE_TIMEOUT,
+)
+
+
+class Scheduler:
+    """Fixed-timestep updates decoupled from a paced render rate
+
+    ``advance`` adds the real time since the previous frame to an
+    accumulator and returns how many ``step``-sized updates to simulate,
+    leaving the remainder as ``alpha`` for interpolating between the last
+    two simulated states. ``wait`` paces rendering to ``fps`` (0 renders
+    uncapped), dropping to ``idle_fps`` once nothing has animated or
+    received input for ``idle_delay`` seconds. A static scene does not
+    poll at all: ``wait`` blocks on the event queue until input or a timer
+    event arrives, waking at most every ``idle_timeout`` seconds (0 waits
+    for input indefinitely).
+    """
+
+    def __init__(
+        self,
+        step=SIMULATION_STEP,
+        fps=RENDER_FPS,
+        idle_fps=IDLE_FPS,
+        idle_delay=IDLE_DELAY,
+        idle_timeout=IDLE_TIMEOUT,
+        max_steps=8,
+        clock=time.perf_counter,
+        sleep=time.sleep,
+    ):
+        self.step = step
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.idle_delay = idle_delay
+        self.idle_timeout = idle_timeout
+        # Caps the catch-up after a stall so updates never spiral
+        self.max_steps = max_steps
+        self.alpha = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._accumulator = 0.0
+        now = clock()
+        self._previous = now
+        self._last_activity = now
+        self._next_frame = now
+
+    def advance(self):
+        now = self._clock()
+        elapsed = min(now - self._previous, self.step * self.max_steps)
+        self._previous = now
+        self._accumulator += elapsed
+        steps = int(self._accumulator / self.step)
+        self._accumulator -= steps * self.step
+        self.alpha = self._accumulator / self.step
+        return steps
+
+    def poke(self):
+        """Record input or animation, keeping the full render rate"""
+        self._last_activity = self._clock()
+
+    @property
+    def idle(self):
+        return self._clock() - self._last_activity >= self.idle_delay
+
+    def wait(self, static=False):
+        """Sleep until the next frame is due at the current render rate
+
+        With ``static`` set, nothing would change before new input, so block
+        in ``pygame.event.wait`` for up to ``idle_timeout`` instead. Returns
+        the events taken off the queue while waiting, for the caller to
+        handle with the next frame.
+        """
+        if static:
+            event = pygame.event.wait(int(self.idle_timeout * 1000))
+            # Time spent blocked is neither a stall to catch up on nor a
+            # late frame to pace against
+            now = self._clock()
+            self._previous = now
+            self._next_frame = now
+            return [] if event.type == pygame.NOEVENT else [event]
+
+        fps = self.idle_fps if self.idle else self.fps
+        now = self._clock()
+        if not fps:
+            self._next_frame = now
+            return []
+        self._next_frame += 1 / fps
+        if self._next_frame <= now:
+            # Running behind: resynchronize instead of bursting to catch up
+            self._next_frame = now
+            return []
+        self._sleep(self._next_frame - now)
+        return []
+
+
+def interpolate(previous, current, alpha):
+    return previous + (current - previous) * alpha
@@ -0,0 +1,307 @@
+import json
+import os
+import struct
+import numpy as np
+from geometry_game.geometry import (
+    PARAM_NAMES,
+    TRANSFORM_TYPES,
+    Transformation,
+    TransformStack,
+    matrices_from_arrays,
+)
+from geometry_game.quaternion import (
+    RIGID_TYPES,
+    ROTATION_AXES,
+    dual_arrays,
+    reduce_duals,
+)
+from geometry_game.constants import CAMERA_DISTANCE, SCALE
+
+SESSION_MAGIC = b"GGSS"
+SESSION_VERSION = 2
+MAX_PARAMS = max(len(names) for names in PARAM_NAMES.values())
+
+_RIGID_CODES = [TRANSFORM_TYPES.index(name) for name in RIGID_TYPES]
+_TRANSLATE = TRANSFORM_TYPES.index("translate")
+# Rotation axis of each type code, unused for the other types
+_AXIS_TABLE = np.array(
+    [ROTATION_AXES.get(name, (0.0, 0.0, 0.0)) for name in TRANSFORM_TYPES]
+)
+
+# magic, version, flags, stack length, rotation angle, camera distance,
+# scale and the byte length of the mesh path that follows the header
+_HEADER = struct.Struct("<4sHHQdddH")
+# Bytes per entry of the matrices that version 1 stored after the
+# parameters; they are rebuilt from the parameters instead
+_MATRIX_BYTES = {1: 8 * 16, SESSION_VERSION: 0}
+_AUTO_ROTATE = 1
+
+
+class Session:
+    """Restorable window state: mesh reference, stack, camera and rotation
+
+    The stack is kept as arrays with one row per transformation, its index
+    in TRANSFORM_TYPES and its parameters in PARAM_NAMES order, so a session
+    loads without any per-entry parsing. ``stack`` wraps them in a
+    TransformStack that only builds the Transformation objects it is asked
+    for, and indexing builds a single one.
+    """
+
+    def __init__(
+        self,
+        types=(),
+        params=None,
+        mesh_path=None,
+        rotation_angle=0.0,
+        auto_rotate=True,
+        camera_distance=CAMERA_DISTANCE,
+        scale=SCALE,
+    ):
+        self.types = np.asarray(types, dtype=np.uint8)
+        count = len(self.types)
+        self.params = np.zeros((count, MAX_PARAMS)) if params is None else params
+        self.mesh_path = mesh_path
+        self.rotation_angle = float(rotation_angle)
+        self.auto_rotate = bool(auto_rotate)
+        self.camera_distance = float(camera_distance)
+        self.scale = float(scale)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        transform_type = TRANSFORM_TYPES[self.types[index]]
+        names = PARAM_NAMES[transform_type]
+        row = self.params[index, : len(names)].tolist()
+        return Transformation(transform_type, dict(zip(names, row)))
+
+    @classmethod
+    def capture(cls, transformations, **state):
+        transformations = list(transformations)
+        count = len(transformations)
+        types = np.fromiter(
+            (TRANSFORM_TYPES.index(transform.type) for transform in transformations),
+            dtype=np.uint8,
+            count=count,
+        )
+        params = np.zeros((count, MAX_PARAMS))
+        for row, transform in zip(params, transformations):
+            names = PARAM_NAMES[transform.type]
+            default = _default(transform.type)
+            row[: len(names)] = [
+                float(transform.params.get(name, default)) for name in names
+            ]
+        return cls(types, params, **state)
+
+    def transformations(self):
+        return [self[index] for index in range(len(self))]
+
+    def stack(self):
+        """TransformStack over the saved entries, ready without building them"""
+        return TransformStack.deferred(self, self.composite(), self.rigid_composite())
+
+    def composite(self):
+        """Product of the stack's matrices, reduced pairwise without the objects"""
+        matrices = matrices_from_arrays(self.types, self.params)
+        if len(matrices) == 0:
+            return np.identity(4)
+        while len(matrices) > 1:
+            if len(matrices) % 2:
+                matrices = np.concatenate((matrices, np.identity(4)[None]))
+            matrices = np.matmul(matrices[0::2], matrices[1::2])
+        return matrices[0]
+
+    def rigid_composite(self):
+        """Fused DualQuaternion of the stack, None if anything scales or shears"""
+        if not np.isin(self.types, _RIGID_CODES).all():
+            return None
+        translation = self.types == _TRANSLATE
+        angles = np.where(translation, 0.0, self.params[:, 0])
+        translations = np.where(translation[:, None], self.params[:, :3], 0.0)
+        return reduce_duals(*dual_arrays(_AXIS_TABLE[self.types], angles, translations))
+
+    def to_bytes(self):
+        mesh_path = (self.mesh_path or "").encode("utf-8")
+        header = _HEADER.pack(
+            SESSION_MAGIC,
+            SESSION_VERSION,
+            _AUTO_ROTATE if self.auto_rotate else 0,
+            len(self),
+            self.rotation_angle,
+            self.camera_distance,
+            self.scale,
+            len(mesh_path),
+        )
+        return b"".join(
+            (
+                header,
+                mesh_path,
+                self.types.tobytes(),
+                np.ascontiguousarray(self.params, dtype="<f8").tobytes(),
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size:
+            raise ValueError("Truncated session header")
+        magic, version, flags, count, angle, distance, scale, path_length = (
+            _HEADER.unpack_from(data)
+        )
+        if magic != SESSION_MAGIC:
+            raise ValueError("Not a session file")
+        if version not in _MATRIX_BYTES:
+            raise ValueError(f"Unsupported session version {version}")
+
+        offset = _HEADER.size + path_length
+        mesh_path = bytes(data[_HEADER.size : offset]).decode("utf-8") or None
+        expected = offset + count * (1 + 8 * MAX_PARAMS + _MATRIX_BYTES[version])
+        if len(data) != expected:
+            raise ValueError("Session size does not match its header")
+
+        types = np.frombuffer(data, dtype=np.uint8, count=count, offset=offset)
+        offset += count
+        params = np.frombuffer(data, "<f8", count * MAX_PARAMS, offset)
+        if count and types.max() >= len(TRANSFORM_TYPES):
+            raise ValueError("Unknown transformation type code in session")
+        return cls(
+            types,
+            params.reshape(count, MAX_PARAMS),
+            mesh_path=mesh_path,
+            rotation_angle=angle,
+            auto_rotate=flags & _AUTO_ROTATE,
+            camera_distance=distance,
+            scale=scale,
+        )
+
+    def to_dict(self):
+        return {
+            "version": SESSION_VERSION,
+            "mesh": self.mesh_path,
+            "camera": {"distance": self.camera_distance, "scale": self.scale},
+            "rotation": {"auto": self.auto_rotate, "angle": self.rotation_angle},
+            "transformations": [
+                {"type": transform.type, "params": transform.params}
+                for transform in self.transformations()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        camera = data.get("camera", {})
+        rotation = data.get("rotation", {})
+        transformations = [
+            Transformation(item["type"], dict(item.get("params", {})))
+            for item in data.get("transformations", [])
+        ]
+        return cls.capture(
+            transformations,
+            mesh_path=data.get("mesh"),
+            rotation_angle=rotation.get("angle", 0.0),
+            auto_rotate=rotation.get("auto", True),
+            camera_distance=camera.get("distance", CAMERA_DISTANCE),
+            scale=camera.get("scale", SCALE),
+        )
+
+
+def _default(transform_type):
+    return 1.0 if transform_type == "scale" else 0.0
+
+
+def save_session(path, session):
+    """Write the binary format, or JSON when ``path`` ends in .json"""
+    temporary = path + ".tmp"
+    if path.lower().endswith(".json"):
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(session.to_dict(), file, indent=2)
+    else:
+        with open(temporary, "wb") as file:
+            file.write(session.to_bytes())
+    # Never leave a half-written session behind
+    os.replace(temporary, path)
+
+
+def load_session(path):
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as file:
+            return Session.from_dict(json.load(file))
+    with open(path, "rb") as file:
+        return Session.from_bytes(file.read())
+
+
+class SessionLog:
+    """Append-only autosave of the edits made after a session was loaded
+
+    Each stack edit or rotation toggle is one JSON line, flushed as it is
+    written. ``replay`` applies a log on top of the session it started from.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, transform):
+        self._write(
+            {"op": "append", "type": transform.type, "params": transform.params}
+        )
+
+    def pop(self, index):
+        self._write({"op": "pop", "index": index})
+
+    def rotation(self, auto_rotate, angle):
+        self._write({"op": "rotation", "auto": auto_rotate, "angle": angle})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    @staticmethod
+    def replay(path, session):
+        transformations = session.transformations()
+        state = {
+            "mesh_path": session.mesh_path,
+            "rotation_angle": session.rotation_angle,
+            "auto_rotate": session.auto_rotate,
+            "camera_distance": session.camera_distance,
+            "scale": session.scale,
+        }
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can cut off the last line mid-write
+                    break
+                if record["op"] == "append":
+                    transformations.append(
+                        Transformation(record["type"], record["params"])
+                    )
+                elif record["op"] == "pop":
+                    # A log left over from another session can point past
+                    # the end of this stack
+                    if -len(transformations) <= record["index"] < len(transformations):
+                        transformations.pop(record["index"])
+                elif record["op"] == "rotation":
+                    state["auto_rotate"] = record["auto"]
+                    state["rotation_angle"] = record["angle"]
+        return Session.capture(transformations, **state)
+
+
+def restore_session(path):
+    """The session at ``path`` with any leftover autosave log applied
+
+    A log left by a run that did not exit cleanly is folded into a fresh
+    snapshot and removed. Returns None when there is nothing to restore.
+    """
+    log_path = path + ".log"
+    session = load_session(path) if os.path.exists(path) else None
+    if os.path.exists(log_path):
+        session = SessionLog.replay(log_path, session or Session())
+        save_session(path, session)
+        os.remove(log_path)
+    return session
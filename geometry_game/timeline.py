@@ -0,0 +1,213 @@
+import json
+from collections import namedtuple
+import numpy as np
+from geometry_game.geometry import (
+    PARAM_NAMES,
+    TRANSFORM_TYPES,
+    Transformation,
+    matrices_from_arrays,
+)
+from geometry_game.constants import RENDER_FPS
+
+# Easing of the way from one keyframe to the next, u in [0, 1]
+CURVES = {
+    "linear": lambda u: u,
+    "step": np.floor,
+    "ease": lambda u: u * u * (3 - 2 * u),
+    "ease_in": lambda u: u * u,
+    "ease_out": lambda u: u * (2 - u),
+}
+
+Keyframe = namedtuple("Keyframe", "time value curve", defaults=("linear",))
+Keyframe.__doc__ = """A value at a time, eased towards the next keyframe by ``curve``"""
+
+
+class Track:
+    """Keyframes of one parameter of one transformation in a stack"""
+
+    def __init__(self, index, param, keyframes=()):
+        self.index = index
+        self.param = param
+        self.keyframes = []
+        for keyframe in keyframes:
+            self.add(*keyframe)
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    def add(self, time, value, curve="linear"):
+        """Insert a keyframe, replacing any existing one at the same time"""
+        if curve not in CURVES:
+            raise ValueError(f"Unknown interpolation curve: {curve}")
+        keyframe = Keyframe(float(time), float(value), curve)
+        self.remove(keyframe.time)
+        self.keyframes.append(keyframe)
+        self.keyframes.sort()
+        return keyframe
+
+    def remove(self, time):
+        self.keyframes = [key for key in self.keyframes if key.time != time]
+
+    def sample(self, times):
+        """Values at every time in ``times``, held constant outside the keys"""
+        times = np.asarray(times, dtype=float)
+        if not self.keyframes:
+            raise ValueError(f"Track {self.index}.{self.param} has no keyframes")
+        key_times = np.array([key.time for key in self.keyframes])
+        values = np.array([key.value for key in self.keyframes])
+        if len(values) == 1:
+            return np.full(times.shape, values[0])
+
+        segment = np.searchsorted(key_times, times, side="right") - 1
+        segment = np.clip(segment, 0, len(key_times) - 2)
+        start = key_times[segment]
+        u = np.clip((times - start) / (key_times[segment + 1] - start), 0.0, 1.0)
+
+        curves = [key.curve for key in self.keyframes]
+        eased = np.empty_like(u)
+        for name in set(curves[:-1]):
+            selected = np.isin(segment, [i for i, c in enumerate(curves) if c == name])
+            eased[selected] = CURVES[name](u[selected])
+        low = values[segment]
+        return low + (values[segment + 1] - low) * eased
+
+
+class Timeline:
+    """Keyframed parameters of a transformation stack, baked to composites
+
+    ``matrices`` samples every track once per frame at ``fps`` and caches
+    the composite of the whole stack for each frame in a (T, 4, 4) array,
+    so playback and scrubbing are lookups. The cache is rebuilt after
+    ``keyframe``; call ``invalidate`` after editing the transformations
+    directly. A looping timeline wraps at ``duration``, otherwise it holds
+    the last frame.
+    """
+
+    def __init__(self, transformations=(), duration=1.0, fps=RENDER_FPS, loop=True):
+        self.transformations = list(transformations)
+        self.duration = float(duration)
+        self.fps = fps
+        self.loop = loop
+        self.tracks = {}
+        self._matrices = None
+
+    @property
+    def frame_count(self):
+        count = max(1, int(round(self.duration * self.fps)))
+        return count if self.loop else count + 1
+
+    def track(self, index, param):
+        """The track animating ``param`` of transformation ``index``, created on demand"""
+        key = (index, param)
+        if key not in self.tracks:
+            if not 0 <= index < len(self.transformations):
+                raise ValueError(f"No transformation at index {index}")
+            transform_type = self.transformations[index].type
+            if param not in PARAM_NAMES.get(transform_type, ()):
+                raise ValueError(f"{transform_type} has no parameter {param}")
+            self.tracks[key] = Track(index, param)
+        return self.tracks[key]
+
+    def keyframe(self, index, param, time, value, curve="linear"):
+        keyframe = self.track(index, param).add(time, value, curve)
+        self.invalidate()
+        return keyframe
+
+    def invalidate(self):
+        self._matrices = None
+
+    def times(self):
+        return np.arange(self.frame_count) / self.fps
+
+    def matrices(self):
+        if self._matrices is None:
+            self._matrices = self._bake()
+        return self._matrices
+
+    def frame_index(self, time):
+        index = int(round(time * self.fps))
+        if self.loop:
+            return index % self.frame_count
+        return min(max(index, 0), self.frame_count - 1)
+
+    def matrix_at(self, time):
+        return self.matrices()[self.frame_index(time)]
+
+    def _bake(self):
+        times = self.times()
+        count = len(times)
+        animated = {}
+        for (index, param), track in self.tracks.items():
+            if len(track):
+                animated.setdefault(index, {})[param] = track.sample(times)
+
+        # Runs of static transformations collapse into one constant matrix,
+        # only the animated ones are built per frame, all frames at once
+        composite = None
+        constant = np.identity(4)
+        for index, transform in enumerate(self.transformations):
+            samples = animated.get(index)
+            if samples is None:
+                constant = constant @ transform.matrix
+                continue
+            names = PARAM_NAMES[transform.type]
+            default = 1.0 if transform.type == "scale" else 0.0
+            params = np.empty((count, len(names)))
+            for column, name in enumerate(names):
+                params[:, column] = samples.get(
+                    name, float(transform.params.get(name, default))
+                )
+            types = np.full(count, TRANSFORM_TYPES.index(transform.type))
+            frames = matrices_from_arrays(types, params)
+            left = constant if composite is None else np.matmul(composite, constant)
+            composite = np.matmul(left, frames)
+            constant = np.identity(4)
+
+        if composite is None:
+            return np.repeat(constant[None], count, axis=0)
+        return np.matmul(composite, constant)
+
+    def to_dict(self):
+        return {
+            "duration": self.duration,
+            "loop": self.loop,
+            "transformations": [
+                {"type": transform.type, "params": dict(transform.params)}
+                for transform in self.transformations
+            ],
+            "tracks": [
+                {
+                    "index": track.index,
+                    "param": track.param,
+                    "keyframes": [list(key) for key in track.keyframes],
+                }
+                for track in self.tracks.values()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data, fps=RENDER_FPS):
+        timeline = cls(
+            [
+                Transformation(item["type"], dict(item.get("params", {})))
+                for item in data.get("transformations", [])
+            ],
+            duration=data.get("duration", 1.0),
+            fps=fps,
+            loop=data.get("loop", True),
+        )
+        for item in data.get("tracks", []):
+            track = timeline.track(int(item["index"]), item["param"])
+            for keyframe in item.get("keyframes", []):
+                track.add(*keyframe)
+        return timeline
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path, fps=RENDER_FPS):
+        """Read a timeline written by ``save``, to be baked at ``fps``"""
+        with open(path, encoding="utf-8") as file:
+            return cls.from_dict(json.load(file), fps=fps)
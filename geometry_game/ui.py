@@ -1,13 +1,18 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 import pygame
+import numpy as np
+from geometry_game import constants
 from geometry_game.constants import (
     BUTTON_GLASS,
     BUTTON_BORDER,
     WHITE,
-    BACKGROUND_GRADIENT,
     WIDTH,
     HEIGHT,
     TRANSFORM_COLORS,
     RED,
+    TEXT_CACHE_MAX_BYTES,
+    TEXT_CACHE_GLYPH_ATLAS,
 )
 
 
@@ -16,51 +21,227 @@ title_font = pygame.font.Font(None, 36)
 main_font = pygame.font.Font(None, 24)
 
 
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color, antialias)
+
+    Entries are evicted oldest first once their pixel data exceeds
+    ``max_bytes``. With ``glyph_atlas`` enabled, strings that miss the cache
+    are composed from cached per-glyph surfaces instead of being rasterized
+    by the font again; the glyphs share the same LRU order and byte budget.
+    Returned surfaces are shared and must not be modified.
+    """
+
+    def __init__(self, max_bytes=TEXT_CACHE_MAX_BYTES, glyph_atlas=False):
+        self.max_bytes = max_bytes
+        self.glyph_atlas = glyph_atlas
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def render(self, font, text, antialias, color):
+        key = ("text", font, text, tuple(color), antialias)
+        cached_surface = self._entries.get(key)
+        if cached_surface is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached_surface
+
+        self.misses += 1
+        if self.glyph_atlas and text:
+            rendered = self._compose(font, text, key[3], antialias)
+        else:
+            rendered = font.render(text, antialias, color)
+        self._store(key, rendered)
+        self._evict()
+        return rendered
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def _store(self, key, surface):
+        self._entries[key] = surface
+        self.bytes_used += _surface_bytes(surface)
+
+    def _evict(self):
+        while self.bytes_used > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= _surface_bytes(evicted)
+
+    def _glyph(self, font, char, color, antialias):
+        key = ("glyph", font, char, color, antialias)
+        glyph = self._entries.get(key)
+        if glyph is None:
+            rendered = font.render(char, antialias, color)
+            glyph = pygame.Surface(rendered.get_size(), pygame.SRCALPHA)
+            glyph.blit(rendered, (0, 0))
+            self._store(key, glyph)
+        else:
+            self._entries.move_to_end(key)
+        return glyph
+
+    def _compose(self, font, text, color, antialias):
+        composed = pygame.Surface(font.size(text), pygame.SRCALPHA)
+        x = 0
+        for i, char in enumerate(text):
+            glyph = self._glyph(font, char, color, antialias)
+            if i:
+                # The pair's width less this glyph's box is the pen step from
+                # the previous glyph, kerning included
+                x += font.size(text[i - 1 : i + 1])[0] - glyph.get_width()
+            # Glyph boxes overlap a little; MAX keeps the stronger coverage
+            composed.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        return composed
+
+
+def _surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+text_cache = TextCache(glyph_atlas=TEXT_CACHE_GLYPH_ATLAS)
+
+
+def render_text(font, text, antialias, color):
+    """Cached drop-in for ``font.render(text, antialias, color)``"""
+    return text_cache.render(font, text, antialias, color)
+
+
+class BackgroundCache:
+    """Keeps the gradient background pre-rendered for the current size and theme"""
+
+    def __init__(self):
+        self._key = None
+        self._surface = None
+
+    def get(self, size, gradient=None):
+        if gradient is None:
+            # Looked up on every call, so a theme change is picked up
+            gradient = constants.BACKGROUND_GRADIENT
+        key = (tuple(size), tuple(tuple(color) for color in gradient))
+        if key != self._key:
+            self._surface = self._render(size, gradient)
+            self._key = key
+        return self._surface
+
+    @staticmethod
+    def _render(size, gradient):
+        width, height = size
+        top = np.array(gradient[0][:3], dtype=np.float64)
+        bottom = np.array(gradient[1][:3], dtype=np.float64)
+        t = np.arange(height, dtype=np.float64)[:, None] / height
+        rows = (top + (bottom - top) * t).astype(np.uint8)
+
+        pixels = np.broadcast_to(rows[None, :, :], (width, height, 3))
+        surface = pygame.surfarray.make_surface(np.ascontiguousarray(pixels))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+
+background_cache = BackgroundCache()
+
+
 def draw_background(surface):
-    for i in range(HEIGHT):
-        color = [
-            BACKGROUND_GRADIENT[0][j]
-            + (BACKGROUND_GRADIENT[1][j] - BACKGROUND_GRADIENT[0][j]) * (i / HEIGHT)
-            for j in range(3)
-        ]
-        pygame.draw.line(surface, color, (0, i), (WIDTH, i))
+    surface.blit(background_cache.get(surface.get_size()), (0, 0))
+
+
+class RetainedWidget(ABC):
+    """Base for widgets that keep their rendered surfaces between frames
+
+    Subclasses describe their current look with ``state_key`` and the screen
+    area they cover with ``bounds``. The main loop uses ``is_dirty`` and
+    ``dirty_rect`` to decide which parts of the display need an update.
+    """
+
+    def __init__(self):
+        self._surfaces = {}
+        self._drawn_key = None
+        self._drawn_rect = None
+
+    @abstractmethod
+    def state_key(self):
+        """Hashable value that changes whenever the widget would look different"""
+
+    @abstractmethod
+    def bounds(self):
+        """Screen rect the widget covers when drawn"""
 
+    def invalidate(self):
+        self._surfaces.clear()
+        self._drawn_key = None
 
-class GlassButton:
+    def is_dirty(self):
+        return self.state_key() != self._drawn_key
+
+    def dirty_rect(self):
+        rect = self.bounds()
+        if self._drawn_rect is not None:
+            rect = rect.union(self._drawn_rect)
+        return rect
+
+    def _cached(self, key, render):
+        cached_surface = self._surfaces.get(key)
+        if cached_surface is None:
+            cached_surface = self._surfaces[key] = render()
+        return cached_surface
+
+    def _mark_drawn(self):
+        self._drawn_key = self.state_key()
+        self._drawn_rect = self.bounds().copy()
+
+
+def _glass_panel(width, height, fill, border, radius):
+    panel_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.rect(panel_surface, fill, (0, 0, width, height), border_radius=radius)
+    pygame.draw.rect(
+        panel_surface, border, (0, 0, width, height), width=2, border_radius=radius
+    )
+    return panel_surface
+
+
+class GlassButton(RetainedWidget):
     def __init__(self, x, y, width, height, text):
+        super().__init__()
         self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
+        self._text = text
 
-    def draw(self, surface):
-        mouse_pos = pygame.mouse.get_pos()
-        is_hovered = self.rect.collidepoint(mouse_pos)
+    @property
+    def text(self):
+        return self._text
 
+    @text.setter
+    def text(self, value):
+        if value != self._text:
+            self._text = value
+            self.invalidate()
+
+    def state_key(self):
+        return self.rect.collidepoint(pygame.mouse.get_pos())
+
+    def bounds(self):
+        return self.rect
+
+    def _render_body(self, is_hovered):
         button_color = (255, 255, 255, 80) if is_hovered else BUTTON_GLASS
         border_color = (255, 255, 255, 150) if is_hovered else BUTTON_BORDER
-
-        button_surface = pygame.Surface(
-            (self.rect.width, self.rect.height), pygame.SRCALPHA
-        )
-        pygame.draw.rect(
-            button_surface,
-            button_color,
-            (0, 0, self.rect.width, self.rect.height),
-            border_radius=10,
-        )
-        pygame.draw.rect(
-            button_surface,
-            border_color,
-            (0, 0, self.rect.width, self.rect.height),
-            width=2,
-            border_radius=10,
+        return _glass_panel(
+            self.rect.width, self.rect.height, button_color, border_color, 10
         )
 
-        surface.blit(button_surface, (self.rect.x, self.rect.y))
+    def draw(self, surface):
+        is_hovered = self.state_key()
+        body = self._cached(is_hovered, lambda: self._render_body(is_hovered))
+        surface.blit(body, self.rect)
 
-        text_surf = main_font.render(self.text, True, WHITE)
+        text_surf = self._cached(
+            "text", lambda: render_text(main_font, self.text, True, WHITE)
+        )
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
+        self._mark_drawn()
+
     def is_clicked(self, event):
         return (
             event.type == pygame.MOUSEBUTTONDOWN
@@ -69,14 +250,21 @@ class GlassButton:
         )
 
 
-class InputBox:
+class InputBox(RetainedWidget):
     def __init__(self, x, y, width, height, text="0", placeholder=""):
+        super().__init__()
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text if text else "0"
         self.placeholder = placeholder
         self.active = False
         self.selected = False
 
+    def state_key(self):
+        return (self.text, self.active and self.selected)
+
+    def bounds(self):
+        return self.rect
+
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             was_active = self.active
@@ -107,38 +295,34 @@ class InputBox:
                         self.text += event.unicode
         return None
 
+    def _render_text(self, text, highlighted):
+        if not text:
+            return render_text(main_font, self.placeholder, True, (100, 0, 150))
+        text_color = (255, 255, 255) if highlighted else (100, 0, 150)
+        return render_text(main_font, text, True, text_color)
+
     def draw(self, surface):
         pygame.draw.rect(surface, BUTTON_GLASS, self.rect, border_radius=6)
 
-        if self.text:
-            if self.active and self.selected:
-                text_surf = main_font.render(self.text, True, (255, 255, 255))
-                text_rect = text_surf.get_rect(
-                    midleft=(self.rect.left + 10, self.rect.centery)
-                )
-                selection_rect = text_rect.inflate(4, 4)
-                pygame.draw.rect(
-                    surface, (100, 100, 255), selection_rect, border_radius=3
-                )
+        key = self.state_key()
+        if key not in self._surfaces:
+            # Only the current value is worth keeping, old values never come back
+            self._surfaces.clear()
+        text_surf = self._cached(key, lambda: self._render_text(*key))
+        text_rect = text_surf.get_rect(midleft=(self.rect.left + 10, self.rect.centery))
 
-            text_color = (
-                (255, 255, 255) if (self.active and self.selected) else (100, 0, 150)
-            )
-            text_surf = main_font.render(self.text, True, text_color)
-            text_rect = text_surf.get_rect(
-                midleft=(self.rect.left + 10, self.rect.centery)
-            )
-            surface.blit(text_surf, text_rect)
-        else:
-            text_surf = main_font.render(self.placeholder, True, (100, 0, 150))
-            text_rect = text_surf.get_rect(
-                midleft=(self.rect.left + 10, self.rect.centery)
-            )
-            surface.blit(text_surf, text_rect)
+        if self.text and self.active and self.selected:
+            selection_rect = text_rect.inflate(4, 4)
+            pygame.draw.rect(surface, (100, 100, 255), selection_rect, border_radius=3)
+
+        surface.blit(text_surf, text_rect)
+
+        self._mark_drawn()
 
 
-class PopupMenu:
+class PopupMenu(RetainedWidget):
     def __init__(self, x, y, width, options):
+        super().__init__()
         self.x = x
         self.y = y
         self.width = width
@@ -153,6 +337,19 @@ class PopupMenu:
         for i, option in enumerate(self.options):
             btn = GlassButton(self.x, self.y + i * 45, self.width, 40, option)
             self.buttons.append(btn)
+        self.invalidate()
+
+    def _panel_rect(self):
+        panel_height = len(self.options) * 45
+        return pygame.Rect(self.x - 5, self.y - 5, self.width + 10, panel_height + 10)
+
+    def state_key(self):
+        if not self.visible:
+            return (False,)
+        return (True, tuple(btn.state_key() for btn in self.buttons))
+
+    def bounds(self):
+        return self._panel_rect()
 
     def show(self):
         self.visible = True
@@ -164,33 +361,27 @@ class PopupMenu:
 
     def draw(self, surface):
         if not self.visible:
+            self._mark_drawn()
             return
 
-        panel_height = len(self.options) * 45
-        panel_rect = pygame.Rect(
-            self.x - 5, self.y - 5, self.width + 10, panel_height + 10
-        )
-        panel_surface = pygame.Surface(
-            (panel_rect.width, panel_rect.height), pygame.SRCALPHA
-        )
-        pygame.draw.rect(
-            panel_surface,
-            (30, 30, 60, 220),
-            (0, 0, panel_rect.width, panel_rect.height),
-            border_radius=12,
-        )
-        pygame.draw.rect(
-            panel_surface,
-            (120, 120, 180, 180),
-            (0, 0, panel_rect.width, panel_rect.height),
-            width=2,
-            border_radius=12,
+        panel_rect = self._panel_rect()
+        panel_surface = self._cached(
+            "panel",
+            lambda: _glass_panel(
+                panel_rect.width,
+                panel_rect.height,
+                (30, 30, 60, 220),
+                (120, 120, 180, 180),
+                12,
+            ),
         )
         surface.blit(panel_surface, (panel_rect.x, panel_rect.y))
 
         for btn in self.buttons:
             btn.draw(surface)
 
+        self._mark_drawn()
+
     def handle_event(self, event):
         if not self.visible:
             return None
@@ -216,8 +407,9 @@ class PopupMenu:
         return None
 
 
-class PopupForm:
+class PopupForm(RetainedWidget):
     def __init__(self, title, fields, apply_text="Apply"):
+        super().__init__()
         self.title = title
         self.fields = fields
         self.apply_text = apply_text
@@ -251,6 +443,18 @@ class PopupForm:
                 placeholder=field.get("placeholder", ""),
             )
 
+    def state_key(self):
+        if not self.visible:
+            return (False,)
+        return (
+            True,
+            tuple(box.state_key() for box in self.input_boxes.values()),
+            self.apply_button.state_key(),
+        )
+
+    def bounds(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
     def show(self):
         self.visible = True
         self.just_opened = True
@@ -259,42 +463,37 @@ class PopupForm:
         self.visible = False
         self.just_opened = False
 
-    def draw(self, surface):
-        if not self.visible:
-            return
-
-        panel_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        pygame.draw.rect(
-            panel_surface,
-            (30, 30, 60, 230),
-            (0, 0, self.width, self.height),
-            border_radius=15,
-        )
-        pygame.draw.rect(
-            panel_surface,
-            (120, 120, 180, 180),
-            (0, 0, self.width, self.height),
-            width=2,
-            border_radius=15,
+    def _render_panel(self):
+        panel_surface = _glass_panel(
+            self.width, self.height, (30, 30, 60, 230), (120, 120, 180, 180), 15
         )
 
-        title_surf = title_font.render(self.title, True, WHITE)
+        title_surf = render_text(title_font, self.title, True, WHITE)
         title_rect = title_surf.get_rect(center=(self.width // 2, 30))
         panel_surface.blit(title_surf, title_rect)
 
         for i, field in enumerate(self.fields):
-            label_surf = main_font.render(
-                field.get("label", field["name"]), True, WHITE
+            label_surf = render_text(
+                main_font, field.get("label", field["name"]), True, WHITE
             )
             panel_surface.blit(label_surf, (20, 75 + i * 50))
 
-        surface.blit(panel_surface, (self.x, self.y))
+        return panel_surface
+
+    def draw(self, surface):
+        if not self.visible:
+            self._mark_drawn()
+            return
+
+        surface.blit(self._cached("panel", self._render_panel), (self.x, self.y))
 
         for box in self.input_boxes.values():
             box.draw(surface)
 
         self.apply_button.draw(surface)
 
+        self._mark_drawn()
+
     def get_values(self):
         return {name: box.text for name, box in self.input_boxes.items()}
 
@@ -334,8 +533,17 @@ class PopupForm:
                 self.input_boxes[field_name].selected = False
 
 
-class TransformListPopup:
+class TransformListPopup(RetainedWidget):
+    """Scrollable list of applied transformations
+
+    The list is virtualized: drawing and hit-testing only touch the rows
+    inside the visible scroll window, and row surfaces come from a pool
+    sized to that window, so stacks with tens of thousands of entries stay
+    interactive.
+    """
+
     def __init__(self, transformations):
+        super().__init__()
         self.transformations = transformations
         self.visible = False
         self.just_opened = False
@@ -344,13 +552,26 @@ class TransformListPopup:
         self.item_height = 40
         self.padding = 20
         self.title_height = 50
+        self.scroll_offset = 0
+        self.height = None
+        self._version = 0
+
+        self._panel = None
+        self._base = None
+        self._base_has_items = False
+        self._rows = {}
+        self._free_rows = []
 
         self._update_size_and_position()
 
     def _update_size_and_position(self):
         items_count = max(1, min(len(self.transformations), self.max_visible_items))
         content_height = items_count * self.item_height
-        self.height = self.title_height + content_height + self.padding * 2
+        height = self.title_height + content_height + self.padding * 2
+        if self.height != height:
+            self._panel = None
+            self._base = None
+        self.height = height
 
         self.x = (WIDTH - self.width) // 2
         self.y = (HEIGHT - self.height) // 2
@@ -358,12 +579,22 @@ class TransformListPopup:
         self.total_content_height = len(self.transformations) * self.item_height
         visible_content_height = self.max_visible_items * self.item_height
         self.max_scroll = max(0, self.total_content_height - visible_content_height)
-        self.scroll_offset = 0
+        self.scroll_offset = min(self.scroll_offset, self.max_scroll)
 
     def update_transformations(self, transformations):
         """Update transformation list and recalculate sizes"""
         self.transformations = transformations
         self._update_size_and_position()
+        self._version += 1
+        self._release_rows(self._rows)
+
+    def state_key(self):
+        if not self.visible:
+            return (False,)
+        return (True, self._version, self.scroll_offset)
+
+    def bounds(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
 
     def show(self):
         self.visible = True
@@ -374,6 +605,40 @@ class TransformListPopup:
         self.visible = False
         self.just_opened = False
 
+    def _content_rect(self):
+        return pygame.Rect(
+            self.padding,
+            self.title_height,
+            self.width - self.padding * 2,
+            self.height - self.title_height - self.padding,
+        )
+
+    def _visible_range(self):
+        """Indices of the rows that intersect the content area"""
+        content_height = self.height - self.title_height - self.padding
+        first = self.scroll_offset // self.item_height
+        last = (self.scroll_offset + content_height - 1) // self.item_height
+        return range(first, min(last + 1, len(self.transformations)))
+
+    def _item_y(self, index):
+        return self.title_height + index * self.item_height - self.scroll_offset
+
+    def _row_at(self, pos):
+        """Index of the row whose delete button is under ``pos``, or None
+
+        Only the part of a button inside the content area counts, so a
+        button scrolled under the title bar cannot be clicked.
+        """
+        local_x = pos[0] - self.x
+        local_y = pos[1] - self.y
+        if not self.title_height <= local_y < self.height - self.padding:
+            return None
+        index = (local_y - self.title_height + self.scroll_offset) // self.item_height
+        if not 0 <= index < len(self.transformations):
+            return None
+        delete_rect = pygame.Rect(self.width - 50, self._item_y(index) + 10, 20, 20)
+        return index if delete_rect.collidepoint(local_x, local_y) else None
+
     def handle_event(self, event):
         if not self.visible:
             return None
@@ -387,23 +652,9 @@ class TransformListPopup:
                 return None
 
             if event.button == 1:
-                for i, transform in enumerate(self.transformations):
-                    item_y = (
-                        self.title_height + i * self.item_height - self.scroll_offset
-                    )
-
-                    if (
-                        item_y + self.item_height > self.title_height
-                        and item_y < self.height - self.padding
-                    ):
-                        delete_btn_x = self.x + self.width - 50
-                        delete_btn_y = self.y + item_y + 10
-                        delete_btn_rect = pygame.Rect(
-                            delete_btn_x, delete_btn_y, 20, 20
-                        )
-
-                        if delete_btn_rect.collidepoint(event.pos):
-                            return {"action": "delete", "index": i}
+                index = self._row_at(event.pos)
+                if index is not None:
+                    return {"action": "delete", "index": index}
 
                 if self.just_opened:
                     self.just_opened = False
@@ -419,83 +670,98 @@ class TransformListPopup:
 
     def draw(self, surface):
         if not self.visible:
+            self._mark_drawn()
             return
 
-        panel_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        pygame.draw.rect(
-            panel_surface,
-            (30, 30, 60, 220),
-            (0, 0, self.width, self.height),
-            border_radius=15,
-        )
-        pygame.draw.rect(
-            panel_surface,
-            (120, 120, 180, 180),
-            (0, 0, self.width, self.height),
-            width=2,
-            border_radius=15,
-        )
+        if self._drawn_key != self.state_key() or self._panel is None:
+            self._update_panel()
+        surface.blit(self._panel, (self.x, self.y))
 
-        title_surf = title_font.render("Applied Transformations", True, WHITE)
-        title_rect = title_surf.get_rect(center=(self.width // 2, 25))
-        panel_surface.blit(title_surf, title_rect)
+        self._mark_drawn()
 
-        content_rect = pygame.Rect(
-            self.padding,
-            self.title_height,
-            self.width - self.padding * 2,
-            self.height - self.title_height - self.padding,
+    def _render_base(self):
+        panel_surface = _glass_panel(
+            self.width, self.height, (30, 30, 60, 220), (120, 120, 180, 180), 15
         )
 
-        panel_surface.set_clip(content_rect)
+        title_surf = render_text(title_font, "Applied Transformations", True, WHITE)
+        title_rect = title_surf.get_rect(center=(self.width // 2, 25))
+        panel_surface.blit(title_surf, title_rect)
 
         if not self.transformations:
-            no_trans_surf = main_font.render(
-                "No transformations applied yet", True, WHITE
+            no_trans_surf = render_text(
+                main_font, "No transformations applied yet", True, WHITE
             )
             no_trans_rect = no_trans_surf.get_rect(
                 center=(self.width // 2, self.title_height + 20)
             )
             panel_surface.blit(no_trans_surf, no_trans_rect)
-        else:
-            for i, transform in enumerate(self.transformations):
-                item_y = self.title_height + i * self.item_height - self.scroll_offset
-
-                if (
-                    item_y + self.item_height > self.title_height
-                    and item_y < self.height - self.padding
-                ):
-                    item_bg = pygame.Rect(
-                        self.padding,
-                        item_y,
-                        self.width - self.padding * 2,
-                        self.item_height - 5,
-                    )
-                    pygame.draw.rect(
-                        panel_surface,
-                        (120, 120, 180, 180),
-                        item_bg,
-                        border_radius=8,
-                    )
-
-                    text = f"{i+1}. {transform.get_display_text()}"
-                    text_surf = main_font.render(text, True, WHITE)
-                    panel_surface.blit(
-                        text_surf,
-                        (
-                            self.padding + 10,
-                            item_y + (self.item_height - text_surf.get_height()) // 2,
-                        ),
-                    )
-
-                    x_text = main_font.render("X", True, RED)
-                    x_rect = x_text.get_rect(
-                        center=(self.width - 40, item_y + self.item_height // 2)
-                    )
-                    panel_surface.blit(x_text, x_rect)
-
-        panel_surface.set_clip(None)
 
+        return panel_surface
+
+    def _update_panel(self):
+        if self._base is None or bool(self.transformations) != self._base_has_items:
+            self._base = self._render_base()
+            self._base_has_items = bool(self.transformations)
+        if self._panel is None:
+            self._panel = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+
+        # Copy pixels exactly: MAX against a cleared surface never blends
+        self._panel.fill((0, 0, 0, 0))
+        self._panel.blit(self._base, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+
+        visible = self._visible_range()
+        self._release_rows(
+            {index: row for index, row in self._rows.items() if index not in visible}
+        )
+
+        content_rect = self._content_rect()
+        self._panel.set_clip(content_rect)
+        for index in visible:
+            row = self._rows.get(index)
+            if row is None:
+                row = self._rows[index] = self._render_row(index)
+            row_pos = (self.padding, self._item_y(index))
+            self._panel.fill((0, 0, 0, 0), row.get_rect(topleft=row_pos))
+            self._panel.blit(row, row_pos, special_flags=pygame.BLEND_RGBA_MAX)
+        self._panel.set_clip(None)
+
+        self._draw_scrollbar(self._panel)
+
+    def _release_rows(self, rows):
+        for index in list(rows):
+            self._free_rows.append(self._rows.pop(index))
+        del self._free_rows[self.max_visible_items + 1 :]
+
+    def _render_row(self, index):
+        """Render row ``index`` into a surface taken from the pool"""
+        row_width = self.width - self.padding * 2
+        row = self._free_rows.pop() if self._free_rows else None
+        if row is None or row.get_size() != (row_width, self.item_height):
+            row = pygame.Surface((row_width, self.item_height), pygame.SRCALPHA)
+
+        # Rows start from the panel's interior so they can replace its pixels
+        row.fill((30, 30, 60, 220))
+        pygame.draw.rect(
+            row,
+            (120, 120, 180, 180),
+            (0, 0, row_width, self.item_height - 5),
+            border_radius=8,
+        )
+
+        transform = self.transformations[index]
+        text = f"{index+1}. {transform.get_display_text()}"
+        text_surf = render_text(main_font, text, True, WHITE)
+        row.blit(text_surf, (10, (self.item_height - text_surf.get_height()) // 2))
+
+        x_text = render_text(main_font, "X", True, RED)
+        x_rect = x_text.get_rect(
+            center=(self.width - 40 - self.padding, self.item_height // 2)
+        )
+        row.blit(x_text, x_rect)
+        return row
+
+    def _draw_scrollbar(self, panel_surface):
         if self.transformations and self.total_content_height > (
             self.height - self.title_height - self.padding * 2
         ):
@@ -529,5 +795,3 @@ class TransformListPopup:
                 (self.width - 15, scrollbar_y, 10, scrollbar_height),
                 border_radius=5,
             )
-
-        surface.blit(panel_surface, (self.x, self.y))
@@ -0,0 +1,14 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+from geometry_game.constants import WIDTH, HEIGHT
+
+
+@pytest.fixture(scope="session")
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.quit()
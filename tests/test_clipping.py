@@ -0,0 +1,110 @@
+import tracemalloc
+
+import numpy as np
+import pygame
+import pytest
+from geometry_game.clipping import Frustum, ProjectionPipeline, clipped_points
+from geometry_game.geometry import Transformation
+from geometry_game.mesh import cube_mesh
+from geometry_game.scene import grid_scene
+
+RECT = pygame.Rect(0, 0, 200, 100)
+
+
+def frustum():
+    return Frustum(RECT, camera_distance=5, scale=20, near=0.5)
+
+
+def test_distances_are_non_negative_inside():
+    vertices = np.array([[0.0, 0, 0], [0, 0, -4.6], [100, 0, 0], [0, -100, 0]])
+    inside = (frustum().distances(vertices) >= 0).all(axis=1)
+    assert inside.tolist() == [True, False, False, False]
+    assert frustum().in_front(vertices).tolist() == [True, False, True, True]
+
+
+def test_edges_inside_are_kept_whole():
+    vertices = np.array([[-1.0, 0, 0], [1, 0, 0]])
+    clipped = frustum().clip_edges(vertices, np.array([[0, 1]]))
+    assert clipped.edge_mask.tolist() == [True]
+    assert len(clipped.starts) == 0
+
+
+def test_edge_through_the_near_plane_ends_at_it():
+    vertices = np.array([[0.0, 0, 0], [0, 0, -10]])
+    clipped = frustum().clip_edges(vertices, np.array([[0, 1]]))
+    assert clipped.edge_mask.tolist() == [False]
+    assert np.allclose(clipped.starts, [RECT.center])
+    assert np.allclose(clipped.ends, [RECT.center])
+
+
+def test_edge_leaving_the_screen_ends_at_its_border():
+    # x = 10 projects to 100 + 10 * 5 * 20 / 5 = 300, beyond the right edge
+    vertices = np.array([[0.0, 0, 0], [10, 0, 0]])
+    clipped = frustum().clip_edges(vertices, np.array([[0, 1]]))
+    assert np.allclose(clipped.starts, [[100, 50]])
+    assert np.allclose(clipped.ends, [[RECT.right, 50]])
+
+
+def test_edges_outside_or_culled_are_dropped():
+    vertices = np.array([[20.0, 0, 0], [30, 0, 0], [-1, 0, 0], [1, 0, 0]])
+    edges = np.array([[0, 1], [2, 3]])
+    clipped = frustum().clip_edges(vertices, edges)
+    assert len(clipped.starts) == 0
+    assert clipped.edge_mask.tolist() == [False, True]
+
+    active = np.array([True, True, False, False])
+    clipped = frustum().clip_edges(vertices, edges, active)
+    assert clipped.edge_mask.tolist() == [False, False]
+    assert len(clipped.starts) == 0
+
+
+def test_clipped_points_cover_whole_and_clipped_edges():
+    vertices = np.array([[-1.0, 0, 0], [1, 0, 0], [0, 0, 0], [10, 0, 0]])
+    view = frustum()
+    clipped = view.clip_edges(vertices, np.array([[0, 1], [2, 3]]))
+    points = clipped_points(view.project(vertices), clipped)
+    assert points[:, 0].max() == RECT.right
+
+
+def grid_pipeline(scale):
+    scene, _, batch = grid_scene(cube_mesh(), 10)
+    scene.update()
+    view = Frustum(pygame.Rect(0, 0, 1000, 700), scale=scale)
+    return ProjectionPipeline(view, batch), batch
+
+
+@pytest.mark.parametrize("scale", [10, 3000])
+def test_pipeline_matches_the_batch_vertices(scale):
+    pipeline, batch = grid_pipeline(scale)
+    post = Transformation("rotate_y", {"angle": 10.0}).matrix
+    vertices, active = pipeline.transform(post)
+    points = pipeline.project()
+    # 3000 pixels per unit culls most of the grid, 10 keeps all of it
+    assert active.all() == (scale == 10) and active.any()
+
+    matrices = batch.matrices @ post
+    expected = batch.mesh.vertices @ matrices[:, :3, :3].transpose(0, 2, 1)
+    expected = (expected + matrices[:, None, :3, 3]).reshape(-1, 3)
+    assert np.allclose(vertices[active], expected[active])
+    assert np.allclose(points[active], pipeline.frustum.project(expected)[active])
+
+
+@pytest.mark.parametrize("scale", [10, 3000])
+def test_pipeline_frames_allocate_a_bounded_amount(scale):
+    pipeline, _ = grid_pipeline(scale)
+    post = Transformation("rotate_y", {"angle": 10.0}).matrix
+    for _ in range(2):
+        pipeline.transform(post)
+        pipeline.project()
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        pipeline.transform(post)
+        pipeline.project()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    # The buffers hold about 300 KB for this grid; a full frame only
+    # allocates array headers, a culled one its index arrays as well
+    assert peak < 16 * 1024
@@ -0,0 +1,159 @@
+from functools import reduce
+import random
+import numpy as np
+import pytest
+from geometry_game.geometry import (
+    PARAM_NAMES,
+    TRANSFORM_TYPES,
+    Transformation,
+    TransformStack,
+    matrices_from_arrays,
+    parse_transform,
+    project_point,
+    project_points,
+)
+from geometry_game.quaternion import LOOP_COMPOSE_LENGTH, RIGID_TYPES, compose
+from geometry_game.scene import Scene
+
+PARAMS = {
+    "scale": {"x": 1.5, "y": 0.5, "z": 2},
+    "rotate_x": {"angle": 30},
+    "rotate_y": {"angle": -45},
+    "rotate_z": {"angle": 60},
+    "translate": {"x": 0.5, "y": -1, "z": 2},
+    "shear": {"xy": 0.1, "xz": 0.2, "yz": 0.3},
+}
+
+
+def transform(kind):
+    return Transformation(kind, dict(PARAMS[kind]))
+
+
+def chain(transformations):
+    return reduce(np.matmul, [t.matrix for t in transformations], np.identity(4))
+
+
+def test_transformation_matrices():
+    assert np.allclose(transform("scale").matrix, np.diag([1.5, 0.5, 2, 1]))
+    assert np.allclose(transform("translate").matrix[:3, 3], [0.5, -1, 2])
+    rotation = Transformation("rotate_z", {"angle": 90}).matrix
+    assert np.allclose(rotation @ [1, 0, 0, 1], [0, 1, 0, 1])
+
+
+def test_set_angle_rewrites_the_matrix_in_place():
+    rotation = Transformation("rotate_y", {"angle": 0})
+    matrix = rotation.matrix
+    rotation.set_angle(90)
+    assert rotation.matrix is matrix
+    assert np.allclose(matrix, Transformation("rotate_y", {"angle": 90}).matrix)
+
+
+def test_matrices_from_arrays_match_transformations():
+    kinds = list(TRANSFORM_TYPES)
+    params = np.zeros((len(kinds), 6))
+    for row, kind in enumerate(kinds):
+        names = PARAM_NAMES[kind]
+        default = 1.0 if kind == "scale" else 0.0
+        params[row, : len(names)] = [PARAMS[kind].get(name, default) for name in names]
+    matrices = matrices_from_arrays(np.arange(len(kinds)), params)
+    for matrix, kind in zip(matrices, kinds):
+        assert np.allclose(matrix, transform(kind).matrix)
+
+
+def test_parse_transform():
+    parsed = parse_transform("translate: x=1, z=-2")
+    assert parsed.type == "translate"
+    assert np.allclose(parsed.matrix[:3, 3], [1, 0, -2])
+    with pytest.raises(ValueError):
+        parse_transform("spin:angle=1")
+    with pytest.raises(ValueError):
+        parse_transform("scale:x")
+
+
+def test_stack_composite_follows_random_edits():
+    rng = random.Random(1)
+    stack = TransformStack()
+    expected = []
+    for _ in range(300):
+        operation = rng.choice(("append", "insert", "pop", "move", "refresh"))
+        if operation == "append" or not expected:
+            item = transform(rng.choice(TRANSFORM_TYPES))
+            stack.append(item)
+            expected.append(item)
+        elif operation == "insert":
+            index = rng.randrange(len(expected) + 1)
+            item = transform(rng.choice(TRANSFORM_TYPES))
+            stack.insert(index, item)
+            expected.insert(index, item)
+        elif operation == "pop":
+            index = rng.randrange(len(expected))
+            assert stack.pop(index) is expected.pop(index)
+        elif operation == "move":
+            source = rng.randrange(len(expected))
+            destination = rng.randrange(len(expected))
+            stack.move(source, destination)
+            expected.insert(destination, expected.pop(source))
+        else:
+            index = rng.randrange(len(expected))
+            if expected[index].type.startswith("rotate"):
+                expected[index].set_angle(rng.uniform(-180, 180))
+                stack.refresh(index)
+        assert list(stack) == expected
+        assert np.allclose(stack.composite, chain(expected))
+
+
+def test_rigid_composite_tracks_the_matrix_until_a_scale():
+    stack = TransformStack(
+        transform(kind) for kind in ("rotate_x", "translate", "rotate_z")
+    )
+    assert np.allclose(stack.rigid_composite.to_matrix(), stack.composite)
+    stack.insert(1, transform("scale"))
+    assert stack.rigid_composite is None
+    stack.pop(1)
+    assert np.allclose(stack.rigid_composite.to_matrix(), stack.composite)
+
+
+@pytest.mark.parametrize("depth", [0, 5, LOOP_COMPOSE_LENGTH + 7])
+def test_compose_matches_the_matrix_chain(depth):
+    rng = random.Random(depth)
+    stack = [transform(rng.choice(RIGID_TYPES)) for _ in range(depth)]
+    assert np.allclose(compose(stack).to_matrix(), chain(stack))
+    with pytest.raises(ValueError, match="scale"):
+        compose(stack + [transform("scale")])
+
+
+def test_fused_scene_node_follows_rigid_stacks_only():
+    scene = Scene()
+    node = scene.root
+    node.fused = True
+    node.transformations = TransformStack(
+        transform(kind) for kind in ("rotate_x", "translate", "rotate_z")
+    )
+    assert np.allclose(node.composite(), node.transformations.composite)
+    # The matrix comes from the fused dual quaternion, not the chain
+    assert node.composite() is node._fused_matrix
+
+    node.transformations.append(transform("scale"))
+    assert node.composite() is node.transformations.composite
+
+
+def test_deferred_stack_builds_only_what_it_needs():
+    base = [transform(kind) for kind in TRANSFORM_TYPES]
+    stack = TransformStack.deferred(base, chain(base))
+    stack.append(transform("rotate_y"))
+    assert len(stack) == len(base) + 1
+    assert stack._base is base
+    assert np.allclose(stack.composite, chain(list(stack)))
+
+    stack.pop(0)
+    assert stack._base is None
+    assert np.allclose(stack.composite, chain(base[1:] + [stack[-1]]))
+
+
+def test_project_points_matches_project_point():
+    vertices = np.random.default_rng(0).uniform(-1, 1, (20, 3))
+    projected = project_points(vertices, camera_distance=5)
+    expected = [project_point(vertex, 5) for vertex in vertices]
+    assert np.allclose(projected, expected)
+    centered = project_points(vertices, camera_distance=5, scale=10, center=(4, 3))
+    assert np.allclose(centered, projected * 10 + [4, 3])
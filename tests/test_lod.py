@@ -0,0 +1,83 @@
+import os
+import numpy as np
+from geometry_game.lod import LevelOfDetail, cluster_mesh
+from geometry_game.mesh import Mesh, cube_mesh, save_mesh, load_mesh
+
+
+def grid_mesh(size=20):
+    """A size x size quad grid split into triangles"""
+    xs, ys = np.meshgrid(np.arange(size + 1), np.arange(size + 1), indexing="ij")
+    vertices = np.stack((xs.ravel(), ys.ravel(), np.zeros(xs.size)), axis=1)
+    corner = (np.arange(size)[:, None] * (size + 1) + np.arange(size)).ravel()
+    faces = np.concatenate(
+        (
+            np.stack((corner, corner + size + 1, corner + 1), axis=1),
+            np.stack((corner + 1, corner + size + 1, corner + size + 2), axis=1),
+        )
+    )
+    return Mesh(vertices, faces=faces)
+
+
+def test_cluster_mesh_merges_vertices_per_cell():
+    simplified = cluster_mesh(grid_mesh(), 4)
+    assert len(simplified.vertices) <= 16
+    assert simplified.faces.max() < len(simplified.vertices)
+    assert simplified.edges.max() < len(simplified.vertices)
+    # No collapsed or duplicated triangles survive
+    assert (np.diff(np.sort(simplified.faces, axis=1), axis=1) > 0).all()
+    assert len(np.unique(np.sort(simplified.faces, axis=1), axis=0)) == len(
+        simplified.faces
+    )
+
+
+def test_cluster_mesh_keeps_a_mesh_finer_than_the_grid():
+    cube = cube_mesh()
+    assert len(cluster_mesh(cube, 8).vertices) == len(cube.vertices)
+
+
+def test_build_levels_shrink_with_growing_error():
+    lod = LevelOfDetail.build(grid_mesh(), max_cells=16)
+    assert len(lod) > 2
+    counts = [len(level.vertices) for level in lod.levels]
+    assert all(later <= earlier / 2 for earlier, later in zip(counts, counts[1:]))
+    assert lod.errors[0] == 0
+    assert (np.diff(lod.errors) > 0).all()
+
+
+def test_select_is_coarse_when_small_and_resists_flicker():
+    lod = LevelOfDetail.build(grid_mesh(), max_cells=16, pixel_error=2.0)
+    assert lod.select(1.0) == len(lod) - 1
+    assert lod.select(10_000.0) == 0
+
+    boundary = lod.pixel_error / lod.errors[1]
+    lod.select(boundary * 1.1)
+    level = lod.level
+    assert lod.select(boundary * 0.95) == level
+    assert lod.select(None) == level
+
+
+def test_levels_are_cached_next_to_the_mesh(tmp_path):
+    path = str(tmp_path / "grid.ply")
+    save_mesh(path, grid_mesh())
+    mesh = load_mesh(path)
+    built = LevelOfDetail.for_mesh(mesh, max_cells=16)
+    assert os.path.exists(path + ".lod.npz")
+
+    cached = LevelOfDetail.for_mesh(mesh, max_cells=16)
+    assert np.array_equal(cached.errors, built.errors)
+    for level, expected in zip(cached.levels, built.levels):
+        assert np.array_equal(level.vertices, expected.vertices)
+        assert np.array_equal(level.faces, expected.faces)
+
+    # A normalized copy has different bounds and gets its own levels
+    normalized = LevelOfDetail.for_mesh(mesh.normalized(), max_cells=16)
+    assert not np.array_equal(normalized.levels[1].vertices, built.levels[1].vertices)
+
+
+def test_cache_is_rebuilt_for_other_build_options(tmp_path):
+    path = str(tmp_path / "grid.ply")
+    save_mesh(path, grid_mesh())
+    mesh = load_mesh(path)
+    coarse = LevelOfDetail.for_mesh(mesh, max_cells=4)
+    fine = LevelOfDetail.for_mesh(mesh, max_cells=16)
+    assert len(fine) > len(coarse)
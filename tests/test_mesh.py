@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from geometry_game.mesh import (
+    Mesh,
+    cube_mesh,
+    edges_from_faces,
+    load_mesh,
+    save_mesh,
+    _mesh_from_triangles,
+)
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_obj_quads_are_triangulated_with_their_outline(tmp_path):
+    path = write(
+        tmp_path / "quad.obj",
+        "v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nf 1/1 2/2 3/3 4/4\n",
+    )
+    mesh = load_mesh(path)
+    assert mesh.vertices.shape == (4, 3)
+    assert mesh.faces.tolist() == [[0, 1, 2], [0, 2, 3]]
+    assert mesh.edges.tolist() == [[0, 1], [0, 3], [1, 2], [2, 3]]
+
+
+def test_obj_polylines_stay_open_and_negative_indices_resolve(tmp_path):
+    path = write(tmp_path / "line.obj", "v 0 0 0\nv 1 0 0\nv 2 0 0\nl -3 -2 -1\n")
+    mesh = load_mesh(path)
+    assert mesh.faces is None
+    assert mesh.edges.tolist() == [[0, 1], [1, 2]]
+
+
+def test_ascii_ply(tmp_path):
+    path = write(
+        tmp_path / "tri.ply",
+        "ply\nformat ascii 1.0\ncomment made by hand\n"
+        "element vertex 3\nproperty float x\nproperty float y\nproperty float z\n"
+        "element face 1\nproperty list uchar int vertex_indices\nend_header\n"
+        "0 0 0\n1 0 0\n0 1 0\n3 0 1 2\n",
+    )
+    mesh = load_mesh(path)
+    assert np.array_equal(mesh.vertices, [[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+    assert mesh.faces.tolist() == [[0, 1, 2]]
+
+
+@pytest.mark.parametrize("extension", [".obj", ".ply", ".stl"])
+def test_cube_round_trip(tmp_path, extension):
+    cube = cube_mesh()
+    path = str(tmp_path / f"cube{extension}")
+    save_mesh(path, cube)
+    mesh = load_mesh(path)
+    assert np.array_equal(mesh.vertices[mesh.faces], cube.vertices[cube.faces])
+    assert len(mesh.vertices) == len(cube.vertices)
+
+
+def test_ascii_stl(tmp_path):
+    path = write(
+        tmp_path / "tri.stl",
+        "solid tri\nfacet normal 0 0 1\nouter loop\n"
+        "vertex 0 0 0\nvertex 1 0 0\nvertex 0 1 0\n"
+        "endloop\nendfacet\nendsolid tri\n",
+    )
+    mesh = load_mesh(path)
+    assert mesh.faces.tolist() == [[0, 1, 2]]
+
+
+def test_stl_weld_numbers_vertices_by_first_appearance():
+    mesh = _mesh_from_triangles(
+        np.array([[[1, 0, 0], [0, 0, 0], [0, 1, 0]]], dtype=np.float32), None
+    )
+    assert mesh.vertices.tolist() == [[1, 0, 0], [0, 0, 0], [0, 1, 0]]
+    assert mesh.faces.tolist() == [[0, 1, 2]]
+
+
+def test_stl_weld_does_not_depend_on_the_chunk_size():
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, 10, (200, 3)).astype(np.float32)
+    triangles = points[rng.integers(0, len(points), (1000, 3))]
+    whole = _mesh_from_triangles(triangles, None)
+    chunked = _mesh_from_triangles(triangles, None, chunk_size=7)
+    assert np.array_equal(whole.vertices, chunked.vertices)
+    assert np.array_equal(whole.faces, chunked.faces)
+    assert np.array_equal(whole.vertices[whole.faces], triangles)
+    assert len(whole.vertices) == len(np.unique(triangles.reshape(-1, 3), axis=0))
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        load_mesh("mesh.fbx")
+
+
+def test_edges_from_faces_are_unique_and_undirected():
+    edges = edges_from_faces([[0, 1, 2], [2, 1, 3]])
+    assert edges.tolist() == [[0, 1], [0, 2], [1, 2], [1, 3], [2, 3]]
+
+
+def test_normalized_fits_the_radius():
+    mesh = Mesh([[0, 0, 0], [2, 4, 4]]).normalized(radius=3)
+    assert np.allclose(mesh.vertices, [[-1, -2, -2], [1, 2, 2]])
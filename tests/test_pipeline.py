@@ -0,0 +1,86 @@
+import json
+import numpy as np
+import pytest
+from geometry_game.geometry import Transformation, TransformStack
+from geometry_game.mesh import cube_mesh, load_mesh, save_mesh
+from geometry_game.pipeline import (
+    Pipeline,
+    apply_file,
+    load_operations,
+    main,
+    typed_transformation,
+)
+
+OPERATIONS = [
+    {"type": "scale", "params": {"x": 2, "y": "3"}},
+    "rotate_y:angle=30",
+    {"type": "translate", "params": {"x": 1, "z": -2}},
+]
+
+
+def test_typed_transformation_accepts_specs_and_dicts():
+    spec = typed_transformation("translate:x=1,y=2")
+    entry = typed_transformation({"type": "translate", "params": {"x": 1, "y": 2}})
+    assert spec.params == entry.params == {"x": 1.0, "y": 2.0}
+    assert np.array_equal(spec.matrix, entry.matrix)
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        5,
+        ["scale"],
+        "bogus:x=1",
+        {"type": "scale", "params": {"w": 1}},
+        {"type": "scale", "params": {"x": "wide"}},
+        {"type": "scale", "params": [1, 2]},
+    ],
+)
+def test_typed_transformation_rejects_invalid_operations(operation):
+    with pytest.raises(ValueError):
+        typed_transformation(operation)
+
+
+def test_load_operations_names_the_bad_entry(tmp_path):
+    path = tmp_path / "ops.json"
+    path.write_text(json.dumps({"operations": ["scale:x=2", [5]]}), encoding="utf-8")
+    with pytest.raises(ValueError, match="Operation 1"):
+        load_operations(str(path))
+
+
+def test_pipeline_matches_the_interactive_stack():
+    stack = TransformStack([typed_transformation(item) for item in OPERATIONS])
+    vertices = np.random.default_rng(0).random((100, 3))
+    homogeneous = np.hstack((vertices, np.ones((len(vertices), 1))))
+    expected = (homogeneous @ stack.composite.T)[:, :3]
+    result = Pipeline(OPERATIONS, chunk_size=7, workers=2).apply(vertices)
+    assert np.allclose(result, expected)
+
+
+def test_apply_file_between_mesh_formats(tmp_path):
+    source = str(tmp_path / "cube.obj")
+    target = str(tmp_path / "moved.ply")
+    save_mesh(source, cube_mesh())
+    assert apply_file(source, ["translate:x=1"], target) == 8
+    moved = load_mesh(target)
+    assert np.allclose(moved.vertices, cube_mesh().vertices + [1, 0, 0])
+    assert np.array_equal(moved.faces, load_mesh(source).faces)
+
+
+def test_apply_file_streams_npy_point_clouds(tmp_path):
+    source = str(tmp_path / "points.npy")
+    target = str(tmp_path / "scaled.npy")
+    points = np.random.default_rng(1).random((1000, 3)).astype(np.float32)
+    np.save(source, points)
+    apply_file(source, [Transformation("scale", {"x": 2})], target, chunk_size=64)
+    scaled = np.load(target)
+    assert scaled.dtype == np.float32
+    assert np.allclose(scaled, points * [2, 1, 1])
+
+
+def test_cli_reports_invalid_operations(tmp_path, capsys):
+    ops = tmp_path / "ops.json"
+    ops.write_text("[5]", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main(["--mesh", "cube.obj", "--ops", str(ops), "--out", "out.obj"])
+    assert "Not a transformation: 5" in capsys.readouterr().err
@@ -0,0 +1,110 @@
+import numpy as np
+import pygame
+import pytest
+from geometry_game.clipping import Frustum
+from geometry_game.render import SolidRenderer, clip_segments, clip_triangles_near
+
+NEAR = 1.0
+
+
+def normal(triangle):
+    return np.cross(triangle[1] - triangle[0], triangle[2] - triangle[0])
+
+
+@pytest.mark.parametrize("inside", [(0,), (1,), (2,), (0, 1), (1, 2), (0, 2)])
+def test_clipped_triangles_stay_in_front_and_keep_their_winding(inside):
+    corners = np.array([[[0.0, 0, -2], [2, 0, -2], [0, 2, -2]]])
+    depths = np.full((1, 3), 0.5)
+    depths[0, list(inside)] = 2.0
+    corners[0, :, 2] = depths[0]
+    triangles, source = clip_triangles_near(corners, depths, NEAR)
+
+    assert len(triangles) == len(inside)
+    assert (source == 0).all()
+    assert (triangles[:, :, 2] >= NEAR - 1e-9).all()
+    for triangle in triangles:
+        assert np.dot(normal(triangle), normal(corners[0])) > 0
+
+
+def screen_area(triangles):
+    return sum(abs(normal(triangle)[2]) / 2 for triangle in triangles)
+
+
+def test_clipped_triangles_cover_the_visible_part():
+    # Depth grows with x, so the plane at depth 1 cuts the triangle at x = 1
+    corners = np.array([[[0.0, 0, 0], [2, 0, 2], [0, 2, 0]]])
+    triangles, _ = clip_triangles_near(corners, corners[:, :, 0], 1)
+    assert screen_area(triangles) == pytest.approx(0.5)
+
+    corners[0, :, 0] = 2 - corners[0, :, 0]
+    triangles, _ = clip_triangles_near(corners, corners[:, :, 0], 1)
+    assert screen_area(triangles) == pytest.approx(1.5)
+
+
+def test_solid_draws_faces_crossing_the_near_plane():
+    surface = pygame.Surface((200, 200))
+    frustum = Frustum(surface.get_rect(), camera_distance=5, scale=20)
+    # A floor reaching from far in front of the camera to behind it
+    vertices = np.array([[3.0, 1, 10], [-3, 1, 10], [0, 1, -8]])
+    renderer = SolidRenderer([[0, 1, 2]], camera_distance=5, scale=20, near=0.1)
+    renderer.draw(surface, vertices, frustum.project(vertices))
+    filled = pygame.surfarray.array3d(surface).any(axis=2)
+    # The part near the camera reaches the bottom edge of the screen
+    assert filled[:, -1].any()
+
+
+def test_clip_segments_against_a_rect():
+    starts = np.array([[-10.0, 5], [2, 2], [-5, -5]])
+    ends = np.array([[20.0, 5], [4, 4], [-1, -1]])
+    clipped_starts, clipped_ends, visible = clip_segments(
+        starts, ends, pygame.Rect(0, 0, 10, 10)
+    )
+    assert visible.tolist() == [True, True, False]
+    assert np.allclose(clipped_starts, [[0, 5], [2, 2]])
+    assert np.allclose(clipped_ends, [[9, 5], [4, 4]])
+
+
+def test_tiled_solid_matches_a_single_worker():
+    rng = np.random.default_rng(3)
+    vertices = rng.uniform(-2, 2, (60, 3))
+    faces = rng.integers(0, len(vertices), (80, 3))
+    frustum = Frustum(pygame.Rect(0, 0, 160, 120))
+    points = frustum.project(vertices)
+    images = []
+    for workers in (1, 4):
+        surface = pygame.Surface((160, 120))
+        renderer = SolidRenderer(faces, workers=workers, tile_size=32)
+        renderer.draw(surface, vertices, points)
+        renderer.close()
+        images.append(pygame.surfarray.array3d(surface))
+    assert images[0].any()
+    assert np.array_equal(images[0], images[1])
+
+
+def test_solid_packs_colors_like_byte_writes():
+    rng = np.random.default_rng(5)
+    vertices = rng.uniform(-2, 2, (60, 3))
+    faces = rng.integers(0, len(vertices), (80, 3))
+    frustum = Frustum(pygame.Rect(0, 0, 160, 120))
+    points = frustum.project(vertices)
+    images = []
+    # 32-bit surfaces take packed pixel stores, 24-bit ones byte writes
+    for depth in (32, 24):
+        surface = pygame.Surface((160, 120), depth=depth)
+        SolidRenderer(faces, workers=1).draw(surface, vertices, points)
+        images.append(pygame.surfarray.array3d(surface))
+    assert images[0].any()
+    assert np.array_equal(images[0], images[1])
+
+
+def test_solid_skips_triangles_between_pixel_centers():
+    surface = pygame.Surface((40, 40))
+    vertices = np.array([[0.0, 0, 0], [1, 0, 0], [0, 1, 0]])
+    renderer = SolidRenderer([[0, 2, 1]], camera_distance=5, scale=20)
+    # Inside one pixel, clear of its center
+    renderer.draw(
+        surface, vertices, np.array([[10.6, 10.6], [10.9, 10.6], [10.6, 10.9]])
+    )
+    assert not pygame.surfarray.array3d(surface).any()
+    renderer.draw(surface, vertices, np.array([[5.0, 5], [30, 5], [5, 30]]))
+    assert pygame.surfarray.array3d(surface).any()
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+from geometry_game.geometry import Transformation, TransformStack
+from geometry_game.session import (
+    MAX_PARAMS,
+    SESSION_MAGIC,
+    Session,
+    SessionLog,
+    _HEADER,
+    load_session,
+    restore_session,
+    save_session,
+)
+
+
+def stack():
+    return [
+        Transformation("scale", {"x": 2.0, "y": 1.0, "z": 0.5}),
+        Transformation("rotate_x", {"angle": 30.0}),
+        Transformation("translate", {"x": 1.0, "y": -2.0, "z": 0.25}),
+        Transformation("shear", {"xy": 0.5}),
+    ]
+
+
+def capture(transformations=None):
+    return Session.capture(
+        stack() if transformations is None else transformations,
+        mesh_path="meshes/bunny.ply",
+        rotation_angle=123.5,
+        auto_rotate=False,
+        camera_distance=7.0,
+        scale=150.0,
+    )
+
+
+def assert_same(session, expected):
+    assert np.array_equal(session.types, expected.types)
+    assert np.array_equal(session.params, expected.params)
+    assert session.mesh_path == expected.mesh_path
+    assert session.rotation_angle == expected.rotation_angle
+    assert session.auto_rotate == expected.auto_rotate
+    assert session.camera_distance == expected.camera_distance
+    assert session.scale == expected.scale
+
+
+@pytest.mark.parametrize("name", ["session.bin", "session.json"])
+def test_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    save_session(path, capture())
+    assert_same(load_session(path), capture())
+    assert not (tmp_path / (name + ".tmp")).exists()
+
+
+def test_restored_stack_composes_like_the_original():
+    session = Session.from_bytes(capture().to_bytes())
+    restored = session.stack()
+    assert np.allclose(restored.composite, TransformStack(stack()).composite)
+    assert [t.type for t in restored] == [t.type for t in stack()]
+    assert restored[2].params == {"x": 1.0, "y": -2.0, "z": 0.25}
+
+
+def test_rigid_composite_of_a_rigid_session():
+    rigid = [t for t in stack() if t.type in ("rotate_x", "translate")]
+    session = Session.from_bytes(capture(rigid).to_bytes())
+    assert np.allclose(
+        session.rigid_composite().to_matrix(), TransformStack(rigid).composite
+    )
+    assert capture().rigid_composite() is None
+
+
+def test_reads_version_1_with_stored_matrices():
+    session = capture()
+    mesh_path = session.mesh_path.encode("utf-8")
+    header = _HEADER.pack(
+        SESSION_MAGIC, 1, 0, len(session), 123.5, 7.0, 150.0, len(mesh_path)
+    )
+    matrices = np.stack([t.matrix for t in stack()]).astype("<f8")
+    data = b"".join(
+        (
+            header,
+            mesh_path,
+            session.types.tobytes(),
+            session.params.astype("<f8").tobytes(),
+            matrices.tobytes(),
+        )
+    )
+    assert_same(Session.from_bytes(data), session)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"GGSS",
+        b"NOPE" + bytes(_HEADER.size),
+        capture().to_bytes()[:-1],
+        _HEADER.pack(SESSION_MAGIC, 99, 0, 0, 0, 0, 0, 0),
+        _HEADER.pack(SESSION_MAGIC, 2, 0, 1, 0, 0, 0, 0)
+        + b"\xff"
+        + bytes(8 * MAX_PARAMS),
+    ],
+)
+def test_rejects_malformed_data(data):
+    with pytest.raises(ValueError):
+        Session.from_bytes(data)
+
+
+def test_restore_replays_the_autosave_log(tmp_path):
+    path = str(tmp_path / "session.bin")
+    save_session(path, capture())
+    log = SessionLog(path + ".log")
+    log.append(Transformation("rotate_z", {"angle": 45.0}))
+    log.pop(0)
+    log.pop(99)
+    log.rotation(True, 10.0)
+    log.close()
+    with open(path + ".log", "a", encoding="utf-8") as file:
+        file.write('{"op": "append", "ty')
+
+    restored = restore_session(path)
+    expected = stack()[1:] + [Transformation("rotate_z", {"angle": 45.0})]
+    assert [t.type for t in restored.transformations()] == [t.type for t in expected]
+    assert np.allclose(restored.composite(), TransformStack(expected).composite)
+    assert restored.auto_rotate and restored.rotation_angle == 10.0
+    assert not (tmp_path / "session.bin.log").exists()
+    assert_same(load_session(path), restored)
+
+
+def test_restore_without_any_file(tmp_path):
+    assert restore_session(str(tmp_path / "missing.bin")) is None
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from geometry_game.geometry import Transformation, TransformStack
+from geometry_game.timeline import Timeline, Track
+
+
+def make_timeline():
+    timeline = Timeline(
+        [
+            Transformation("scale", {"x": 2.0}),
+            Transformation("rotate_y", {"angle": 0.0}),
+            Transformation("translate", {"x": 1.0, "z": -1.0}),
+            Transformation("shear", {"xy": 0.5}),
+        ],
+        duration=2.0,
+        fps=10,
+    )
+    timeline.keyframe(1, "angle", 0, 0, "ease")
+    timeline.keyframe(1, "angle", 2, 360)
+    timeline.keyframe(3, "yz", 0.5, 0.0, "step")
+    timeline.keyframe(3, "yz", 1.5, 1.0)
+    return timeline
+
+
+def expected_matrix(timeline, time):
+    stack = []
+    for index, transform in enumerate(timeline.transformations):
+        params = dict(transform.params)
+        for (track_index, param), track in timeline.tracks.items():
+            if track_index == index:
+                params[param] = float(track.sample([time])[0])
+        stack.append(Transformation(transform.type, params))
+    return TransformStack(stack).composite
+
+
+def test_baked_frames_match_the_stack_composed_per_frame():
+    timeline = make_timeline()
+    matrices = timeline.matrices()
+    assert matrices.shape == (timeline.frame_count, 4, 4)
+    for frame, time in enumerate(timeline.times()):
+        assert np.allclose(matrices[frame], expected_matrix(timeline, time))
+
+
+def test_track_holds_values_outside_its_keyframes():
+    track = Track(0, "angle", [(1, 10), (2, 20)])
+    assert np.allclose(track.sample([0, 1, 1.5, 3]), [10, 10, 15, 20])
+
+
+def test_keyframe_rejects_unknown_parameters():
+    with pytest.raises(ValueError):
+        make_timeline().keyframe(0, "angle", 0, 1)
+
+
+def test_frame_index_loops_or_holds():
+    timeline = make_timeline()
+    assert timeline.frame_index(2.0) == 0
+    timeline.loop = False
+    assert timeline.frame_index(5.0) == timeline.frame_count - 1
+
+
+def test_save_and_load_round_trip(tmp_path):
+    timeline = make_timeline()
+    path = str(tmp_path / "timeline.json")
+    timeline.save(path)
+    loaded = Timeline.load(path, fps=10)
+    assert np.allclose(loaded.matrices(), timeline.matrices())
@@ -0,0 +1,82 @@
+import pytest
+from geometry_game.geometry import Transformation
+from geometry_game.profiling import FrameProfiler, ProfilerOverlay
+from geometry_game.ui import (
+    GlassButton,
+    RetainedWidget,
+    TransformListPopup,
+    text_cache,
+)
+
+
+def test_retained_widget_requires_state_key_and_bounds():
+    class Incomplete(RetainedWidget):
+        def state_key(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_button_is_dirty_until_drawn(screen):
+    button = GlassButton(20, 20, 250, 50, "Add Transformation")
+    assert button.is_dirty()
+    button.draw(screen)
+    assert not button.is_dirty()
+    assert button.dirty_rect() == button.bounds()
+
+
+def list_popup(count, scroll_offset):
+    popup = TransformListPopup(
+        [Transformation("rotate_x", {"angle": index}) for index in range(count)]
+    )
+    popup.show()
+    popup.scroll_offset = scroll_offset
+    return popup
+
+
+def delete_button(popup, local_y):
+    return popup._row_at((popup.x + popup.width - 40, popup.y + local_y))
+
+
+def test_visible_range_at_the_scroll_edges():
+    assert list_popup(11, 0)._visible_range() == range(0, 11)
+    popup = list_popup(11, 0)
+    popup.scroll_offset = popup.max_scroll
+    assert popup._visible_range() == range(1, 11)
+    assert list_popup(11, 39)._visible_range() == range(0, 11)
+    assert list_popup(30_000, 40 * 20_000 + 5)._visible_range() == range(20_000, 20_011)
+
+
+def test_delete_buttons_under_the_title_bar_do_not_hit():
+    # Row 0's button spans local y 21-41, all of it under the title bar
+    popup = list_popup(11, 39)
+    assert delete_button(popup, 30) is None
+    assert delete_button(popup, 70) == 1
+
+    # Row 0's button spans local y 40-60 and only shows below y 50
+    popup = list_popup(11, 20)
+    assert delete_button(popup, 45) is None
+    assert delete_button(popup, 55) == 0
+
+
+def test_delete_button_of_the_last_row_at_max_scroll():
+    popup = list_popup(11, 0)
+    popup.scroll_offset = popup.max_scroll
+    assert delete_button(popup, popup._item_y(10) + 15) == 10
+    assert delete_button(popup, popup._item_y(10) + 5) is None
+
+
+def test_profiler_overlay_keeps_out_of_the_shared_text_cache(screen):
+    profiler = FrameProfiler()
+    overlay = ProfilerOverlay(profiler, 10, 10)
+    overlay.toggle()
+    entries = list(text_cache._entries)
+    for _ in range(5):
+        profiler.begin_frame()
+        with profiler.span("edges"):
+            pass
+        profiler.end_frame()
+        overlay.draw(screen)
+    assert list(text_cache._entries) == entries
+    assert overlay.text_cache.misses > 0